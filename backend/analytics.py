@@ -0,0 +1,332 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List
+
+from database import KestraDatabase, db as default_db
+
+GRANULARITIES = {"hour": "1 hour", "day": "1 day"}
+
+# Longest range /api/analytics serves per granularity, which bounds its cost
+MAX_RANGE = {"hour": timedelta(days=31), "day": timedelta(days=731)}
+
+FAILED_STATES = ("FAILED", "KILLED")
+TERMINAL_STATES = ("SUCCESS", "WARNING") + FAILED_STATES
+
+_HOUR = "date_trunc('hour', {col} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+_DAY = "date_trunc('day', {col} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+
+_FACTS_SELECT = f"""
+    SELECT id, namespace, flow_id, state_current, {_HOUR.format(col="start_date")}, state_duration
+    FROM executions
+    WHERE deleted = false AND start_date IS NOT NULL
+"""
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole else None
+
+
+class ExecutionRollups:
+    """
+    Per-flow, per-state hourly and daily execution aggregates.
+
+    Rollups live in agrilink_execution_rollups (migration 004) and are
+    maintained incrementally: a trigger logs changed executions, and
+    refresh() consumes (deletes) committed log rows, updates one fact row
+    per execution and recomputes only the buckets those executions fall
+    in. Log rows are consumed by identity rather than past a sequence
+    high-water mark, because sequence values commit out of order: a
+    change still uncommitted while a later one is consumed stays in the
+    log for the next refresh. The first refresh backfills from the whole
+    executions table.
+    """
+
+    def __init__(self, database: Optional[KestraDatabase] = None, batch_size: int = 5000):
+        """
+        Initialize the rollups.
+
+        Args:
+            database: Database holding executions (default: the shared instance)
+            batch_size: Maximum logged changes consumed per refresh
+        """
+        self.database = database or default_db
+        self.batch_size = batch_size
+        self._counters = {
+            "refreshes": 0,
+            "changes_applied": 0,
+            "buckets_recomputed": 0,
+        }
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Apply logged execution changes to the rollups.
+
+        Runs in one transaction under an advisory lock, so concurrent
+        callers skip instead of duplicating work.
+
+        Returns:
+            Dictionary with changes applied, buckets recomputed, whether a
+            backfill ran or the refresh was skipped, and changes still pending
+        """
+        with self.database.connection() as conn:
+            with conn, conn.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext('agrilink_execution_rollups'))")
+                if not cursor.fetchone()[0]:
+                    return {"skipped": True}
+
+                cursor.execute(
+                    "SELECT last_seq, backfilled FROM agrilink_rollup_watermark WHERE name = 'executions' FOR UPDATE"
+                )
+                last_seq, backfilled = cursor.fetchone()
+
+                cursor.execute(
+                    "CREATE TEMP TABLE agrilink_touched "
+                    "(namespace VARCHAR(150), flow_id VARCHAR(150), start_hour TIMESTAMPTZ) ON COMMIT DROP"
+                )
+                if backfilled:
+                    result = self._apply_changes(cursor, last_seq)
+                else:
+                    result = self._backfill(cursor, last_seq)
+
+                buckets = self._recompute_touched(cursor)
+                # last_seq only records the newest change consumed, for reporting
+                cursor.execute(
+                    "UPDATE agrilink_rollup_watermark SET last_seq = %s, backfilled = true, refreshed_at = now() "
+                    "WHERE name = 'executions'",
+                    (result["watermark"],)
+                )
+                cursor.execute("SELECT count(*) FROM agrilink_execution_changes")
+                pending = cursor.fetchone()[0]
+
+        self._counters["refreshes"] += 1
+        self._counters["changes_applied"] += result["changes"]
+        self._counters["buckets_recomputed"] += buckets
+        return {"skipped": False, **result, "buckets": buckets, "pending": pending}
+
+    def _backfill(self, cursor, last_seq: int) -> Dict[str, Any]:
+        """Rebuild facts from every execution and mark all buckets touched."""
+        # Consume the log before reading executions: every change deleted here
+        # committed before the facts snapshot below, so none is lost, and
+        # changes still uncommitted stay logged for the next refresh
+        cursor.execute(
+            "WITH consumed AS (DELETE FROM agrilink_execution_changes RETURNING seq) "
+            "SELECT coalesce(max(seq), 0) FROM consumed"
+        )
+        watermark = max(last_seq, cursor.fetchone()[0])
+
+        cursor.execute("DELETE FROM agrilink_execution_facts")
+        cursor.execute("DELETE FROM agrilink_execution_rollups")
+        cursor.execute(f"INSERT INTO agrilink_execution_facts {_FACTS_SELECT}")
+        changes = cursor.rowcount
+        cursor.execute(
+            "INSERT INTO agrilink_touched SELECT DISTINCT namespace, flow_id, start_hour FROM agrilink_execution_facts"
+        )
+        print(f"📊 Backfilled execution rollups from {changes} executions")
+        return {"backfill": True, "changes": changes, "watermark": watermark}
+
+    def _apply_changes(self, cursor, last_seq: int) -> Dict[str, Any]:
+        """Consume up to batch_size committed log rows and re-read their executions into the facts table."""
+        cursor.execute(
+            """
+            DELETE FROM agrilink_execution_changes
+            WHERE seq IN (
+                SELECT seq FROM agrilink_execution_changes ORDER BY seq LIMIT %s FOR UPDATE SKIP LOCKED
+            )
+            RETURNING seq, execution_id
+            """,
+            (self.batch_size,)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return {"backfill": False, "changes": 0, "watermark": last_seq}
+
+        watermark = max(last_seq, max(seq for seq, _ in rows))
+        execution_ids = list({execution_id for _, execution_id in rows})
+
+        # Buckets the executions leave and the buckets they enter both change
+        cursor.execute(
+            "INSERT INTO agrilink_touched SELECT namespace, flow_id, start_hour "
+            "FROM agrilink_execution_facts WHERE execution_id = ANY(%s)",
+            (execution_ids,)
+        )
+        cursor.execute("DELETE FROM agrilink_execution_facts WHERE execution_id = ANY(%s)", (execution_ids,))
+        cursor.execute(
+            f"INSERT INTO agrilink_execution_facts {_FACTS_SELECT} AND id = ANY(%s) "
+            f"ON CONFLICT (execution_id) DO NOTHING",
+            (execution_ids,)
+        )
+        cursor.execute(
+            "INSERT INTO agrilink_touched SELECT namespace, flow_id, start_hour "
+            "FROM agrilink_execution_facts WHERE execution_id = ANY(%s)",
+            (execution_ids,)
+        )
+        return {"backfill": False, "changes": len(rows), "watermark": watermark}
+
+    def _recompute_touched(self, cursor) -> int:
+        """Recompute every hour and day bucket listed in agrilink_touched."""
+        recomputed = 0
+        for granularity, width in GRANULARITIES.items():
+            bucket = (_HOUR if granularity == "hour" else _DAY).format(col="start_hour")
+            buckets = f"SELECT DISTINCT namespace, flow_id, {bucket} AS bucket FROM agrilink_touched"
+            cursor.execute(
+                f"""
+                DELETE FROM agrilink_execution_rollups r
+                USING ({buckets}) b
+                WHERE r.granularity = %s
+                    AND r.namespace = b.namespace AND r.flow_id = b.flow_id AND r.bucket = b.bucket
+                """,
+                (granularity,)
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO agrilink_execution_rollups (
+                    granularity, namespace, bucket, flow_id, state, executions,
+                    duration_avg, duration_p50, duration_p90, duration_p95, duration_p99, duration_max
+                )
+                SELECT
+                    %s, f.namespace, b.bucket, f.flow_id, f.state, count(*),
+                    avg(f.duration),
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY f.duration),
+                    percentile_cont(0.9) WITHIN GROUP (ORDER BY f.duration),
+                    percentile_cont(0.95) WITHIN GROUP (ORDER BY f.duration),
+                    percentile_cont(0.99) WITHIN GROUP (ORDER BY f.duration),
+                    max(f.duration)
+                FROM ({buckets}) b
+                JOIN agrilink_execution_facts f
+                    ON f.namespace = b.namespace AND f.flow_id = b.flow_id
+                    AND f.start_hour >= b.bucket AND f.start_hour < b.bucket + interval '{width}'
+                GROUP BY f.namespace, b.bucket, f.flow_id, f.state
+                """,
+                (granularity,)
+            )
+            recomputed += cursor.rowcount
+        return recomputed
+
+    def query(
+        self,
+        namespace: str = "agrilink",
+        granularity: str = "day",
+        start_from: Optional[str] = None,
+        start_to: Optional[str] = None,
+        flow_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Read rollups for a time range.
+
+        Cost depends on the number of buckets, flows and states in the
+        range, never on the number of executions behind them.
+
+        Args:
+            namespace: Namespace to report on
+            granularity: "hour" or "day"
+            start_from: Inclusive range start (ISO 8601; default: 30 days ago, or 48 hours for hourly)
+            start_to: Exclusive range end (ISO 8601; default: now)
+            flow_id: Optional flow to restrict to
+
+        Returns:
+            Dictionary with totals and per-flow summaries (counts by state,
+            success and failure rates, average duration), the bucket series
+            with duration percentiles, and the watermark
+
+        Raises:
+            ValueError: For an unknown granularity, unparseable timestamps or a range that is too long
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}; expected one of {list(GRANULARITIES)}")
+
+        now = datetime.now(timezone.utc)
+        end = _parse_time(start_to) if start_to else now
+        start = _parse_time(start_from) if start_from else end - (
+            timedelta(hours=48) if granularity == "hour" else timedelta(days=30)
+        )
+        if end <= start:
+            raise ValueError("start_to must be after start_from")
+        if end - start > MAX_RANGE[granularity]:
+            raise ValueError(f"Range too long for {granularity} granularity (max {MAX_RANGE[granularity].days} days)")
+
+        query = """
+            SELECT bucket, flow_id, state, executions,
+                duration_avg, duration_p50, duration_p90, duration_p95, duration_p99, duration_max
+            FROM agrilink_execution_rollups
+            WHERE granularity = %s AND namespace = %s AND bucket >= %s AND bucket < %s
+        """
+        params: List[Any] = [granularity, namespace, start, end]
+        if flow_id:
+            query += " AND flow_id = %s"
+            params.append(flow_id)
+        query += " ORDER BY bucket, flow_id, state"
+
+        with self.database.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+                cursor.execute(
+                    """
+                    SELECT w.last_seq, w.backfilled, w.refreshed_at,
+                        (SELECT count(*) FROM agrilink_execution_changes)
+                    FROM agrilink_rollup_watermark w WHERE w.name = 'executions'
+                    """
+                )
+                last_seq, backfilled, refreshed_at, pending = cursor.fetchone()
+
+        series = []
+        flows: Dict[str, Dict[str, Any]] = {}
+        for bucket, flow, state, count, avg, p50, p90, p95, p99, longest in rows:
+            series.append({
+                "bucket": bucket.isoformat(),
+                "flow_id": flow,
+                "state": state,
+                "executions": count,
+                "duration": {"avg": avg, "p50": p50, "p90": p90, "p95": p95, "p99": p99, "max": longest},
+            })
+            summary = flows.setdefault(flow, {"executions": 0, "by_state": {}, "_duration_total": 0.0, "_timed": 0})
+            summary["executions"] += count
+            summary["by_state"][state] = summary["by_state"].get(state, 0) + count
+            if avg is not None:
+                summary["_duration_total"] += avg * count
+                summary["_timed"] += count
+
+        totals = {"executions": 0, "by_state": {}, "_duration_total": 0.0, "_timed": 0}
+        for summary in flows.values():
+            totals["executions"] += summary["executions"]
+            totals["_duration_total"] += summary["_duration_total"]
+            totals["_timed"] += summary["_timed"]
+            for state, count in summary["by_state"].items():
+                totals["by_state"][state] = totals["by_state"].get(state, 0) + count
+        for summary in [*flows.values(), totals]:
+            self._finish_summary(summary)
+
+        return {
+            "namespace": namespace,
+            "granularity": granularity,
+            "start_from": start.isoformat(),
+            "start_to": end.isoformat(),
+            "totals": totals,
+            "flows": flows,
+            "series": series,
+            "watermark": {
+                "last_seq": last_seq,
+                "backfilled": backfilled,
+                "refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+                "pending_changes": pending,
+            },
+        }
+
+    @staticmethod
+    def _finish_summary(summary: Dict[str, Any]):
+        """Add rates and average duration to a running summary."""
+        by_state = summary["by_state"]
+        terminal = sum(by_state.get(s, 0) for s in TERMINAL_STATES)
+        summary["success_rate"] = _rate(by_state.get("SUCCESS", 0) + by_state.get("WARNING", 0), terminal)
+        summary["failure_rate"] = _rate(sum(by_state.get(s, 0) for s in FAILED_STATES), terminal)
+        timed = summary.pop("_timed")
+        total = summary.pop("_duration_total")
+        summary["duration_avg"] = round(total / timed, 2) if timed else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return refresh counters."""
+        return dict(self._counters)
+
+
+def _parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
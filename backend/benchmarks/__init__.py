@@ -0,0 +1,9 @@
+"""
+Offline load tests for the Agri-Link backend.
+
+- fake_kestra: local stand-in for the Kestra executions/flows API
+- seed: fills the executions table with synthetic rows
+- run: drives load scenarios against the API and records latency/throughput
+
+Run from the backend directory, e.g. `python -m benchmarks.run --fake-kestra`.
+"""
@@ -0,0 +1,274 @@
+import re
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+
+EXECUTION_CREATE = re.compile(r"^/api/v1/(?P<tenant>[^/]+)/executions/(?P<namespace>[^/]+)/(?P<flow_id>[^/]+)$")
+EXECUTION_GET = re.compile(r"^/api/v1/(?P<tenant>[^/]+)/executions/(?P<id>[^/]+)$")
+EXECUTION_FOLLOW = re.compile(r"^/api/v1/(?P<tenant>[^/]+)/executions/(?P<id>[^/]+)/follow$")
+FLOW_CREATE = re.compile(r"^/api/v1/(?P<tenant>[^/]+)/flows$")
+FLOW_ITEM = re.compile(r"^/api/v1/(?P<tenant>[^/]+)/flows/(?P<namespace>[^/]+)/(?P<flow_id>[^/]+)$")
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class FakeKestra:
+    """
+    Local stand-in for the Kestra endpoints AgriLinkKestra calls.
+
+    Executions move CREATED → RUNNING → SUCCESS (or FAILED) on a timer,
+    every response is delayed by latency_ms ± jitter_ms, and failure_rate
+    of requests get a 500. Flows are kept in memory so deploys see
+    "already exists" conflicts like the real server.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 20,
+        jitter_ms: float = 5,
+        failure_rate: float = 0.0,
+        execution_failure_rate: float = 0.0,
+        run_seconds: float = 2.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Configure the server. Call start() to begin serving.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency_ms: Mean added latency per request
+            jitter_ms: Uniform jitter around latency_ms
+            failure_rate: Fraction of requests answered with HTTP 500
+            execution_failure_rate: Fraction of executions that end FAILED
+            run_seconds: Time from creation to a terminal state
+            seed: Random seed for reproducible runs
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.execution_failure_rate = execution_failure_rate
+        self.run_seconds = run_seconds
+        self.random = random.Random(seed)
+
+        self.executions: Dict[str, Dict[str, Any]] = {}
+        self.flows: Dict[str, str] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeKestra":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-kestra", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _delay(self) -> bool:
+        """Sleep for the simulated latency; returns True if the request should fail."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self.random.random() < self.failure_rate
+        time.sleep(max(delay, 0) / 1000)
+        return fail
+
+    def create_execution(self, namespace: str, flow_id: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Register a new execution."""
+        with self._lock:
+            execution_id = uuid.uuid4().hex[:22]
+            final = "FAILED" if self.random.random() < self.execution_failure_rate else "SUCCESS"
+            self.executions[execution_id] = {
+                "id": execution_id,
+                "namespace": namespace,
+                "flowId": flow_id,
+                "inputs": inputs,
+                "created": time.time(),
+                "final": final,
+            }
+        return self.execution_payload(execution_id)
+
+    def execution_payload(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Current Kestra-style JSON for an execution, or None if unknown."""
+        execution = self.executions.get(execution_id)
+        if execution is None:
+            return None
+
+        elapsed = time.time() - execution["created"]
+        if elapsed >= self.run_seconds:
+            state = execution["final"]
+        elif elapsed >= min(0.1, self.run_seconds / 10):
+            state = "RUNNING"
+        else:
+            state = "CREATED"
+
+        payload = {
+            "id": execution_id,
+            "namespace": execution["namespace"],
+            "flowId": execution["flowId"],
+            "inputs": execution["inputs"],
+            "state": {"current": state, "startDate": _iso(execution["created"])},
+        }
+        if state in ("SUCCESS", "FAILED"):
+            payload["state"]["endDate"] = _iso(execution["created"] + self.run_seconds)
+            payload["outputs"] = {"final_price": 42.0} if state == "SUCCESS" else {}
+        return payload
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Any = None, content_type: str = "application/json"):
+                data = b"" if body is None else (
+                    body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _route(self, method: str):
+                path = urlparse(self.path).path
+                body = self._body()
+                if fake._delay():
+                    return self._send(500, {"message": "Simulated failure"})
+
+                if method == "POST" and FLOW_CREATE.match(path):
+                    return self._put_flow(body.decode("utf-8"), create=True)
+                if method == "PUT" and FLOW_ITEM.match(path):
+                    return self._put_flow(body.decode("utf-8"), create=False)
+                if method == "GET" and (match := FLOW_ITEM.match(path)):
+                    source = fake.flows.get(f"{match['namespace']}.{match['flow_id']}")
+                    if source is None:
+                        return self._send(404, {"message": "Flow not found"})
+                    return self._send(200, {"id": match["flow_id"], "namespace": match["namespace"], "source": source})
+                if method == "GET" and (match := EXECUTION_FOLLOW.match(path)):
+                    return self._follow(match["id"])
+                if method == "POST" and (match := EXECUTION_CREATE.match(path)):
+                    inputs = dict(re.findall(rb'name="([^"]+)"\r\n\r\n([^\r]*)', body))
+                    inputs = {k.decode(): v.decode() for k, v in inputs.items()}
+                    return self._send(200, fake.create_execution(match["namespace"], match["flow_id"], inputs))
+                if method == "GET" and (match := EXECUTION_GET.match(path)):
+                    payload = fake.execution_payload(match["id"])
+                    if payload is None:
+                        return self._send(404, {"message": "Execution not found"})
+                    return self._send(200, payload)
+                return self._send(404, {"message": f"No route for {method} {path}"})
+
+            def _put_flow(self, source: str, create: bool):
+                flow_id = re.search(r"^id:\s*(\S+)", source, re.MULTILINE)
+                namespace = re.search(r"^namespace:\s*(\S+)", source, re.MULTILINE)
+                if not flow_id or not namespace:
+                    return self._send(422, {"message": "Invalid flow"})
+                key = f"{namespace.group(1)}.{flow_id.group(1)}"
+                if create and key in fake.flows:
+                    return self._send(409, {"message": "Flow already exists"})
+                fake.flows[key] = source
+                return self._send(200, {
+                    "id": flow_id.group(1),
+                    "namespace": namespace.group(1),
+                    "revision": 1,
+                    "source": source,
+                    "tasks": [],
+                    "disabled": False,
+                    "deleted": False,
+                })
+
+            def _follow(self, execution_id: str):
+                if execution_id not in fake.executions:
+                    return self._send(404, {"message": "Execution not found"})
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                last = None
+                while True:
+                    payload = fake.execution_payload(execution_id)
+                    if payload["state"]["current"] != last:
+                        last = payload["state"]["current"]
+                        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    if last in ("SUCCESS", "FAILED"):
+                        return
+                    time.sleep(0.05)
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_POST(self):
+                self._route("POST")
+
+            def do_PUT(self):
+                self._route("PUT")
+
+        return Handler
+
+
+def main():
+    """Run the fake Kestra server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Kestra API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--execution-failure-rate", type=float, default=0.0)
+    parser.add_argument("--run-seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeKestra(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        execution_failure_rate=args.execution_failure_rate,
+        run_seconds=args.run_seconds,
+        seed=args.seed
+    )
+    print(f"🧪 Fake Kestra listening on {fake.url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
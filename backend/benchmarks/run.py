@@ -0,0 +1,327 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLOWS_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "kestra", "flows")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SCENARIOS = ["sale", "status", "executions", "deploy"]
+
+# Deploys rewrite every flow; running them concurrently measures lock contention, not the API
+SCENARIO_MAX_CONCURRENCY = {"deploy": 1}
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return round(sorted_values[rank], 2)
+
+
+class ScenarioStats:
+    """Latency samples and outcome counts for one scenario."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+        self.status_codes: Dict[str, int] = {}
+        self.started = 0.0
+        self.finished = 0.0
+
+    def record(self, latency_ms: float, status: Optional[int]):
+        self.latencies_ms.append(latency_ms)
+        key = str(status) if status is not None else "error"
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        values = sorted(self.latencies_ms)
+        count = len(values)
+        elapsed = max(self.finished - self.started, 1e-9)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "duration_s": round(elapsed, 2),
+            "throughput_rps": round(count / elapsed, 2),
+            "latency_ms": {
+                "min": round(values[0], 2) if values else None,
+                "mean": round(sum(values) / count, 2) if values else None,
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": round(values[-1], 2) if values else None,
+            },
+            "status_codes": self.status_codes,
+        }
+
+
+class LoadRunner:
+    """Closed-loop load generator: each worker sends its next request when the last one returns."""
+
+    def __init__(self, api_url: str, concurrency: int, duration: float, seed: int = 42):
+        self.api_url = api_url.rstrip("/")
+        self.concurrency = concurrency
+        self.duration = duration
+        self.random = random.Random(seed)
+        self.execution_ids: List[str] = []
+        # Sales queued by the launch scheduler (HTTP 202), resolved before the status scenario
+        self.ticket_ids: List[str] = []
+        self._sale_counter = 0
+
+    async def _sale(self, client) -> int:
+        self._sale_counter += 1
+        response = await client.post(f"{self.api_url}/api/sale", json={
+            "farmer_id": f"bench-farmer-{self._sale_counter % 500}",
+            "farmer_name": "Benchmark",
+            "commodity": self.random.choice(["Tomato", "Potato", "Onion"]),
+            "quantity_kg": self.random.choice([100, 250, 500]),
+        })
+        if response.status_code == 200:
+            self.execution_ids.append(response.json()["execution_id"])
+        elif response.status_code == 202:
+            self.ticket_ids.append(response.json()["ticket_id"])
+        return response.status_code
+
+    async def _status(self, client) -> int:
+        execution_id = self.random.choice(self.execution_ids)
+        response = await client.get(f"{self.api_url}/api/execution/{execution_id}")
+        return response.status_code
+
+    async def _executions(self, client) -> int:
+        params = {"limit": 50, "preset": self.random.choice(["summary", "full"])}
+        response = await client.get(f"{self.api_url}/api/executions", params=params)
+        if response.status_code == 200 and response.json().get("next_cursor"):
+            # Follow one page to exercise keyset pagination
+            params["cursor"] = response.json()["next_cursor"]
+            response = await client.get(f"{self.api_url}/api/executions", params=params)
+        return response.status_code
+
+    async def _deploy(self, client) -> int:
+        response = await client.post(
+            f"{self.api_url}/api/deploy",
+            params={"flows_directory": FLOWS_DIR, "force": "true"}
+        )
+        return response.status_code
+
+    async def _resolve_tickets(self, client):
+        """Turn queued sale tickets into execution IDs (waiting up to 30s for each launch)."""
+        tickets, self.ticket_ids = self.ticket_ids, []
+        for ticket_id in tickets:
+            response = await client.get(f"{self.api_url}/api/tickets/{ticket_id}", params={"timeout": 30})
+            if response.status_code == 200 and response.json().get("execution_id"):
+                self.execution_ids.append(response.json()["execution_id"])
+
+    async def _discover_execution_ids(self, client):
+        """Collect execution IDs for the status scenario if no sales ran first."""
+        await self._resolve_tickets(client)
+        if self.execution_ids:
+            return
+        response = await client.get(f"{self.api_url}/api/executions", params={"limit": 500, "preset": "summary"})
+        if response.status_code == 200:
+            self.execution_ids = [e["id"] for e in response.json().get("executions", [])]
+        if not self.execution_ids:
+            for _ in range(20):
+                await self._sale(client)
+            await self._resolve_tickets(client)
+
+    async def run_scenario(self, client, name: str) -> Dict[str, Any]:
+        """Drive one scenario for the configured duration."""
+        request: Callable[[Any], Awaitable[int]] = getattr(self, f"_{name}")
+        if name == "status":
+            await self._discover_execution_ids(client)
+            if not self.execution_ids:
+                raise RuntimeError("No executions available for the status scenario")
+
+        stats = ScenarioStats(name)
+        workers = min(self.concurrency, SCENARIO_MAX_CONCURRENCY.get(name, self.concurrency))
+        deadline = time.perf_counter() + self.duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await request(client)
+                except Exception:
+                    status = None
+                stats.record((time.perf_counter() - started) * 1000, status)
+
+        stats.started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        stats.finished = time.perf_counter()
+
+        summary = {"concurrency": workers, **stats.summary()}
+        latency = summary["latency_ms"]
+        print(
+            f"  {name:<11} {summary['requests']:>7} req  {summary['throughput_rps']:>8} rps  "
+            f"p50 {latency['p50']} ms  p95 {latency['p95']} ms  p99 {latency['p99']} ms  "
+            f"errors {summary['error_rate'] * 100:.1f}%"
+        )
+        return summary
+
+    async def run(self, scenarios: List[str]) -> Dict[str, Any]:
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+            results = {}
+            for name in scenarios:
+                results[name] = await self.run_scenario(client, name)
+            return results
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold_percent: float) -> List[str]:
+    """
+    List regressions of current against baseline.
+
+    A scenario regresses when its p95 latency rises, or its throughput
+    falls, by more than threshold_percent, or its error rate grows.
+    """
+    regressions = []
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        p95_before, p95_now = before["latency_ms"]["p95"], now["latency_ms"]["p95"]
+        if p95_before and p95_now and p95_now > p95_before * (1 + threshold_percent / 100):
+            regressions.append(f"{name}: p95 {p95_before} → {p95_now} ms")
+        if before["throughput_rps"] and now["throughput_rps"] < before["throughput_rps"] * (1 - threshold_percent / 100):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} → {now['throughput_rps']} rps")
+        if now["error_rate"] > before["error_rate"]:
+            regressions.append(f"{name}: error rate {before['error_rate']} → {now['error_rate']}")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def start_api_server(kestra_url: str, port: int) -> subprocess.Popen:
+    """Launch the API server against the fake Kestra and wait until it is ready."""
+    import httpx
+
+    env = {
+        **os.environ,
+        "KESTRA_HOST": kestra_url,
+        "AGRILINK_FAST_START": "false",
+        "KESTRA_FLOW_MANIFEST": os.path.join(RESULTS_DIR, ".bench-manifest.json"),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "kestra_api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health/ready", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("API server did not become ready within 60s")
+
+
+def main():
+    """Run benchmark scenarios and save the results as JSON."""
+    parser = argparse.ArgumentParser(description="Agri-Link backend load benchmarks")
+    parser.add_argument("--api-url", default="http://127.0.0.1:8000", help="API under test")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fake-kestra", action="store_true",
+                        help="Start a fake Kestra and an API server pointed at it")
+    parser.add_argument("--kestra-latency-ms", type=float, default=20)
+    parser.add_argument("--kestra-failure-rate", type=float, default=0.0)
+    parser.add_argument("--api-port", type=int, default=8765, help="Port for the API server with --fake-kestra")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    fake = None
+    server = None
+    api_url = args.api_url
+    if args.fake_kestra:
+        from benchmarks.fake_kestra import FakeKestra
+
+        fake = FakeKestra(
+            latency_ms=args.kestra_latency_ms,
+            failure_rate=args.kestra_failure_rate,
+            seed=args.seed
+        ).start()
+        print(f"🧪 Fake Kestra on {fake.url}")
+        server = start_api_server(fake.url, args.api_port)
+        api_url = f"http://127.0.0.1:{args.api_port}"
+
+    print(f"🏁 Benchmarking {api_url} ({args.concurrency} workers, {args.duration}s per scenario)")
+    try:
+        runner = LoadRunner(api_url, args.concurrency, args.duration, seed=args.seed)
+        scenario_results = asyncio.run(runner.run(scenarios))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+        if fake:
+            fake.stop()
+
+    started_at = datetime.now(timezone.utc)
+    result = {
+        "started_at": started_at.isoformat(),
+        "git_commit": git_commit(),
+        "config": {
+            "api_url": api_url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "seed": args.seed,
+            "fake_kestra": args.fake_kestra,
+            "kestra_latency_ms": args.kestra_latency_ms if args.fake_kestra else None,
+            "kestra_failure_rate": args.kestra_failure_rate if args.fake_kestra else None,
+        },
+        "scenarios": scenario_results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{started_at.strftime('%Y%m%dT%H%M%SZ')}.json")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"💾 Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), result, args.threshold)
+        if regressions:
+            print(f"⚠️ Regressions vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"✅ No regressions vs {args.baseline} (threshold {args.threshold}%)")
+
+
+if __name__ == "__main__":
+    main()
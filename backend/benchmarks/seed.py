@@ -0,0 +1,158 @@
+import json
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List
+
+from database import db, KestraDatabase
+
+BENCH_PREFIX = "bench"
+
+FLOWS = ["main-sale-workflow", "crisis-shield", "market-monitor", "negotiation-swarm"]
+STATES = ["SUCCESS"] * 8 + ["FAILED", "KILLED", "RUNNING"]
+COMMODITIES = ["Tomato", "Potato", "Onion", "Cabbage"]
+
+# Stand-in for Kestra's executions table when benchmarking without Kestra.
+# Real Kestra derives these columns from value; the seed writes both.
+STANDIN_SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    key VARCHAR(250) NOT NULL PRIMARY KEY,
+    value JSONB NOT NULL,
+    deleted BOOLEAN NOT NULL DEFAULT false,
+    id VARCHAR(150) NOT NULL,
+    namespace VARCHAR(150) NOT NULL,
+    flow_id VARCHAR(150) NOT NULL,
+    state_current VARCHAR(50) NOT NULL,
+    state_duration BIGINT,
+    start_date TIMESTAMPTZ NOT NULL,
+    end_date TIMESTAMPTZ
+)
+"""
+
+
+def build_row(index: int, rng: random.Random, now: datetime, days: int) -> dict:
+    """Build one synthetic execution (Kestra JSON plus its derived columns)."""
+    flow_id = rng.choice(FLOWS)
+    state = rng.choice(STATES)
+    start = now - timedelta(seconds=rng.uniform(0, days * 86400))
+    duration = rng.uniform(5, 180)
+    end = None if state == "RUNNING" else start + timedelta(seconds=duration)
+    execution_id = f"{BENCH_PREFIX}{index:012d}"
+
+    value = {
+        "id": execution_id,
+        "namespace": "agrilink",
+        "flowId": flow_id,
+        "deleted": False,
+        "inputs": {
+            "farmer_id": f"farmer-{rng.randint(1, 5000)}",
+            "commodity": rng.choice(COMMODITIES),
+            "quantity_kg": str(rng.choice([100, 250, 500, 1000])),
+        },
+        "outputs": {"final_price": round(rng.uniform(5, 40), 2)} if state == "SUCCESS" else {},
+        "state": {
+            "current": state,
+            "startDate": start.isoformat(),
+            "endDate": end.isoformat() if end else None,
+            "duration": f"PT{duration:.3f}S" if end else None,
+            "histories": [{"state": "CREATED", "date": start.isoformat()}],
+        },
+    }
+    return {
+        "key": f"main_agrilink_{flow_id}_{execution_id}",
+        "value": json.dumps(value),
+        "deleted": False,
+        "id": execution_id,
+        "namespace": "agrilink",
+        "flow_id": flow_id,
+        "state_current": state,
+        "state_duration": int(duration * 1000) if end else None,
+        "start_date": start,
+        "end_date": end,
+    }
+
+
+def writable_columns(cursor) -> List[str]:
+    """Columns of the executions table that accept inserts (not generated)."""
+    cursor.execute(
+        """
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'executions' AND is_generated = 'NEVER'
+        """
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def seed(
+    rows: int,
+    database: Optional[KestraDatabase] = None,
+    days: int = 90,
+    batch_size: int = 5000,
+    seed_value: int = 42,
+    clean: bool = False
+) -> int:
+    """
+    Insert synthetic executions, creating a stand-in table if none exists.
+
+    Rows use ids prefixed with "bench" so they can be removed again with
+    clean=True. Against a real Kestra database only the non-generated
+    columns are written and Kestra derives the rest from value.
+
+    Args:
+        rows: Number of executions to insert
+        database: Target database (default: the backend's)
+        days: Spread of start dates back from now
+        batch_size: Rows per INSERT
+        seed_value: Random seed (same seed → same rows)
+        clean: Delete previously seeded rows first
+
+    Returns:
+        Number of rows inserted
+    """
+    from psycopg2.extras import execute_values
+
+    database = database or db
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+
+    conn = database.get_connection()
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute(STANDIN_SCHEMA)
+            if clean:
+                cursor.execute("DELETE FROM executions WHERE id LIKE %s", (f"{BENCH_PREFIX}%",))
+                print(f"🧹 Removed {cursor.rowcount} seeded executions")
+
+            writable = set(writable_columns(cursor))
+            columns = [c for c in build_row(0, rng, now, days) if c in writable]
+            insert = (
+                f"INSERT INTO executions ({', '.join(columns)}) VALUES %s "
+                f"ON CONFLICT (key) DO NOTHING"
+            )
+            inserted = 0
+            for start in range(0, rows, batch_size):
+                batch = [build_row(i, rng, now, days) for i in range(start, min(start + batch_size, rows))]
+                execute_values(cursor, insert, [[row[c] for c in columns] for row in batch])
+                inserted += len(batch)
+                print(f"  {inserted}/{rows} executions")
+            cursor.execute("ANALYZE executions")
+    finally:
+        conn.close()
+    return inserted
+
+
+def main():
+    """Seed the executions table from the command line."""
+    parser = argparse.ArgumentParser(description="Seed synthetic executions for benchmarks")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clean", action="store_true", help="Delete previously seeded rows first")
+    args = parser.parse_args()
+
+    inserted = seed(args.rows, days=args.days, seed_value=args.seed, clean=args.clean)
+    print(f"✅ Seeded {inserted} executions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+from typing import Optional, Dict, Any, List
+
+from registry import JsonRegistry, DATA_DIR
+
+DEFAULT_BUYERS_PATH = os.path.join(DATA_DIR, "buyers.json")
+
+# Higher is better; a buyer's minimumGrade accepts that grade and above
+GRADE_RANK = {"A": 3, "B": 2, "C": 1}
+
+
+def grade_rank(grade: Optional[str]) -> Optional[int]:
+    """Rank a quality grade ("A", "b", "Grade B" ...), or None if it is not a known grade."""
+    grade = (grade or "").strip().upper().replace("GRADE", "").strip()
+    return GRADE_RANK.get(grade[:1]) if grade else None
+
+
+class BuyerIndex(JsonRegistry):
+    """
+    In-memory index over the buyer registry (data/buyers.json).
+
+    Buyers are indexed by preferred commodity, state and city, and each
+    index list is kept sorted by rating then reliabilityScore, so a match
+    walks one short list and stops after the top K eligible buyers. The
+    file is reloaded when its modification time changes.
+    """
+
+    records_key = "buyers"
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 1.0):
+        """
+        Initialize the index. The registry is loaded on first use.
+
+        Args:
+            path: Buyer registry path (default: BUYERS_PATH env or data/buyers.json)
+            check_interval: Minimum seconds between file modification checks
+        """
+        super().__init__(path or os.getenv("BUYERS_PATH", DEFAULT_BUYERS_PATH), check_interval)
+        self._buyers: List[Dict[str, Any]] = []
+        self._by_commodity: Dict[str, List[int]] = {}
+        self._by_state: Dict[str, List[int]] = {}
+        self._by_city: Dict[str, List[int]] = {}
+
+    def _build(self, buyers: List[Dict[str, Any]]):
+        """Sort buyers by rank and rebuild the lookup tables."""
+        buyers = sorted(
+            buyers,
+            key=lambda b: (b.get("rating", 0), b.get("reliabilityScore", 0)),
+            reverse=True
+        )
+        by_commodity: Dict[str, List[int]] = {}
+        by_state: Dict[str, List[int]] = {}
+        by_city: Dict[str, List[int]] = {}
+
+        for position, buyer in enumerate(buyers):
+            for commodity in buyer.get("preferredCommodities", []):
+                by_commodity.setdefault(commodity.lower(), []).append(position)
+            location = buyer.get("location", {})
+            if location.get("state"):
+                by_state.setdefault(location["state"].lower(), []).append(position)
+            if location.get("city"):
+                by_city.setdefault(location["city"].lower(), []).append(position)
+
+        self._buyers = buyers
+        self._by_commodity = by_commodity
+        self._by_state = by_state
+        self._by_city = by_city
+
+    def match(
+        self,
+        commodity: str,
+        grade: Optional[str] = None,
+        quantity_kg: float = 0,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        limit: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Find the best buyers for a lot.
+
+        A buyer is eligible if it prefers the commodity, its
+        qualityRequirements.minimumGrade is at or below the lot's grade,
+        its daily volumeCapacity covers the quantity, and it is in the
+        given state/city (when set). Eligible buyers are ranked by rating,
+        then reliabilityScore.
+
+        A grade that is not A/B/C (e.g. "null" when quality assessment
+        failed) skips the grade check. If the grade and capacity checks
+        leave no buyer, the commodity's buyers in the location are
+        returned instead, largest daily capacity first, with
+        "fallback": true, so the negotiation still has someone to call.
+
+        Args:
+            commodity: Commodity name (case-insensitive)
+            grade: Lot quality grade; None or an unknown grade skips the grade check
+            quantity_kg: Lot size in kg; 0 skips the capacity check
+            state: Only buyers located in this state
+            city: Only buyers located in this city
+            limit: Maximum buyers to return
+
+        Returns:
+            Dictionary with "buyers" (top-K buyer records), "total_eligible"
+            and "fallback"
+        """
+        self._ensure_loaded()
+
+        # Read one consistent snapshot even if a reload happens meanwhile
+        buyers, by_commodity = self._buyers, self._by_commodity
+        allowed = None
+        if state:
+            allowed = set(self._by_state.get(state.lower(), []))
+        if city:
+            in_city = set(self._by_city.get(city.lower(), []))
+            allowed = in_city if allowed is None else allowed & in_city
+
+        lot_rank = grade_rank(grade)
+        candidates = []
+        matches = []
+        total = 0
+        for position in by_commodity.get(commodity.lower(), []):
+            if allowed is not None and position not in allowed:
+                continue
+            buyer = buyers[position]
+            candidates.append(buyer)
+            if lot_rank is not None:
+                if lot_rank < (grade_rank(buyer.get("qualityRequirements", {}).get("minimumGrade")) or 0):
+                    continue
+            if quantity_kg and buyer.get("volumeCapacity", {}).get("daily", 0) < quantity_kg:
+                continue
+            total += 1
+            if len(matches) < limit:
+                matches.append(buyer)
+
+        if not matches and candidates:
+            fallback = sorted(candidates, key=lambda b: b.get("volumeCapacity", {}).get("daily", 0), reverse=True)
+            return {"buyers": fallback[:limit], "total_eligible": 0, "fallback": True}
+        return {"buyers": matches, "total_eligible": total, "fallback": False}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return registry size, index sizes and reload count."""
+        return {
+            **super().stats(),
+            "commodities": len(self._by_commodity),
+            "states": len(self._by_state),
+            "cities": len(self._by_city),
+        }
@@ -0,0 +1,198 @@
+import json
+import select
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Callable
+
+from database import KestraDatabase
+
+
+@dataclass
+class ExecutionChange:
+    """One execution transition received from the change feed"""
+    execution_id: str
+    namespace: str
+    flow_id: str
+    state: str
+    deleted: bool = False
+
+
+class ExecutionChangeFeed:
+    """
+    In-process event source fed by Postgres LISTEN/NOTIFY.
+
+    A single dedicated connection listens on the channel published by the
+    agrilink_executions_notify trigger (migrations/002). Notifications are
+    handed to the event loop and dispatched to subscribers, which may be
+    plain functions or coroutine functions.
+    """
+
+    CHANNEL = "agrilink_executions"
+
+    def __init__(
+        self,
+        database: KestraDatabase,
+        channel: str = CHANNEL,
+        reconnect_delay: float = 5.0
+    ):
+        """
+        Initialize the feed. Nothing connects until start() is called.
+
+        Args:
+            database: Database providing the listener connection
+            channel: NOTIFY channel name
+            reconnect_delay: Seconds to wait before reconnecting after an error
+        """
+        self.database = database
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+
+        self._subscribers: List[Callable[[ExecutionChange], Any]] = []
+        self._reconnect_callbacks: List[Callable[[], Any]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._counters = {
+            "notifications": 0,
+            "dispatch_errors": 0,
+            "reconnects": 0,
+        }
+
+    def subscribe(self, callback: Callable[[ExecutionChange], Any]) -> Callable[[], None]:
+        """
+        Register a callback for every execution change.
+
+        Args:
+            callback: Function or coroutine function taking an ExecutionChange
+
+        Returns:
+            Function that removes the subscription
+        """
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def on_connect(self, callback: Callable[[], Any]):
+        """
+        Register a callback run every time the listener (re)connects.
+
+        Notifications sent while disconnected are lost, so subscribers
+        that rely on them should resynchronise here.
+
+        Args:
+            callback: Function called on the event loop thread
+        """
+        self._reconnect_callbacks.append(callback)
+
+    def _connected_callbacks(self):
+        for callback in list(self._reconnect_callbacks):
+            try:
+                callback()
+            except Exception as e:
+                self._counters["dispatch_errors"] += 1
+                print(f"Change feed connect callback failed: {e}")
+
+    def _dispatch(self, change: ExecutionChange):
+        """Run subscribers on the event loop thread."""
+        self._counters["notifications"] += 1
+        for callback in list(self._subscribers):
+            try:
+                outcome = callback(change)
+                if asyncio.iscoroutine(outcome):
+                    asyncio.ensure_future(outcome)
+            except Exception as e:
+                self._counters["dispatch_errors"] += 1
+                print(f"Change feed subscriber failed: {e}")
+
+    def _listen_forever(self):
+        """Listener thread: hold one LISTEN connection, reconnecting on failure."""
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self.database.get_connection()
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                self._connected.set()
+                self._loop.call_soon_threadsafe(self._connected_callbacks)
+
+                while not self._stop.is_set():
+                    # Wake up regularly so stop() is honoured promptly
+                    readable, _, _ = select.select([conn], [], [], 1.0)
+                    if not readable:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        change = self._parse(notify.payload)
+                        if change is not None:
+                            self._loop.call_soon_threadsafe(self._dispatch, change)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self._counters["reconnects"] += 1
+                print(f"Change feed connection lost, reconnecting in {self.reconnect_delay}s: {e}")
+            finally:
+                self._connected.clear()
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+            self._stop.wait(self.reconnect_delay)
+
+    @staticmethod
+    def _parse(payload: str) -> Optional[ExecutionChange]:
+        try:
+            data = json.loads(payload)
+            return ExecutionChange(
+                execution_id=data["id"],
+                namespace=data.get("namespace", ""),
+                flow_id=data.get("flow_id", ""),
+                state=data.get("state", ""),
+                deleted=bool(data.get("deleted", False))
+            )
+        except (ValueError, KeyError, TypeError):
+            print(f"Ignoring malformed change feed payload: {payload!r}")
+            return None
+
+    async def start(self):
+        """Start the listener thread bound to the running event loop."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._listen_forever,
+            name="execution-change-feed",
+            daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self):
+        """Stop listening and wait for the listener thread to exit."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        await asyncio.to_thread(self._thread.join, 5)
+        self._thread = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return listener state and counters."""
+        return {
+            "channel": self.channel,
+            "connected": self.connected,
+            "subscribers": len(self._subscribers),
+            **self._counters,
+        }
@@ -1,10 +1,348 @@
+import io
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
+import csv
+import json
+import uuid
+import time
+import base64
+import re
+import asyncio
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from importlib.util import find_spec
+from typing import List, Dict, Any, Optional, Tuple, Iterator, AsyncIterator
 
-load_dotenv()
+from env import load_env
+from metrics import timed_query
+
+
+if find_spec("orjson") is not None:
+    import orjson
+    ORJSON_AVAILABLE = True
+
+    def json_bytes(value: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON."""
+        return orjson.dumps(value)
+else:
+    ORJSON_AVAILABLE = False
+
+    def json_bytes(value: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON."""
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _psycopg2():
+    """Import psycopg2 on first use so that importing this module stays cheap."""
+    import psycopg2
+    import psycopg2.extras
+    return psycopg2
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class InvalidFieldSelection(ValueError):
+    """Raised when a requested execution field or preset is unknown."""
+
+
+class InvalidFilter(ValueError):
+    """Raised when a listing filter value cannot be parsed."""
+
+
+def _parse_timestamp(name: str, value: str) -> str:
+    """Check that a filter timestamp is ISO 8601 before it reaches Postgres."""
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise InvalidFilter(f"{name} must be an ISO 8601 timestamp, got {value!r}")
+    return value
+
+
+# Selectable execution fields and the SQL producing each one
+EXECUTION_FIELDS = {
+    "id": "id",
+    "namespace": "namespace",
+    "flow_id": "flow_id",
+    "state_current": "state_current",
+    "start_date": "start_date",
+    "end_date": "end_date",
+    "state_duration": "state_duration",
+    "inputs": "value->>'inputs' as inputs",
+    "outputs": "value->'outputs' as outputs",
+    "state": "value->'state' as state",
+}
+
+# Named field sets for listings; "full" matches the historical response
+FIELD_PRESETS = {
+    "summary": ["id", "namespace", "flow_id", "state_current", "start_date", "end_date", "state_duration"],
+    "full": ["id", "namespace", "flow_id", "state_current", "start_date", "end_date",
+             "state_duration", "inputs", "outputs", "state"],
+}
+
+# Nested JSONB paths may be requested as e.g. "outputs.final_price"
+_JSON_PATH_ROOTS = ("inputs", "outputs", "state")
+_JSON_PATH_SEGMENT = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def projection_fields(
+    fields: Optional[List[str]] = None,
+    preset: str = "full"
+) -> List[str]:
+    """
+    Names of the columns a listing returns, in order (id and start_date first).
+
+    Raises:
+        InvalidFieldSelection: For an unknown preset
+    """
+    if fields is None:
+        if preset not in FIELD_PRESETS:
+            raise InvalidFieldSelection(
+                f"Unknown preset {preset!r}; expected one of {sorted(FIELD_PRESETS)}"
+            )
+        fields = FIELD_PRESETS[preset]
+
+    selected = ["id", "start_date"] + [f for f in fields if f not in ("id", "start_date")]
+    return list(dict.fromkeys(selected))
+
+
+def build_projection(
+    fields: Optional[List[str]] = None,
+    preset: str = "full"
+) -> Tuple[str, List[Any]]:
+    """
+    Build the SELECT list for an execution listing.
+
+    id and start_date are always included because pagination needs them.
+
+    Args:
+        fields: Explicit field names or dotted JSONB paths (overrides preset)
+        preset: Name of a FIELD_PRESETS entry
+
+    Returns:
+        Tuple of (SQL select list, parameters it references)
+
+    Raises:
+        InvalidFieldSelection: For unknown fields, presets or malformed paths
+    """
+    columns: List[str] = []
+    params: List[Any] = []
+
+    for field in projection_fields(fields, preset):
+        if field in EXECUTION_FIELDS:
+            columns.append(EXECUTION_FIELDS[field])
+            continue
+
+        path = field.split(".")
+        if (
+            len(path) < 2
+            or path[0] not in _JSON_PATH_ROOTS
+            or not all(_JSON_PATH_SEGMENT.match(segment) for segment in path)
+        ):
+            raise InvalidFieldSelection(f"Unknown execution field {field!r}")
+        # Alias is built only from validated segments, so quoting is safe
+        columns.append(f'value #> %s as "{field}"')
+        params.append(path)
+
+    return ",\n                ".join(columns), params
+
+
+class PooledConnections:
+    """
+    Bounded, thread-safe Postgres connection pool.
+
+    Keeps returned connections idle for reuse (newest first) with:
+    - blocking checkout when all connections are in use (instead of an error)
+    - a liveness check on connections that sat idle for too long
+    - min_size connections opened up front on first use
+    - open/idle/in-use counts and counters exposed through stats()
+    """
+
+    def __init__(
+        self,
+        min_size: int,
+        max_size: int,
+        health_check_after: float = 30.0,
+        checkout_timeout: float = 10.0,
+        **connect_kwargs
+    ):
+        """
+        Initialize the pool. Connections are opened lazily on first checkout.
+
+        Args:
+            min_size: Connections opened on first checkout and kept warm
+            max_size: Hard upper bound on open connections
+            health_check_after: Idle seconds after which a connection is pinged before reuse
+            checkout_timeout: Seconds to wait for a free connection before failing
+            connect_kwargs: Arguments passed to psycopg2.connect
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min={min_size}, max={max_size}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+        self._connect_kwargs = connect_kwargs
+
+        # Everything below is guarded by _lock; connections are opened and
+        # pinged outside it. Each slot is one open or openable connection.
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle: List[Any] = []
+        self._open: set = set()
+        self._last_used: Dict[Any, float] = {}
+        self._warmed = False
+        self._counters = {
+            "checkouts": 0,
+            "waits": 0,
+            "health_checks": 0,
+            "discarded": 0,
+            "timeouts": 0,
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _connect(self):
+        conn = _psycopg2().connect(**self._connect_kwargs)
+        with self._lock:
+            self._open.add(conn)
+        return conn
+
+    def _close(self, conn):
+        with self._lock:
+            self._open.discard(conn)
+            self._last_used.pop(conn, None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _warm(self):
+        """Open min_size idle connections the first time the pool is used."""
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+        for _ in range(self.min_size):
+            conn = self._connect()
+            with self._lock:
+                self._idle.append(conn)
+                self._last_used[conn] = time.monotonic()
+
+    def _is_healthy(self, conn) -> bool:
+        """Ping a connection that has been idle longer than health_check_after."""
+        if conn.closed:
+            return False
+
+        with self._lock:
+            last_used = self._last_used.get(conn)
+        if last_used is not None and time.monotonic() - last_used < self.health_check_after:
+            return True
+
+        self._count("health_checks")
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        """
+        Check out a healthy connection, waiting if the pool is exhausted.
+
+        Returns:
+            An open psycopg2 connection
+
+        Raises:
+            TimeoutError: If no connection frees up within checkout_timeout
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count("waits")
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                self._count("timeouts")
+                raise TimeoutError(
+                    f"No database connection available within {self.checkout_timeout}s "
+                    f"(pool max={self.max_size})"
+                )
+
+        try:
+            self._warm()
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    conn = self._connect()
+                    break
+                if self._is_healthy(conn):
+                    break
+                self._count("discarded")
+                self._close(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+        self._count("checkouts")
+        return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            conn: Connection previously obtained from getconn()
+            discard: Close the connection instead of keeping it warm
+        """
+        try:
+            if not discard and not conn.closed:
+                # Leave no transaction open on an idle connection
+                conn.rollback()
+        except Exception:
+            discard = True
+
+        try:
+            with self._lock:
+                # Connections checked out before close() are not kept
+                keep = not (discard or conn.closed) and conn in self._open
+                if keep:
+                    self._idle.append(conn)
+                    self._last_used[conn] = time.monotonic()
+            if not keep:
+                self._count("discarded")
+                self._close(conn)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool sizing and usage counters."""
+        with self._lock:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "open": len(self._open),
+                "idle": len(self._idle),
+                "in_use": len(self._open) - len(self._idle),
+                **self._counters,
+            }
+
+    def close(self):
+        """Close every connection held by the pool."""
+        with self._lock:
+            connections = list(self._open)
+            self._open.clear()
+            self._idle.clear()
+            self._last_used.clear()
+            self._warmed = False
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
 
 
 class KestraDatabase:
@@ -18,18 +356,47 @@ class KestraDatabase:
         port: int = 5433,
         database: str = "kestra",
         user: str = "kestra",
-        password: str = "k3str4"
+        password: str = "k3str4",
+        pool_min_size: Optional[int] = None,
+        pool_max_size: Optional[int] = None
     ):
-        """Initialize database connection parameters."""
+        """
+        Initialize database connection parameters.
+
+        Args:
+            pool_min_size: Warm connections to keep (default: DB_POOL_MIN env or 1)
+            pool_max_size: Maximum open connections (default: DB_POOL_MAX env or 10)
+        """
         self.host = host
         self.port = port
         self.database = database
         self.user = user
         self.password = password
+        self._pool_min_size = pool_min_size
+        self._pool_max_size = pool_max_size
+        self._pool: Optional[PooledConnections] = None
+
+    @property
+    def pool(self) -> PooledConnections:
+        """Connection pool, configured from the environment on first use."""
+        if self._pool is None:
+            load_env()
+            self._pool = PooledConnections(
+                min_size=self._pool_min_size if self._pool_min_size is not None else int(os.getenv("DB_POOL_MIN", "1")),
+                max_size=self._pool_max_size if self._pool_max_size is not None else int(os.getenv("DB_POOL_MAX", "10")),
+                health_check_after=float(os.getenv("DB_POOL_HEALTH_CHECK_SECONDS", "30")),
+                checkout_timeout=float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10")),
+                host=self.host,
+                port=self.port,
+                database=self.database,
+                user=self.user,
+                password=self.password
+            )
+        return self._pool
 
     def get_connection(self):
-        """Create and return a database connection."""
-        return psycopg2.connect(
+        """Create and return a dedicated (unpooled) database connection."""
+        return _psycopg2().connect(
             host=self.host,
             port=self.port,
             database=self.database,
@@ -37,11 +404,69 @@ class KestraDatabase:
             password=self.password
         )
 
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a pooled connection for the duration of a with-block.
+
+        Connections that raised a database-level error are discarded
+        rather than returned to the pool.
+        """
+        psycopg2 = _psycopg2()
+        conn = self.pool.getconn()
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.pool.putconn(conn, discard=discard)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool statistics."""
+        return self.pool.stats()
+
+    def close(self):
+        """Close all pooled connections."""
+        if self._pool is not None:
+            self._pool.close()
+
+    MAX_PAGE_SIZE = 500
+
+    @staticmethod
+    def encode_cursor(start_date: str, execution_id: str, direction: str) -> str:
+        """Encode an opaque pagination token for a (start_date, id) position."""
+        payload = json.dumps({"d": start_date, "i": execution_id, "dir": direction})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str, str]:
+        """
+        Decode a pagination token.
+
+        Returns:
+            Tuple of (start_date, execution_id, direction)
+
+        Raises:
+            InvalidCursor: If the token is malformed
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction = payload["dir"]
+            if direction not in ("next", "prev"):
+                raise ValueError(direction)
+            return payload["d"], payload["i"], direction
+        except Exception:
+            raise InvalidCursor(f"Invalid pagination cursor: {cursor!r}")
+
     def get_executions(
         self,
         namespace: str = "agrilink",
         limit: int = 50,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        **filters
     ) -> List[Dict[str, Any]]:
         """
         Fetch executions from Kestra database.
@@ -50,58 +475,390 @@ class KestraDatabase:
             namespace: Namespace to filter executions (default: "agrilink")
             limit: Maximum number of executions to return
             flow_id: Optional flow ID to filter by
+            filters: Further get_executions_page filters (state, start_from, ...)
 
         Returns:
             List of execution dictionaries
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                query = """
+        return self.get_executions_page(
+            namespace=namespace, limit=limit, flow_id=flow_id, **filters
+        )["executions"]
+
+    @staticmethod
+    def _filter_clause(
+        namespace: str,
+        flow_id: Optional[str],
+        state: Optional[List[str]],
+        start_from: Optional[str],
+        start_to: Optional[str]
+    ) -> Tuple[str, List[Any]]:
+        """WHERE conditions (and their parameters) for the listing filters."""
+        conditions = ["deleted = false", "namespace = %s"]
+        params: List[Any] = [namespace]
+
+        if flow_id:
+            conditions.append("flow_id = %s")
+            params.append(flow_id)
+        if state:
+            conditions.append("state_current = ANY(%s)")
+            params.append(list(state))
+        if start_from:
+            conditions.append("start_date >= %s::timestamptz")
+            params.append(_parse_timestamp("start_from", start_from))
+        if start_to:
+            conditions.append("start_date < %s::timestamptz")
+            params.append(_parse_timestamp("start_to", start_to))
+        return " AND ".join(conditions), params
+
+    def _page_query(
+        self,
+        namespace: str,
+        limit: int,
+        flow_id: Optional[str],
+        state: Optional[List[str]],
+        start_from: Optional[str],
+        start_to: Optional[str],
+        cursor: Optional[str],
+        fields: Optional[List[str]],
+        preset: str
+    ) -> Tuple[str, List[Any], str]:
+        """
+        Build the keyset-paginated listing query shared by the page methods.
+
+        Fetches limit + 1 rows; the extra row tells whether another page exists.
+
+        Returns:
+            Tuple of (SQL, parameters, direction) where direction is "next" or "prev"
+        """
+        direction = "next"
+
+        columns, params = build_projection(fields, preset)
+        where, where_params = self._filter_clause(namespace, flow_id, state, start_from, start_to)
+        query = f"""
+            SELECT
+                {columns}
+            FROM executions
+            WHERE {where}
+        """
+        params.extend(where_params)
+
+        if cursor:
+            cursor_date, cursor_id, direction = self.decode_cursor(cursor)
+            comparison = "<" if direction == "next" else ">"
+            query += f" AND (start_date, id) {comparison} (%s::timestamptz, %s)"
+            params.extend([cursor_date, cursor_id])
+
+        order = "DESC" if direction == "next" else "ASC"
+        query += f" ORDER BY start_date {order}, id {order} LIMIT %s"
+        params.append(limit + 1)
+        return query, params, direction
+
+    @timed_query("executions_page", count_rows=lambda page: len(page["executions"]))
+    def get_executions_page(
+        self,
+        namespace: str = "agrilink",
+        limit: int = 50,
+        flow_id: Optional[str] = None,
+        state: Optional[List[str]] = None,
+        start_from: Optional[str] = None,
+        start_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        preset: str = "full"
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page of executions, newest first, using keyset pagination.
+
+        Pages are positioned on (start_date, id) rather than OFFSET, so
+        every page costs one index range scan regardless of its depth.
+
+        Args:
+            namespace: Namespace to filter executions (default: "agrilink")
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            flow_id: Optional flow ID to filter by
+            state: Optional list of current states to include
+            start_from: Optional inclusive lower bound on start_date (ISO 8601)
+            start_to: Optional exclusive upper bound on start_date (ISO 8601)
+            cursor: Token from a previous page's next_cursor / prev_cursor
+            fields: Explicit fields or JSONB paths to select (see EXECUTION_FIELDS)
+            preset: Field preset used when fields is not given ("summary" or "full")
+
+        Returns:
+            Dictionary with "executions", "next_cursor" (older rows) and
+            "prev_cursor" (newer rows); cursors are None at either end
+        """
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        query, params, direction = self._page_query(
+            namespace, limit, flow_id, state, start_from, start_to, cursor, fields, preset
+        )
+
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=_psycopg2().extras.RealDictCursor) as db_cursor:
+                db_cursor.execute(query, params)
+                results = db_cursor.fetchall()
+
+        has_more = len(results) > limit
+        results = results[:limit]
+        if direction == "prev":
+            results.reverse()
+
+        executions = []
+        for row in results:
+            execution = dict(row)
+
+            if execution.get('start_date'):
+                execution['start_date'] = execution['start_date'].isoformat()
+            if execution.get('end_date'):
+                execution['end_date'] = execution['end_date'].isoformat()
+
+            executions.append(execution)
+
+        next_cursor, prev_cursor = self._page_cursors(
+            (executions[0]['start_date'], executions[0]['id']) if executions else None,
+            (executions[-1]['start_date'], executions[-1]['id']) if executions else None,
+            has_more, direction, cursor
+        )
+
+        return {
+            "executions": executions,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
+        }
+
+    def _page_cursors(
+        self,
+        newest: Optional[Tuple[str, str]],
+        oldest: Optional[Tuple[str, str]],
+        has_more: bool,
+        direction: str,
+        cursor: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Cursors to the pages after and before one, from its (start_date, id) bounds."""
+        if newest is None or oldest is None:
+            return None, None
+        next_cursor = None
+        prev_cursor = None
+        if has_more or direction == "prev":
+            next_cursor = self.encode_cursor(oldest[0], oldest[1], "next")
+        if cursor and (has_more or direction == "next"):
+            prev_cursor = self.encode_cursor(newest[0], newest[1], "prev")
+        return next_cursor, prev_cursor
+
+    @timed_query("executions_page_json", count_rows=lambda page: page[1])
+    def get_executions_page_json(
+        self,
+        namespace: str = "agrilink",
+        limit: int = 50,
+        flow_id: Optional[str] = None,
+        state: Optional[List[str]] = None,
+        start_from: Optional[str] = None,
+        start_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        preset: str = "full"
+    ) -> Tuple[bytes, int]:
+        """
+        Fetch one page of executions as a ready-to-send JSON document.
+
+        Same filters, ordering and cursors as get_executions_page, but
+        Postgres renders the rows with json_agg (timestamps as ISO 8601)
+        and the text is passed through without being decoded, so no
+        per-row Python objects are built. Timestamps use Postgres' ISO
+        format, which drops trailing zeros in fractional seconds.
+
+        Returns:
+            Tuple of (UTF-8 JSON body with "success", "executions",
+            "next_cursor" and "prev_cursor"; number of executions in it)
+        """
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        query, params, direction = self._page_query(
+            namespace, limit, flow_id, state, start_from, start_to, cursor, fields, preset
+        )
+        order = "DESC" if direction == "next" else "ASC"
+        params.append(limit)
+
+        with self.connection() as conn:
+            with conn.cursor() as db_cursor:
+                db_cursor.execute(
+                    f"""
+                    WITH page AS ({query}),
+                    trimmed AS (
+                        SELECT * FROM page ORDER BY start_date {order}, id {order} LIMIT %s
+                    )
                     SELECT
-                        id,
-                        namespace,
-                        flow_id,
-                        state_current,
-                        start_date,
-                        end_date,
-                        state_duration,
-                        value->>'inputs' as inputs,
-                        value->'outputs' as outputs,
-                        value->'state' as state
-                    FROM executions
-                    WHERE deleted = false
-                        AND namespace = %s
-                """
+                        (SELECT count(*) FROM page),
+                        (SELECT coalesce(json_agg(t ORDER BY t.start_date DESC, t.id DESC), '[]'::json)
+                         FROM trimmed t)::text,
+                        (SELECT ARRAY[to_json(start_date) #>> '{{}}', id]
+                         FROM trimmed ORDER BY start_date DESC, id DESC LIMIT 1),
+                        (SELECT ARRAY[to_json(start_date) #>> '{{}}', id]
+                         FROM trimmed ORDER BY start_date ASC, id ASC LIMIT 1)
+                    """,
+                    params
+                )
+                fetched, executions, newest, oldest = db_cursor.fetchone()
 
-                params = [namespace]
+        next_cursor, prev_cursor = self._page_cursors(
+            tuple(newest) if newest else None,
+            tuple(oldest) if oldest else None,
+            fetched > limit, direction, cursor
+        )
+        body = b"".join([
+            b'{"success":true,"executions":',
+            executions.encode("utf-8"),
+            b',"next_cursor":', json_bytes(next_cursor),
+            b',"prev_cursor":', json_bytes(prev_cursor),
+            b"}",
+        ])
+        return body, min(fetched, limit)
 
-                if flow_id:
-                    query += " AND flow_id = %s"
-                    params.append(flow_id)
+    EXPORT_FORMATS = ("ndjson", "csv")
 
-                query += " ORDER BY start_date DESC LIMIT %s"
-                params.append(limit)
+    def iter_executions_export(
+        self,
+        namespace: str = "agrilink",
+        flow_id: Optional[str] = None,
+        state: Optional[List[str]] = None,
+        start_from: Optional[str] = None,
+        start_to: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        preset: str = "full",
+        format: str = "ndjson",
+        chunk_size: int = 1000
+    ) -> Iterator[bytes]:
+        """
+        Stream every matching execution, oldest first, as NDJSON or CSV.
 
-                cursor.execute(query, params)
-                results = cursor.fetchall()
+        Rows are read through a named (server-side) cursor in chunks of
+        chunk_size on a dedicated read-only connection, and each chunk is
+        encoded as soon as it arrives, so memory use does not grow with
+        the size of the export. Postgres renders each value (NDJSON lines
+        via row_to_json, CSV cells as JSON text with ISO timestamps).
 
-                executions = []
-                for row in results:
-                    execution = dict(row)
+        Arguments are validated immediately; the connection is opened on
+        the first chunk and closed when the iterator is exhausted or closed.
+        The first chunk runs the query and holds the first rows, so query
+        errors surface before anything has been yielded.
 
-                    if execution.get('start_date'):
-                        execution['start_date'] = execution['start_date'].isoformat()
-                    if execution.get('end_date'):
-                        execution['end_date'] = execution['end_date'].isoformat()
+        Args:
+            namespace, flow_id, state, start_from, start_to: Filters as in get_executions_page
+            fields: Explicit fields or JSONB paths to select (see EXECUTION_FIELDS)
+            preset: Field preset used when fields is not given
+            format: "ndjson" or "csv" (with a header row)
+            chunk_size: Rows fetched per round trip
 
-                    executions.append(execution)
+        Returns:
+            Iterator of encoded chunks
+        """
+        if format not in self.EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {format!r}; expected one of {list(self.EXPORT_FORMATS)}")
+        names = projection_fields(fields, preset)
+        columns, params = build_projection(fields, preset)
+        where, where_params = self._filter_clause(namespace, flow_id, state, start_from, start_to)
+        params.extend(where_params)
 
-                return executions
+        if format == "ndjson":
+            select = "row_to_json(t)::text"
+        else:
+            # Names were validated by build_projection, so quoting is safe
+            select = ", ".join(f"""to_json(t."{name}") #>> '{{}}'""" for name in names)
+        query = f"""
+            SELECT {select}
+            FROM (
+                SELECT
+                    {columns}
+                FROM executions
+                WHERE {where}
+            ) t
+            ORDER BY t.start_date, t.id
+        """
 
-        finally:
-            conn.close()
+        def encode_csv(rows) -> bytes:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            return buffer.getvalue().encode("utf-8")
+
+        def chunks() -> Iterator[bytes]:
+            conn = self.get_connection()
+            try:
+                conn.set_session(readonly=True)
+                with conn.cursor(name=f"export_{uuid.uuid4().hex}") as cursor:
+                    cursor.itersize = chunk_size
+                    cursor.execute(query, params)
+                    rows = cursor.fetchmany(chunk_size)
+                    if format == "csv":
+                        yield encode_csv([names] + rows)
+                        rows = cursor.fetchmany(chunk_size)
+                    while rows:
+                        if format == "ndjson":
+                            yield ("\n".join(row[0] for row in rows) + "\n").encode("utf-8")
+                        else:
+                            yield encode_csv(rows)
+                        rows = cursor.fetchmany(chunk_size)
+                conn.rollback()
+            finally:
+                conn.close()
+
+        return chunks()
+
+    MAX_IDS_PER_QUERY = 5000
+
+    @timed_query("executions_by_ids")
+    def get_executions_by_ids(
+        self,
+        execution_ids: List[str],
+        fields: Optional[List[str]] = None,
+        preset: str = "summary"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch many executions by ID in a single indexed query.
+
+        Args:
+            execution_ids: Execution IDs to fetch (at most MAX_IDS_PER_QUERY)
+            fields: Explicit fields or JSONB paths to select (see EXECUTION_FIELDS)
+            preset: Field preset used when fields is not given
+
+        Returns:
+            Dictionary mapping execution ID to execution dictionary; IDs not
+            found are absent
+        """
+        if not execution_ids:
+            return {}
+        if len(execution_ids) > self.MAX_IDS_PER_QUERY:
+            raise ValueError(
+                f"Too many execution IDs: {len(execution_ids)} (max {self.MAX_IDS_PER_QUERY})"
+            )
+
+        columns, params = build_projection(fields, preset)
+        params.append(list(execution_ids))
+
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=_psycopg2().extras.RealDictCursor) as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT
+                        {columns}
+                    FROM executions
+                    WHERE deleted = false AND id = ANY(%s)
+                    """,
+                    params
+                )
+                results = cursor.fetchall()
+
+        executions = {}
+        for row in results:
+            execution = dict(row)
+
+            if execution.get('start_date'):
+                execution['start_date'] = execution['start_date'].isoformat()
+            if execution.get('end_date'):
+                execution['end_date'] = execution['end_date'].isoformat()
+
+            executions[execution['id']] = execution
 
+        return executions
+
+    @timed_query("execution_by_id", count_rows=lambda execution: 1)
     def get_execution_by_id(self, execution_id: str) -> Optional[Dict[str, Any]]:
         """
         Fetch a single execution by ID.
@@ -112,9 +869,8 @@ class KestraDatabase:
         Returns:
             Execution dictionary or None if not found
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=_psycopg2().extras.RealDictCursor) as cursor:
                 cursor.execute(
                     """
                     SELECT
@@ -148,8 +904,82 @@ class KestraDatabase:
 
                 return execution
 
-        finally:
-            conn.close()
+
+class AsyncKestraDatabase:
+    """
+    Awaitable facade over KestraDatabase for use inside async handlers.
+
+    Queries run on worker threads against the shared pool, so the event
+    loop is never blocked while Postgres works.
+    """
+
+    def __init__(self, database: KestraDatabase):
+        self.sync = database
+
+    async def get_executions(
+        self,
+        namespace: str = "agrilink",
+        limit: int = 50,
+        flow_id: Optional[str] = None,
+        **filters
+    ) -> List[Dict[str, Any]]:
+        """Async variant of KestraDatabase.get_executions."""
+        return await asyncio.to_thread(
+            self.sync.get_executions, namespace=namespace, limit=limit, flow_id=flow_id, **filters
+        )
+
+    async def get_executions_page(self, **kwargs) -> Dict[str, Any]:
+        """Async variant of KestraDatabase.get_executions_page."""
+        return await asyncio.to_thread(self.sync.get_executions_page, **kwargs)
+
+    async def get_executions_page_json(self, **kwargs) -> Tuple[bytes, int]:
+        """Async variant of KestraDatabase.get_executions_page_json."""
+        return await asyncio.to_thread(self.sync.get_executions_page_json, **kwargs)
+
+    async def iter_executions_export(self, **kwargs) -> AsyncIterator[bytes]:
+        """
+        Async variant of KestraDatabase.iter_executions_export.
+
+        The query runs and the first chunk is fetched before this returns,
+        so invalid arguments and database errors raise here instead of
+        cutting off a response that has already started. Later chunks are
+        fetched on a worker thread only when the consumer asks for them,
+        so a slow client slows the export down instead of buffering it.
+        """
+        chunks = self.sync.iter_executions_export(**kwargs)
+        try:
+            first = await asyncio.to_thread(next, chunks, None)
+        except BaseException:
+            await asyncio.to_thread(chunks.close)
+            raise
+
+        async def stream():
+            try:
+                chunk = first
+                while chunk is not None:
+                    yield chunk
+                    chunk = await asyncio.to_thread(next, chunks, None)
+            finally:
+                await asyncio.to_thread(chunks.close)
+
+        return stream()
+
+    async def get_executions_by_ids(self, execution_ids: List[str], **kwargs) -> Dict[str, Dict[str, Any]]:
+        """Async variant of KestraDatabase.get_executions_by_ids."""
+        return await asyncio.to_thread(self.sync.get_executions_by_ids, execution_ids, **kwargs)
+
+    async def get_execution_by_id(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Async variant of KestraDatabase.get_execution_by_id."""
+        return await asyncio.to_thread(self.sync.get_execution_by_id, execution_id)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool statistics."""
+        return self.sync.pool_stats()
+
+    async def close(self):
+        """Close all pooled connections."""
+        await asyncio.to_thread(self.sync.close)
 
 
 db = KestraDatabase()
+async_db = AsyncKestraDatabase(db)
@@ -0,0 +1,192 @@
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+# Fields that change between otherwise identical requests (timestamps,
+# freshness counters) and must not affect the cache key
+VOLATILE_KEYS = {"fetchedAt", "ageSeconds", "lastIngestedAt", "refreshing", "timestamp", "requestId"}
+
+# Default lifetime per agent task, in seconds
+DEFAULT_TASK_TTLS = {
+    # Without a new photo the assessment only depends on commodity and region
+    "assess_quality": 24 * 3600,
+    # One market window: the local price store refreshes hourly
+    "market_intelligence": 1800,
+}
+
+
+def normalize(value: Any) -> Any:
+    """
+    Canonicalize prompt inputs for hashing.
+
+    Dict keys are sorted (by json.dumps) and volatile keys dropped, strings
+    are trimmed and whitespace-collapsed (case is kept: URLs are case
+    sensitive), numbers are rounded to 2 decimals, and JSON strings are
+    parsed so formatting differences in embedded documents do not change
+    the key.
+    """
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, float):
+        value = round(value, 2)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped[:1] in ("{", "["):
+            try:
+                return normalize(json.loads(stripped))
+            except ValueError:
+                pass
+        return " ".join(stripped.split())
+    return value
+
+
+def make_key(task: str, inputs: Dict[str, Any]) -> str:
+    """Content address of a task's prompt inputs."""
+    canonical = json.dumps(normalize(inputs), sort_keys=True, separators=(",", ":"), default=str)
+    return f"{task}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+class DecisionCache:
+    """
+    Content-addressed cache of AI agent decisions.
+
+    Keys hash the normalized prompt inputs of one agent task, so runs with
+    the same commodity, region and market snapshot reuse an earlier
+    decision. Entries expire after a per-task TTL and are evicted in LRU
+    order when the entry or byte budget is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        max_bytes: int = 50 * 1024 * 1024,
+        default_ttl_seconds: float = 3600,
+        task_ttls: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached decisions
+            max_bytes: Maximum total size of cached decisions (serialized JSON)
+            default_ttl_seconds: Lifetime for tasks without an entry in task_ttls
+            task_ttls: Lifetime per task name (default: DEFAULT_TASK_TTLS)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self.task_ttls = {**DEFAULT_TASK_TTLS, **(task_ttls or {})}
+
+        # key -> (decision, size, stored_at, expires_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._tasks: Dict[str, Dict[str, int]] = {}
+        self._counters = {
+            "evictions": 0,
+            "expirations": 0,
+            "bypassed": 0,
+        }
+
+    def knows_task(self, task: str) -> bool:
+        """Whether task is a known agent task (in DEFAULT_TASK_TTLS or the configured TTLs)."""
+        return task in self.task_ttls
+
+    def _task_counters(self, key: str) -> Dict[str, int]:
+        task = key.split(":", 1)[0]
+        return self._tasks.setdefault(task, {"hits": 0, "misses": 0, "stores": 0})
+
+    def _remove(self, key: str):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def lookup(self, key: str, bypass: bool = False) -> Tuple[bool, Optional[Any], Optional[float]]:
+        """
+        Look up a decision.
+
+        Args:
+            key: Key from make_key
+            bypass: Count as a miss without reading the cache (forces a fresh decision)
+
+        Returns:
+            Tuple of (hit, decision, age in seconds)
+        """
+        counters = self._task_counters(key)
+        if bypass:
+            self._counters["bypassed"] += 1
+            counters["misses"] += 1
+            return False, None, None
+
+        entry = self._entries.get(key)
+        if entry is not None and time.time() >= entry[3]:
+            self._remove(key)
+            self._counters["expirations"] += 1
+            entry = None
+        if entry is None:
+            counters["misses"] += 1
+            return False, None, None
+
+        self._entries.move_to_end(key)
+        counters["hits"] += 1
+        return True, entry[0], round(time.time() - entry[2], 1)
+
+    def store(self, key: str, decision: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Store a decision.
+
+        Args:
+            key: Key from make_key
+            decision: JSON-serializable agent output
+            ttl_seconds: Lifetime override (default: the task's TTL)
+
+        Returns:
+            False if the decision alone exceeds max_bytes and was not stored
+        """
+        size = len(json.dumps(decision, default=str))
+        if size > self.max_bytes:
+            return False
+
+        if ttl_seconds is None:
+            ttl_seconds = self.task_ttls.get(key.split(":", 1)[0], self.default_ttl_seconds)
+
+        if key in self._entries:
+            self._remove(key)
+        now = time.time()
+        self._entries[key] = (decision, size, now, now + ttl_seconds)
+        self._bytes += size
+        self._task_counters(key)["stores"] += 1
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._counters["evictions"] += 1
+        return True
+
+    def invalidate(self, key: str):
+        """Drop a cached decision."""
+        if key in self._entries:
+            self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size, eviction counters and per-task hit rates."""
+        tasks = {}
+        for task, counters in self._tasks.items():
+            lookups = counters["hits"] + counters["misses"]
+            tasks[task] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+        hits = sum(c["hits"] for c in self._tasks.values())
+        lookups = hits + sum(c["misses"] for c in self._tasks.values())
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "tasks": tasks,
+            **self._counters,
+        }
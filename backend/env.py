@@ -0,0 +1,27 @@
+import os
+
+_loaded = False
+
+
+def load_env():
+    """
+    Load backend/.env into the process environment, once.
+
+    python-dotenv is imported on first call rather than at module import,
+    so importing backend modules stays cheap.
+    """
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def env_flag(name: str, default: str = "false") -> bool:
+    """Read a boolean environment variable ("1", "true" or "yes")."""
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
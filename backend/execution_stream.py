@@ -0,0 +1,306 @@
+import json
+import asyncio
+from dataclasses import asdict
+from typing import Optional, Dict, Any, List, Set, Tuple, AsyncIterator
+
+from kestra_client import AgriLinkKestra, ExecutionResult
+from status_cache import ExecutionStatusCache
+
+
+class StreamLimitExceeded(Exception):
+    """Raised when the hub is already serving its maximum number of clients."""
+
+
+def format_sse(data: Dict[str, Any], event: str, event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Events message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def result_payload(result: ExecutionResult) -> Dict[str, Any]:
+    """Serialize an ExecutionResult the same way the REST endpoints do."""
+    return {
+        **asdict(result),
+        "is_success": result.is_success(),
+        "is_running": result.is_running(),
+    }
+
+
+class _UpstreamStream:
+    """State shared by every subscriber of one execution."""
+
+    def __init__(self, execution_id: str):
+        self.execution_id = execution_id
+        self.events: List[Tuple[int, ExecutionResult]] = []
+        self.next_seq = 1
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+        self.cleanup_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def last(self) -> Optional[ExecutionResult]:
+        return self.events[-1][1] if self.events else None
+
+
+class ExecutionStreamHub:
+    """
+    Fan-out of Kestra execution updates to Server-Sent Events clients.
+
+    Each execution has at most one upstream follow stream no matter how
+    many clients watch it. Recent events are kept per execution so that
+    reconnecting clients can resume from their Last-Event-ID.
+    """
+
+    def __init__(
+        self,
+        client: AgriLinkKestra,
+        status_cache: Optional[ExecutionStatusCache] = None,
+        max_streams: int = 500,
+        heartbeat_seconds: float = 15.0,
+        history_size: int = 100,
+        linger_seconds: float = 60.0,
+        poll_interval: float = 2.0
+    ):
+        """
+        Initialize the hub.
+
+        Args:
+            client: Kestra client providing follow_execution_async
+            status_cache: Status cache used when the follow stream is unavailable
+            max_streams: Maximum concurrently connected clients
+            heartbeat_seconds: Idle seconds before a heartbeat comment is sent
+            history_size: Events retained per execution for resuming
+            linger_seconds: How long an unwatched execution's history is kept
+            poll_interval: Seconds between status polls in fallback mode
+        """
+        self.client = client
+        self.status_cache = status_cache
+        self.max_streams = max_streams
+        self.heartbeat_seconds = heartbeat_seconds
+        self.history_size = history_size
+        self.linger_seconds = linger_seconds
+        self.poll_interval = poll_interval
+
+        self._streams: Dict[str, _UpstreamStream] = {}
+        self._subscriber_count = 0
+
+    def publish(self, execution_id: str, result: ExecutionResult):
+        """
+        Push a state update for an execution that has an active stream.
+
+        Updates that repeat the latest known state are ignored unless
+        they are terminal (to deliver final outputs).
+
+        Args:
+            execution_id: Kestra execution ID
+            result: New state of the execution
+        """
+        stream = self._streams.get(execution_id)
+        if stream is None or stream.done:
+            return
+
+        finished = not result.is_running()
+        last = stream.last
+        if last is not None and last.state == result.state and not finished:
+            return
+
+        seq = stream.next_seq
+        stream.next_seq += 1
+        stream.events.append((seq, result))
+        if len(stream.events) > self.history_size:
+            del stream.events[:-self.history_size]
+
+        if finished:
+            stream.done = True
+
+        for queue in stream.subscribers:
+            queue.put_nowait((seq, result))
+
+        if self.status_cache:
+            self.status_cache.put(result)
+
+    def on_change(self, execution_id: str):
+        """
+        React to an external change notification for an execution.
+
+        Executions nobody is watching are ignored; watched ones are
+        refreshed so subscribers see the new state (and final outputs).
+
+        Args:
+            execution_id: Kestra execution ID that changed
+        """
+        stream = self._streams.get(execution_id)
+        if stream is None or stream.done:
+            return
+        asyncio.ensure_future(self._refresh(execution_id))
+
+    async def _refresh(self, execution_id: str):
+        try:
+            if self.status_cache:
+                result = await self.status_cache.get(execution_id)
+            else:
+                result = await self.client.get_execution_status_async(execution_id)
+            self.publish(execution_id, result)
+        except Exception as e:
+            print(f"Status refresh for {execution_id} failed: {e}")
+
+    async def _run_upstream(self, stream: _UpstreamStream):
+        """
+        Follow one execution until it finishes.
+
+        Cancelled when the last subscriber leaves; the follow stream is
+        read asynchronously, so cancelling closes its connection at once.
+        """
+        try:
+            async for event in self.client.follow_execution_async(stream.execution_id):
+                self.publish(stream.execution_id, event)
+                if stream.done:
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Follow stream for {stream.execution_id} failed, polling instead: {e}")
+
+        # Fallback: the follow stream ended early or is unavailable
+        while not stream.done:
+            try:
+                if self.status_cache:
+                    result = await self.status_cache.get(stream.execution_id)
+                else:
+                    result = await self.client.get_execution_status_async(stream.execution_id)
+                self.publish(stream.execution_id, result)
+            except Exception as e:
+                print(f"Status poll for {stream.execution_id} failed: {e}")
+            if not stream.done:
+                await asyncio.sleep(self.poll_interval)
+
+    def _schedule_cleanup(self, stream: _UpstreamStream):
+        """Forget an unwatched execution after the linger period."""
+        loop = asyncio.get_running_loop()
+
+        def cleanup():
+            if not stream.subscribers and self._streams.get(stream.execution_id) is stream:
+                del self._streams[stream.execution_id]
+
+        stream.cleanup_handle = loop.call_later(self.linger_seconds, cleanup)
+
+    def subscribe(self, execution_id: str, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Return a client's SSE message iterator.
+
+        The connection limit is checked immediately so it can be refused
+        before any response is sent, but the client is only registered
+        (and the upstream started) once the iterator is first read, so a
+        client that disconnects before then holds no slot.
+
+        Args:
+            execution_id: Kestra execution ID to watch
+            last_event_id: Last event ID the client received, for resuming
+
+        Returns:
+            Async iterator of SSE-formatted strings
+
+        Raises:
+            StreamLimitExceeded: If max_streams clients are already connected
+        """
+        if self._subscriber_count >= self.max_streams:
+            raise StreamLimitExceeded(f"Too many open execution streams (max {self.max_streams})")
+        return self._iterate(execution_id, last_event_id)
+
+    def _register(self, execution_id: str, queue: asyncio.Queue) -> _UpstreamStream:
+        stream = self._streams.get(execution_id)
+        if stream is None:
+            stream = _UpstreamStream(execution_id)
+            self._streams[execution_id] = stream
+        if stream.cleanup_handle is not None:
+            stream.cleanup_handle.cancel()
+            stream.cleanup_handle = None
+
+        stream.subscribers.add(queue)
+        self._subscriber_count += 1
+
+        if not stream.done and (stream.task is None or stream.task.done()):
+            stream.task = asyncio.ensure_future(self._run_upstream(stream))
+        return stream
+
+    def _unregister(self, stream: _UpstreamStream, queue: asyncio.Queue):
+        stream.subscribers.discard(queue)
+        self._subscriber_count -= 1
+        if not stream.subscribers:
+            # Nobody is watching: stop following and keep history briefly
+            if stream.task is not None and not stream.task.done():
+                stream.task.cancel()
+            self._schedule_cleanup(stream)
+
+    async def _iterate(self, execution_id: str, last_event_id: Optional[int]) -> AsyncIterator[str]:
+        if self._subscriber_count >= self.max_streams:
+            # Lost a race for the last slot after subscribe() checked
+            yield format_sse({"error": f"Too many open execution streams (max {self.max_streams})"}, "error")
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        stream = self._register(execution_id, queue)
+        try:
+            yield f"retry: {int(self.poll_interval * 1000)}\n\n"
+
+            # Replay what the client missed. New clients, and clients whose
+            # cursor is outside the retained events (too old, or from before
+            # a restart), get the latest state instead.
+            events = stream.events
+            resumable = (
+                last_event_id is not None and bool(events)
+                and events[0][0] <= last_event_id + 1 and last_event_id <= events[-1][0]
+            )
+            backlog: List[Tuple[int, ExecutionResult]] = []
+            if resumable:
+                backlog = [(seq, r) for seq, r in events if seq > last_event_id]
+            if not backlog and (not resumable or stream.done):
+                backlog = events[-1:]
+
+            delivered = 0
+            for seq, result in backlog:
+                finished = not result.is_running()
+                yield format_sse(result_payload(result), "complete" if finished else "state", seq)
+                delivered = seq
+                if finished:
+                    return
+
+            while True:
+                try:
+                    seq, result = await asyncio.wait_for(queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if seq <= delivered:
+                    continue
+                delivered = seq
+
+                finished = not result.is_running()
+                yield format_sse(result_payload(result), "complete" if finished else "state", seq)
+                if finished:
+                    return
+        finally:
+            self._unregister(stream, queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return stream and subscriber counts."""
+        return {
+            "subscribers": self._subscriber_count,
+            "max_streams": self.max_streams,
+            "executions": len(self._streams),
+            "upstreams_active": sum(
+                1 for s in self._streams.values() if s.task is not None and not s.task.done()
+            ),
+        }
+
+    def close(self):
+        """Stop all upstream streams."""
+        for stream in self._streams.values():
+            if stream.task is not None:
+                stream.task.cancel()
@@ -0,0 +1,219 @@
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+from kestra_client import ExecutionResult
+
+
+@dataclass
+class _PendingExecution:
+    """Waiters and polling schedule for one execution"""
+    waiters: List[tuple] = field(default_factory=list)  # (future, deadline)
+    next_check: float = 0.0
+    interval: float = 0.0
+    last: Optional[ExecutionResult] = None
+
+
+class ExecutionWaiter:
+    """
+    Waits on many executions at once from a single background loop.
+
+    Each wait() call returns a future with its own deadline. Pending
+    executions are checked in batches through one status fetcher, with
+    per-execution back-off for long runs, and can be woken early by
+    notify() (e.g. from the change feed) or resolved directly by resolve().
+    """
+
+    def __init__(
+        self,
+        fetch_statuses: Callable[[List[str]], Awaitable[Dict[str, ExecutionResult]]],
+        poll_interval: float = 2.0,
+        max_poll_interval: float = 15.0,
+        batch_size: int = 200
+    ):
+        """
+        Initialize the waiter. The loop starts on the first wait().
+
+        Args:
+            fetch_statuses: Coroutine function mapping execution IDs to current results;
+                IDs it cannot resolve may be left out and are retried later
+            poll_interval: Initial seconds between checks of one execution
+            max_poll_interval: Upper bound for the backed-off check interval
+            batch_size: Maximum execution IDs per fetch_statuses call
+        """
+        self.fetch_statuses = fetch_statuses
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.batch_size = batch_size
+
+        self._pending: Dict[str, _PendingExecution] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._counters = {
+            "resolved": 0,
+            "timeouts": 0,
+            "fetches": 0,
+            "fetch_errors": 0,
+        }
+
+    def _ensure_running(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def wait(self, execution_id: str, timeout: float = 300) -> "asyncio.Future[ExecutionResult]":
+        """
+        Register interest in an execution's completion.
+
+        Args:
+            execution_id: Kestra execution ID
+            timeout: Seconds before the future fails with TimeoutError
+
+        Returns:
+            Future resolving to the final ExecutionResult
+        """
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+
+        pending = self._pending.get(execution_id)
+        if pending is None:
+            pending = _PendingExecution(next_check=time.monotonic(), interval=self.poll_interval)
+            self._pending[execution_id] = pending
+        pending.waiters.append((future, time.monotonic() + timeout))
+
+        self._wakeup.set()
+        return future
+
+    async def wait_for(self, execution_id: str, timeout: float = 300) -> ExecutionResult:
+        """
+        Wait for an execution to finish.
+
+        Args:
+            execution_id: Kestra execution ID
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Final ExecutionResult
+
+        Raises:
+            TimeoutError: If the execution is still running after timeout
+        """
+        future = self.wait(execution_id, timeout)
+        try:
+            return await future
+        finally:
+            if not future.done():
+                # Caller was cancelled; stop tracking this waiter
+                future.cancel()
+
+    def last_known(self, execution_id: str) -> Optional[ExecutionResult]:
+        """Return the latest status seen for a pending execution, if any."""
+        pending = self._pending.get(execution_id)
+        return pending.last if pending else None
+
+    def notify(self, execution_id: str):
+        """Check an execution on the next loop iteration (it probably changed)."""
+        pending = self._pending.get(execution_id)
+        if pending is not None:
+            pending.next_check = 0.0
+            pending.interval = self.poll_interval
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def resolve(self, result: ExecutionResult):
+        """Feed a known status; completes waiters if the execution has finished."""
+        pending = self._pending.get(result.execution_id)
+        if pending is None:
+            return
+        pending.last = result
+        if not result.is_running():
+            del self._pending[result.execution_id]
+            for future, _ in pending.waiters:
+                if not future.done():
+                    future.set_result(result)
+            self._counters["resolved"] += 1
+
+    def _expire(self, now: float):
+        """Fail waiters past their deadline and drop executions nobody waits on."""
+        for execution_id in list(self._pending):
+            pending = self._pending[execution_id]
+            remaining = []
+            for future, deadline in pending.waiters:
+                if future.done():
+                    continue
+                if now >= deadline:
+                    future.set_exception(TimeoutError(
+                        f"Execution {execution_id} did not complete in time"
+                    ))
+                    # Avoid "exception never retrieved" for abandoned futures
+                    future.exception()
+                    self._counters["timeouts"] += 1
+                    continue
+                remaining.append((future, deadline))
+            pending.waiters = remaining
+            if not remaining:
+                del self._pending[execution_id]
+
+    def _next_wakeup(self, now: float) -> Optional[float]:
+        times = [p.next_check for p in self._pending.values()]
+        times += [deadline for p in self._pending.values() for _, deadline in p.waiters]
+        return max(0.0, min(times) - now) if times else None
+
+    async def _check(self, due: List[str]):
+        for start in range(0, len(due), self.batch_size):
+            batch = due[start:start + self.batch_size]
+            self._counters["fetches"] += 1
+            try:
+                results = await self.fetch_statuses(batch)
+            except Exception as e:
+                self._counters["fetch_errors"] += 1
+                print(f"Execution status check failed for {len(batch)} executions: {e}")
+                continue
+            for result in results.values():
+                self.resolve(result)
+
+    async def _run(self):
+        """Background loop: check due executions, expire deadlines, sleep."""
+        while True:
+            now = time.monotonic()
+            self._expire(now)
+
+            due = [eid for eid, p in self._pending.items() if p.next_check <= now]
+            for execution_id in due:
+                pending = self._pending[execution_id]
+                pending.next_check = now + pending.interval
+                pending.interval = min(pending.interval * 1.5, self.max_poll_interval)
+            if due:
+                await self._check(due)
+                continue
+
+            self._wakeup.clear()
+            delay = self._next_wakeup(time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pending counts and loop counters."""
+        return {
+            "pending_executions": len(self._pending),
+            "pending_waiters": sum(len(p.waiters) for p in self._pending.values()),
+            **self._counters,
+        }
+
+    async def close(self):
+        """Stop the loop and cancel outstanding waiters."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for pending in self._pending.values():
+            for future, _ in pending.waiters:
+                future.cancel()
+        self._pending.clear()
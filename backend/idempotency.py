@@ -0,0 +1,161 @@
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple
+
+
+class IdempotencyConflict(ValueError):
+    """Raised when an idempotency key is reused with a different request."""
+
+
+def fingerprint(scope: str, payload: Dict[str, Any]) -> str:
+    """Stable hash of a launch request (scope plus canonical JSON of its payload)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{scope}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Maps idempotency keys to the execution their first request launched.
+
+    - Keys are scoped per endpoint; explicit keys (Idempotency-Key header)
+      live for ttl_seconds
+    - Requests without a key are only deduplicated by their body when
+      derived_ttl_seconds is set (off by default: two identical lots from
+      one farmer are legitimately separate sales)
+    - Concurrent requests with the same key share one launch, which runs
+      in its own task so a cancelled caller doesn't cancel it for the rest
+    - Failed launches are not remembered, so the client can retry
+    - Entries are evicted LRU beyond max_entries
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 50000,
+        ttl_seconds: float = 86400,
+        derived_ttl_seconds: float = 0
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum remembered keys before LRU eviction
+            ttl_seconds: Lifetime of entries for explicit keys
+            derived_ttl_seconds: Lifetime of entries for keys derived from the request
+                (0, the default, disables deduplication of requests without a key)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.derived_ttl_seconds = derived_ttl_seconds
+
+        # key -> (request fingerprint, result, expires_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[str, asyncio.Task]] = {}
+        self._counters = {
+            "launches": 0,
+            "replays": 0,
+            "coalesced": 0,
+            "conflicts": 0,
+            "evictions": 0,
+        }
+
+    def _lookup(self, key: str) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[2]:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put(self, key: str, request_hash: str, result: Any, ttl: float):
+        self._entries[key] = (request_hash, result, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    async def run(
+        self,
+        scope: str,
+        payload: Dict[str, Any],
+        idempotency_key: Optional[str],
+        launch: Callable[[], Awaitable[Any]],
+        reusable: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Launch once per key, replaying the original result for duplicates.
+
+        Args:
+            scope: Endpoint or flow the key belongs to
+            payload: Request fields that define the launch
+            idempotency_key: Client-supplied key, or None to derive one from payload
+            launch: Coroutine function creating the execution (or a ticket for it)
+            reusable: Checks a remembered result before replaying it; results it
+                rejects (e.g. launches that failed later) are forgotten and relaunched
+
+        Returns:
+            Tuple of (result of the original launch, True if this was a replay)
+
+        Raises:
+            IdempotencyConflict: If the key was used for a different request
+        """
+        request_hash = fingerprint(scope, payload)
+        if idempotency_key:
+            key, ttl = f"{scope}:key:{idempotency_key}", self.ttl_seconds
+        elif self.derived_ttl_seconds > 0:
+            key, ttl = f"{scope}:hash:{request_hash}", self.derived_ttl_seconds
+        else:
+            self._counters["launches"] += 1
+            return await launch(), False
+
+        entry = self._lookup(key)
+        if entry is not None and reusable is not None and not reusable(entry[1]):
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            if entry[0] != request_hash:
+                self._counters["conflicts"] += 1
+                raise IdempotencyConflict("Idempotency-Key was already used for a different request")
+            self._counters["replays"] += 1
+            return entry[1], True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if inflight[0] != request_hash:
+                self._counters["conflicts"] += 1
+                raise IdempotencyConflict("Idempotency-Key is in use by a different request")
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(inflight[1]), True
+
+        self._counters["launches"] += 1
+        task = asyncio.ensure_future(self._launch(key, request_hash, ttl, launch))
+        task.add_done_callback(_retrieve_exception)
+        self._inflight[key] = (request_hash, task)
+        return await asyncio.shield(task), False
+
+    async def _launch(self, key: str, request_hash: str, ttl: float, launch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await launch()
+            self._put(key, request_hash, result, ttl)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return store size and launch/replay counters."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            **self._counters,
+        }
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Mark retrieved so a failed launch nobody awaits any more doesn't log a warning
+    if not task.cancelled():
+        task.exception()
@@ -1,23 +1,41 @@
 
 import os
 import json
-from typing import Optional, Dict, Any
+import time
+import asyncio
+import functools
+from typing import Optional, Dict, Any, List, Callable, Awaitable
 from contextlib import asynccontextmanager
-from dotenv import load_dotenv
-
-load_dotenv()
 
 try:
-    from fastapi import FastAPI, HTTPException, BackgroundTasks
+    from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Header
+    from fastapi.responses import StreamingResponse, JSONResponse, Response, FileResponse
     from fastapi.middleware.cors import CORSMiddleware
-    from pydantic import BaseModel
+    from pydantic import BaseModel, ValidationError
     FASTAPI_AVAILABLE = True
 except ImportError:
     FASTAPI_AVAILABLE = False
     print("FastAPI not installed. Run: pip install fastapi uvicorn")
 
+from env import load_env, env_flag
 from kestra_client import AgriLinkKestra, ExecutionResult
-from database import db as kestra_db
+from database import db as kestra_sync_db, async_db as kestra_db, InvalidCursor, InvalidFieldSelection, InvalidFilter
+from status_cache import ExecutionStatusCache
+from execution_stream import ExecutionStreamHub, StreamLimitExceeded
+from change_feed import ExecutionChangeFeed, ExecutionChange
+from execution_waiter import ExecutionWaiter
+from market_store import (
+    MarketStore, COST_OF_PRODUCTION, DEMO_ANALYSIS, KNOWN_COMMODITIES, KNOWN_STATES, normalize_name
+)
+from market_health import compute_market_health, NUMPY_AVAILABLE
+from buyer_index import BuyerIndex
+from processor_ranker import ProcessorRanker
+from decision_cache import DecisionCache, make_key
+import metrics
+from profiling import RequestProfiler, ProfilingMiddleware, DEFAULT_PROFILE_DIR
+from analytics import ExecutionRollups
+from idempotency import IdempotencyStore, IdempotencyConflict
+from launch_scheduler import LaunchScheduler, LaunchTicket, LaunchQueueFull
 
 class SaleRequest(BaseModel):
     """Request model for starting a sale"""
@@ -33,6 +51,18 @@ class SaleRequest(BaseModel):
     wait: bool = False
 
 
+class SalesBatchRequest(BaseModel):
+    """Request model for bulk sale submission.
+
+    Rows are validated individually against SaleRequest so that one
+    malformed row (including one that is not an object) is reported in
+    its own result instead of failing the batch.
+    """
+    sales: List[Any]
+    # Accepted for compatibility; the launch scheduler's per-flow limit paces batches now
+    max_concurrency: int = 10
+
+
 class CrisisRequest(BaseModel):
     """Request model for crisis shield activation"""
     farmer_id: str
@@ -51,52 +81,451 @@ class MarketMonitorRequest(BaseModel):
     wait: bool = False
 
 
+class MarketIngestRequest(BaseModel):
+    """Request model for loading mandi records (data.gov.in shape) into the market store"""
+    records: List[Dict[str, Any]]
+    commodity: Optional[str] = None
+    state: Optional[str] = None
+
+
+class MarketHealthRequest(BaseModel):
+    """Request model for market health analytics (comma-separated lists, as in the market-monitor flow)"""
+    commodities: str = "Tomato,Potato,Onion"
+    states: str = "Maharashtra"
+    alert_threshold_percent: float = 15
+    days: int = 30
+    costs: Dict[str, float] = {}
+
+
+class DecisionLookupRequest(BaseModel):
+    """Request model for looking up a cached AI agent decision"""
+    task: str
+    inputs: Dict[str, Any]
+    bypass: bool = False
+
+
+class DecisionStoreRequest(BaseModel):
+    """Request model for caching an AI agent decision (by lookup key or by inputs)"""
+    task: str
+    decision: Any
+    key: Optional[str] = None
+    inputs: Optional[Dict[str, Any]] = None
+    ttl_seconds: Optional[float] = None
+
+
+class ProfilingRequest(BaseModel):
+    """Request model for arming the request profiler"""
+    sample_rate: float = 0.1
+    duration_seconds: float = 300
+    path_prefixes: List[str] = []
+
+
 class ExecutionResponse(BaseModel):
-    """Response model for execution results"""
-    execution_id: str
+    """Response model for execution results.
+
+    A launch still waiting in the launch scheduler has state QUEUED, no
+    execution_id (null) and a ticket_id: poll GET /api/tickets/{ticket_id}
+    (long-polls with ?timeout=) until it reports the execution_id.
+    """
+    execution_id: Optional[str] = None
     state: str
     namespace: str
     flow_id: str
     outputs: Optional[Dict[str, Any]] = None
     is_success: bool = False
     is_running: bool = False
+    ticket_id: Optional[str] = None
+
+
+class TicketResponse(BaseModel):
+    """Response model for a launch scheduler ticket"""
+    ticket_id: str
+    state: str
+    flow_id: str
+    execution_id: Optional[str] = None
+    queued_seconds: float
+    error: Optional[str] = None
+
+
+class ExecutionStatusBatchRequest(BaseModel):
+    """Request model for batch execution status lookup"""
+    ids: List[str]
+    include_outputs: bool = False
+    fallback_to_kestra: bool = True
+
+
+class ExecutionStatusBatchResponse(BaseModel):
+    """Response model for batch execution status lookup"""
+    results: List[ExecutionResponse]
+    missing: List[str]
+
+
+class BatchSaleItem(BaseModel):
+    """Outcome of one row in a bulk sale submission"""
+    index: int
+    success: bool
+    execution: Optional[ExecutionResponse] = None
+    error: Optional[str] = None
+
+
+class BatchSaleResponse(BaseModel):
+    """Response model for bulk sale submission"""
+    total: int
+    succeeded: int
+    failed: int
+    queued: int = 0
+    results: List[BatchSaleItem]
 
 
 kestra_client: Optional[AgriLinkKestra] = None
+status_cache: Optional[ExecutionStatusCache] = None
+stream_hub: Optional[ExecutionStreamHub] = None
+change_feed: Optional[ExecutionChangeFeed] = None
+execution_waiter: Optional[ExecutionWaiter] = None
+market_store: Optional[MarketStore] = None
+buyer_index: Optional[BuyerIndex] = None
+processor_ranker: Optional[ProcessorRanker] = None
+decision_cache: Optional[DecisionCache] = None
+request_profiler: Optional[RequestProfiler] = None
+# Limits concurrent exports (each holds a database connection while it streams)
+export_slots: Optional[asyncio.Semaphore] = None
+execution_rollups: Optional[ExecutionRollups] = None
+analytics_task: Optional[asyncio.Task] = None
+idempotency_store: Optional[IdempotencyStore] = None
+launch_scheduler: Optional[LaunchScheduler] = None
 
+# In-flight background refreshes of the market store, by (commodity, state)
+market_refreshes: Dict[tuple, asyncio.Task] = {}
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Initialize Kestra client on startup and deploy flows"""
-    global kestra_client
+# Read from the environment at startup, once .env has been loaded
+MAX_BATCH_SALES = 1000
+MAX_STATUS_BATCH = 5000
+MAX_STATUS_FALLBACK = 200
+MAX_HEALTH_PAIRS = 1000
+WAIT_TIMEOUT_SECONDS = 300.0
+EXECUTIONS_JSON_PASSTHROUGH = True
+EXPORT_CHUNK_SIZE = 1000
+MAX_CONCURRENT_EXPORTS = 4
+MARKET_COLD_REFRESH_TIMEOUT = 10.0
+ADMISSION_WAIT_SECONDS = 2.0
+LAUNCH_SLOT_TIMEOUT = 3600.0
+
+# Background initialization progress, reported by /health/ready
+startup_state: Dict[str, Any] = {
+    "phase": "starting",
+    "error": None,
+    "flows_total": None,
+    "flows_completed": 0,
+    "flows": {},
+    "elapsed_ms": None,
+}
+startup_task: Optional[asyncio.Task] = None
+
+
+def execution_from_row(row: Dict[str, Any]) -> ExecutionResult:
+    """Build an ExecutionResult from an executions table row."""
+    return ExecutionResult(
+        execution_id=row["id"],
+        state=row.get("state_current") or "UNKNOWN",
+        namespace=row.get("namespace") or AgriLinkKestra.NAMESPACE,
+        flow_id=row.get("flow_id") or "",
+        outputs=row.get("outputs")
+    )
+
+
+async def fetch_execution_statuses(
+    execution_ids: List[str],
+    include_outputs: bool = True,
+    fallback_to_kestra: bool = True
+) -> Dict[str, ExecutionResult]:
+    """
+    Fetch current statuses for a batch of executions.
+
+    Uses one id = ANY(...) query against Postgres, then the Kestra API
+    (through the status cache, with bounded concurrency) for IDs the
+    database does not have yet. IDs found nowhere are left out.
+
+    At most MAX_STATUS_FALLBACK IDs go to the Kestra API; the rest are
+    left out. If the database query fails for a batch larger than that,
+    its error is raised rather than fanning the whole batch out to Kestra.
+    """
+    results: Dict[str, ExecutionResult] = {}
+    fields = ["namespace", "flow_id", "state_current"] + (["outputs"] if include_outputs else [])
     try:
-        kestra_client = AgriLinkKestra()
-        print(f"✅ Connected to Kestra at {kestra_client.host}")
+        rows = await kestra_db.get_executions_by_ids(execution_ids, fields=fields)
+        for execution_id, row in rows.items():
+            result = execution_from_row(row)
+            results[execution_id] = result
+            if include_outputs and status_cache:
+                status_cache.put(result)
+    except Exception as e:
+        if len(execution_ids) > MAX_STATUS_FALLBACK:
+            raise
+        print(f"Batch status query failed, using Kestra API: {e}")
 
-        # Deploy all flows on startup
-        flows_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "kestra", "flows")
-        if os.path.exists(flows_dir):
-            print(f"📦 Deploying flows from {flows_dir}...")
+    missing = [eid for eid in execution_ids if eid not in results][:MAX_STATUS_FALLBACK]
+    if not missing or not fallback_to_kestra or not status_cache:
+        return results
+
+    semaphore = asyncio.Semaphore(kestra_client.max_connections)
+
+    async def fetch(execution_id: str) -> Optional[ExecutionResult]:
+        async with semaphore:
             try:
-                results = kestra_client.deploy_all_flows(flows_dir)
-                for flow_name, result in results.items():
-                    if result.get("success"):
-                        status_icon = "✅"
-                        status_msg = result.get("status", "deployed")
-                    else:
-                        status_icon = "⚠️"
-                        status_msg = f"error: {result.get('error', 'unknown')}"
-                    print(f"  {status_icon} {flow_name}: {status_msg}")
+                return await status_cache.get(execution_id)
             except Exception as e:
-                print(f"Flow deployment failed: {e}")
-                print("  Note: Flows can still be deployed manually via /api/deploy endpoint")
-        else:
-            print(f"⚠️ Flows directory not found: {flows_dir}")
+                print(f"Status check for {execution_id} failed: {e}")
+                return None
+
+    for result in await asyncio.gather(*(fetch(eid) for eid in missing)):
+        if result is not None:
+            results[result.execution_id] = result
+    return results
+
+
+async def wait_for_result(result: ExecutionResult, timeout: Optional[float] = None) -> ExecutionResult:
+    """
+    Wait for a just-launched execution through the shared waiter.
+
+    On timeout the latest known state is returned instead of an error.
+    """
+    if not result.is_running() or not execution_waiter:
+        return result
+    try:
+        return await execution_waiter.wait_for(result.execution_id, timeout or WAIT_TIMEOUT_SECONDS)
+    except TimeoutError:
+        return await status_cache.get(result.execution_id)
+
+
+async def release_launch_slot(result: ExecutionResult):
+    """Hold a launch scheduler slot until the execution finishes or LAUNCH_SLOT_TIMEOUT passes."""
+    if result.is_running() and execution_waiter:
+        await execution_waiter.wait_for(result.execution_id, LAUNCH_SLOT_TIMEOUT)
+
+
+async def initialize_backend(started: float):
+    """
+    Create the Kestra client and its helpers, then deploy flows.
+
+    Runs as a background task in fast-start mode so the server accepts
+    connections immediately; progress is tracked in startup_state.
+    """
+    global kestra_client, status_cache, stream_hub, change_feed, execution_waiter
+
+    startup_state["phase"] = "connecting"
+    try:
+        # kestrapy is imported here, off the event loop
+        client = await asyncio.to_thread(AgriLinkKestra)
+        cache = ExecutionStatusCache(
+            loader=client.get_execution_status_async,
+            max_entries=int(os.getenv("STATUS_CACHE_MAX_ENTRIES", "10000")),
+            running_ttl_seconds=float(os.getenv("STATUS_CACHE_RUNNING_TTL", "2"))
+        )
+        hub = ExecutionStreamHub(
+            client=client,
+            status_cache=cache,
+            max_streams=int(os.getenv("MAX_EXECUTION_STREAMS", "500")),
+            heartbeat_seconds=float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+        )
+        waiter = ExecutionWaiter(
+            fetch_statuses=fetch_execution_statuses,
+            poll_interval=float(os.getenv("WAIT_POLL_INTERVAL", "2"))
+        )
+
+        if env_flag("EXECUTION_CHANGE_FEED"):
+            feed = ExecutionChangeFeed(kestra_sync_db)
+
+            def invalidate_status(change: ExecutionChange):
+                cache.invalidate(change.execution_id)
+                hub.on_change(change.execution_id)
+                waiter.notify(change.execution_id)
+
+            feed.subscribe(invalidate_status)
+            feed.on_connect(cache.invalidate_running)
+            await feed.start()
+            # Changes are pushed, so running entries no longer need a short TTL
+            cache.running_ttl_seconds = float(os.getenv("STATUS_CACHE_RUNNING_TTL_WITH_FEED", "300"))
+            change_feed = feed
+            print(f"📡 Listening for execution changes on '{feed.channel}'")
+
+        kestra_client, status_cache, stream_hub, execution_waiter = client, cache, hub, waiter
+        print(f"✅ Connected to Kestra at {kestra_client.host}")
     except Exception as e:
         print(f"Failed to initialize Kestra client: {e}")
-        kestra_client = None
+        startup_state.update(phase="failed", error=str(e))
+        startup_state["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return
+
+    # Deploy all flows on startup
+    flows_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "kestra", "flows")
+    if os.path.exists(flows_dir):
+        print(f"📦 Deploying flows from {flows_dir}...")
+        startup_state["phase"] = "deploying"
+
+        def on_progress(flow_name: str, result: Dict[str, Any], completed: int, total: int):
+            startup_state["flows_total"] = total
+            startup_state["flows_completed"] = completed
+            if result.get("success"):
+                startup_state["flows"][flow_name] = result.get("status", "deployed")
+                status_icon = "✅"
+                status_msg = f"{result.get('status', 'deployed')} ({result.get('duration_ms')} ms)"
+            else:
+                startup_state["flows"][flow_name] = "error"
+                status_icon = "⚠️"
+                status_msg = f"error: {result.get('error', 'unknown')}"
+            print(f"  {status_icon} {flow_name}: {status_msg}")
+
+        try:
+            await asyncio.to_thread(kestra_client.deploy_all_flows, flows_dir, on_progress=on_progress)
+        except Exception as e:
+            print(f"Flow deployment failed: {e}")
+            print("  Note: Flows can still be deployed manually via /api/deploy endpoint")
+            startup_state["error"] = f"Flow deployment failed: {e}"
+    else:
+        print(f"⚠️ Flows directory not found: {flows_dir}")
+
+    startup_state["phase"] = "ready"
+    startup_state["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def refresh_analytics_periodically(interval: float):
+    """
+    Keep the execution rollups current.
+
+    Refreshes back to back while a backlog of changes remains, otherwise
+    every interval seconds. Failures (e.g. migrations not yet applied)
+    are logged once until the next success.
+    """
+    last_error = None
+    while True:
+        try:
+            result = await asyncio.to_thread(execution_rollups.refresh)
+            last_error = None
+            if result.get("pending"):
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if str(e) != last_error:
+                print(f"Analytics refresh failed: {e}")
+                last_error = str(e)
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialize Kestra client on startup and deploy flows.
+
+    In fast-start mode (AGRILINK_FAST_START, on by default) this happens
+    in a background task and the server starts serving immediately;
+    otherwise startup waits for it as before.
+    """
+    global kestra_client, status_cache, stream_hub, change_feed, execution_waiter
+    global startup_task, MAX_BATCH_SALES, MAX_STATUS_BATCH, MAX_STATUS_FALLBACK, WAIT_TIMEOUT_SECONDS
+    global market_store, buyer_index, processor_ranker, decision_cache, MAX_HEALTH_PAIRS
+    global request_profiler, EXECUTIONS_JSON_PASSTHROUGH, EXPORT_CHUNK_SIZE, MARKET_COLD_REFRESH_TIMEOUT
+    global MAX_CONCURRENT_EXPORTS, export_slots
+    global execution_rollups, analytics_task, idempotency_store
+    global launch_scheduler, ADMISSION_WAIT_SECONDS, LAUNCH_SLOT_TIMEOUT
+
+    started = time.perf_counter()
+    load_env()
+    market_store = MarketStore()
+    buyer_index = BuyerIndex()
+    processor_ranker = ProcessorRanker()
+    decision_cache = DecisionCache(
+        max_entries=int(os.getenv("DECISION_CACHE_MAX_ENTRIES", "5000")),
+        max_bytes=int(os.getenv("DECISION_CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+        default_ttl_seconds=float(os.getenv("DECISION_CACHE_TTL", "3600")),
+        # e.g. "assess_quality=86400,market_intelligence=1800"
+        task_ttls={
+            task.strip(): float(ttl)
+            for task, ttl in (
+                item.split("=", 1) for item in os.getenv("DECISION_CACHE_TTLS", "").split(",") if "=" in item
+            )
+        }
+    )
+    request_profiler = RequestProfiler(
+        admin_token=os.getenv("PROFILE_ADMIN_TOKEN", ""),
+        directory=os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR),
+        max_profiles=int(os.getenv("PROFILE_MAX_FILES", "50")),
+        max_profile_seconds=float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+    )
+    MAX_BATCH_SALES = int(os.getenv("MAX_BATCH_SALES", "1000"))
+    WAIT_TIMEOUT_SECONDS = float(os.getenv("WAIT_TIMEOUT_SECONDS", "300"))
+    MAX_HEALTH_PAIRS = int(os.getenv("MAX_HEALTH_PAIRS", "1000"))
+    EXECUTIONS_JSON_PASSTHROUGH = env_flag("EXECUTIONS_JSON_PASSTHROUGH", "true")
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+    MAX_CONCURRENT_EXPORTS = int(os.getenv("MAX_CONCURRENT_EXPORTS", "4"))
+    export_slots = asyncio.Semaphore(MAX_CONCURRENT_EXPORTS)
+    MARKET_COLD_REFRESH_TIMEOUT = float(os.getenv("MARKET_COLD_REFRESH_TIMEOUT", "10"))
+    MAX_STATUS_BATCH = min(
+        int(os.getenv("MAX_STATUS_BATCH", "5000")),
+        kestra_sync_db.MAX_IDS_PER_QUERY
+    )
+    MAX_STATUS_FALLBACK = int(os.getenv("MAX_STATUS_FALLBACK", "200"))
+
+    idempotency_store = IdempotencyStore(
+        max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "50000")),
+        ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL", "86400")),
+        derived_ttl_seconds=float(os.getenv("IDEMPOTENCY_DERIVED_TTL", "0"))
+    )
+    ADMISSION_WAIT_SECONDS = float(os.getenv("LAUNCH_ADMISSION_WAIT", "2"))
+    LAUNCH_SLOT_TIMEOUT = float(os.getenv("LAUNCH_SLOT_TIMEOUT", "3600"))
+    launch_scheduler = LaunchScheduler(
+        release_when=release_launch_slot,
+        max_in_flight=int(os.getenv("LAUNCH_MAX_IN_FLIGHT", "50")),
+        # e.g. "crisis-shield=20,main-sale-workflow=30,market-monitor=5"
+        flow_limits={
+            flow.strip(): int(limit)
+            for flow, limit in (
+                item.split("=", 1) for item in os.getenv("LAUNCH_FLOW_LIMITS", "").split(",") if "=" in item
+            )
+        },
+        max_queued=int(os.getenv("LAUNCH_QUEUE_MAX", "10000"))
+    )
+    # Opt-in like the change feed: needs migration 004 applied with the flag on
+    if env_flag("EXECUTION_ANALYTICS"):
+        execution_rollups = ExecutionRollups(batch_size=int(os.getenv("ANALYTICS_BATCH_SIZE", "5000")))
+        analytics_interval = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "60"))
+        if analytics_interval > 0:
+            analytics_task = asyncio.ensure_future(refresh_analytics_periodically(analytics_interval))
+
+    startup_task = asyncio.ensure_future(initialize_backend(started))
+    if not env_flag("AGRILINK_FAST_START", "true"):
+        await startup_task
+
     yield
+
+    if not startup_task.done():
+        startup_task.cancel()
+        try:
+            await startup_task
+        except asyncio.CancelledError:
+            pass
+    for task in list(market_refreshes.values()):
+        task.cancel()
+    if analytics_task:
+        analytics_task.cancel()
+        analytics_task = None
+    if change_feed:
+        await change_feed.stop()
+        change_feed = None
+    if launch_scheduler:
+        await launch_scheduler.close()
+        launch_scheduler = None
+    if execution_waiter:
+        await execution_waiter.close()
+        execution_waiter = None
+    if stream_hub:
+        stream_hub.close()
+    if kestra_client:
+        await kestra_client.aclose()
     kestra_client = None
+    status_cache = None
+    stream_hub = None
+    await kestra_db.close()
 
 
 if FASTAPI_AVAILABLE:
@@ -114,9 +543,11 @@ if FASTAPI_AVAILABLE:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(ProfilingMiddleware, get_profiler=lambda: request_profiler)
+    app.add_middleware(metrics.MetricsMiddleware)
 
 
-def convert_result(result: ExecutionResult) -> ExecutionResponse:
+def convert_result(result: ExecutionResult, ticket_id: Optional[str] = None) -> ExecutionResponse:
     """Convert internal ExecutionResult to API response"""
     return ExecutionResponse(
         execution_id=result.execution_id,
@@ -125,23 +556,181 @@ def convert_result(result: ExecutionResult) -> ExecutionResponse:
         flow_id=result.flow_id,
         outputs=result.outputs,
         is_success=result.is_success(),
-        is_running=result.is_running()
+        is_running=result.is_running(),
+        ticket_id=ticket_id
+    )
+
+
+async def admit(
+    flow_id: str,
+    farmer_id: Optional[str],
+    launch: Callable[[], Awaitable[ExecutionResult]]
+) -> LaunchTicket:
+    """
+    Queue a launch with the scheduler and give it ADMISSION_WAIT_SECONDS to start.
+
+    Raises if the launch itself failed, so the failure is not remembered
+    as the outcome of an idempotent request.
+    """
+    ticket = await launch_scheduler.submit(flow_id, farmer_id, launch)
+    await ticket.wait_launched(ADMISSION_WAIT_SECONDS)
+    if ticket.state == "FAILED":
+        raise RuntimeError(ticket.error)
+    return ticket
+
+
+async def launch_once(
+    scope: str,
+    request: BaseModel,
+    idempotency_key: Optional[str],
+    flow_id: str,
+    farmer_id: Optional[str],
+    launch: Callable[[], Awaitable[ExecutionResult]],
+    response: "Response"
+) -> LaunchTicket:
+    """
+    Queue a launch unless an equivalent request already did.
+
+    Requests are matched by Idempotency-Key, or by a hash of the request
+    body when no key is sent; duplicates get the original ticket without
+    contacting Kestra and an Idempotent-Replayed: true header.
+    """
+    payload = request.model_dump(exclude={"wait"})
+    if idempotency_store is None:
+        return await admit(flow_id, farmer_id, launch)
+    ticket, replayed = await idempotency_store.run(
+        scope, payload, idempotency_key, lambda: admit(flow_id, farmer_id, launch),
+        # A ticket that failed or was cancelled after admission must not be replayed
+        reusable=lambda ticket: ticket.state not in ("FAILED", "CANCELLED")
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return ticket
+
+
+def queued_response(ticket: LaunchTicket) -> ExecutionResponse:
+    """Response for a launch still waiting in the scheduler queue."""
+    return ExecutionResponse(
+        execution_id=None,
+        state="QUEUED",
+        namespace=AgriLinkKestra.NAMESPACE,
+        flow_id=ticket.flow_id,
+        is_running=True,
+        ticket_id=ticket.ticket_id
     )
 
 
+async def ticket_response(ticket: LaunchTicket, wait: bool, response: "Response") -> ExecutionResponse:
+    """
+    Respond for a launch ticket.
+
+    Launched tickets return the execution (after it finishes when wait
+    is set, as before). Tickets still queued return state QUEUED with
+    HTTP 202; resolve them through /api/tickets/{ticket_id}.
+    """
+    if wait:
+        await ticket.wait_launched(WAIT_TIMEOUT_SECONDS)
+    if ticket.state in ("FAILED", "CANCELLED"):
+        raise RuntimeError(ticket.error or f"Launch {ticket.state.lower()}")
+    if ticket.result is None:
+        response.status_code = 202
+        return queued_response(ticket)
+    result = await wait_for_result(ticket.result) if wait else ticket.result
+    return convert_result(result, ticket.ticket_id)
+
+
+def require_admin(request: "Request") -> RequestProfiler:
+    """Return the request profiler if the X-Admin-Token header is valid."""
+    if request_profiler is None or not request_profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILE_ADMIN_TOKEN)")
+    if not request_profiler.authorized(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    return request_profiler
+
+
+def require_known_task(task: str):
+    """Reject decision cache calls for tasks it has no TTL for (keeps per-task stats bounded)."""
+    if not decision_cache.knows_task(task):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown task {task!r}; expected one of {sorted(decision_cache.task_ttls)}"
+        )
+
+
+def schedule_market_refresh(commodity: str, state: str) -> bool:
+    """
+    Refresh a commodity/state pair from data.gov.in in the background.
+
+    At most one refresh per pair runs at a time; failures are logged and
+    recorded in the store's freshness metadata.
+
+    Returns:
+        True if a new refresh was started
+    """
+    if market_store is None or not market_store.api_key:
+        return False
+
+    key = (commodity.lower(), state.lower())
+    if key in market_refreshes:
+        return False
+
+    async def run():
+        try:
+            counts = await asyncio.to_thread(market_store.refresh, commodity, state)
+            print(f"📈 Refreshed market prices for {commodity}/{state}: {counts['ingested']} records")
+        except Exception as e:
+            print(f"Market refresh for {commodity}/{state} failed: {e}")
+        finally:
+            market_refreshes.pop(key, None)
+
+    market_refreshes[key] = asyncio.ensure_future(run())
+    return True
+
+
 if FASTAPI_AVAILABLE:
     @app.get("/health")
     async def health_check():
         """Health check endpoint"""
         return {
             "status": "healthy",
+            "ready": startup_state["phase"] == "ready",
             "kestra_connected": kestra_client is not None,
             "kestra_host": kestra_client.host if kestra_client else None
         }
 
 
+    @app.get("/health/live")
+    async def liveness_check():
+        """Liveness probe: the process is up and serving requests."""
+        return {"status": "alive"}
+
+
+    @app.get("/health/ready")
+    async def readiness_check():
+        """
+        Readiness probe.
+
+        Returns 200 once the Kestra client is initialized and startup flow
+        deployment has finished, 503 before that. The body reports
+        deployment progress either way.
+        """
+        ready = startup_state["phase"] == "ready"
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={
+                "status": "ready" if ready else "not_ready",
+                "kestra_connected": kestra_client is not None,
+                **startup_state
+            }
+        )
+
+
     @app.post("/api/sale", response_model=ExecutionResponse)
-    async def start_sale(request: SaleRequest):
+    async def start_sale(
+        request: SaleRequest,
+        response: Response,
+        idempotency_key: Optional[str] = Header(None)
+    ):
         """
         Start a new sale workflow.
 
@@ -150,109 +739,349 @@ if FASTAPI_AVAILABLE:
         2. Fetches market data from data.gov.in
         3. AI decides: Normal negotiation or Crisis Shield
         4. Executes appropriate sub-workflow
+
+        Retries with the same Idempotency-Key header return the original
+        execution (identical bodies without a key only when
+        IDEMPOTENCY_DERIVED_TTL is set).
+        Launches go through the launch scheduler; if no slot frees up
+        quickly the response is QUEUED (HTTP 202) with a ticket_id.
         """
         if not kestra_client:
             raise HTTPException(status_code=503, detail="Kestra client not initialized")
 
-        # DEBUG: Log what we're receiving
-        print(f"[DEBUG] /api/sale received:")
-        print(f"  farmer_id: {request.farmer_id}")
-        print(f"  cost_of_production: {request.cost_of_production} (type: {type(request.cost_of_production)})")
-
         try:
-            result = kestra_client.start_sale(
-                farmer_id=request.farmer_id,
-                farmer_name=request.farmer_name,
-                farmer_phone=request.farmer_phone,
-                commodity=request.commodity,
-                quantity_kg=request.quantity_kg,
-                state=request.state,
-                district=request.district,
-                crop_image_url=request.crop_image_url,
-                cost_of_production=request.cost_of_production,
-                wait=request.wait
+            ticket = await launch_once(
+                "sale", request, idempotency_key,
+                AgriLinkKestra.FLOW_MAIN_SALE, request.farmer_id,
+                lambda: kestra_client.start_sale_async(
+                    farmer_id=request.farmer_id,
+                    farmer_name=request.farmer_name,
+                    farmer_phone=request.farmer_phone,
+                    commodity=request.commodity,
+                    quantity_kg=request.quantity_kg,
+                    state=request.state,
+                    district=request.district,
+                    crop_image_url=request.crop_image_url,
+                    cost_of_production=request.cost_of_production,
+                    wait=False
+                ),
+                response
             )
-            return convert_result(result)
+            return await ticket_response(ticket, request.wait, response)
+        except IdempotencyConflict as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except LaunchQueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
 
+    @app.post("/api/sales/batch", response_model=BatchSaleResponse)
+    async def start_sales_batch(request: SalesBatchRequest):
+        """
+        Start many sale workflows in one call.
+
+        Rows go through the launch scheduler like single launches, so a
+        batch obeys the per-flow limit, priority and per-farmer round-robin
+        instead of launching all at once. Every row gets its own result or
+        error: the execution if it started within the admission wait,
+        otherwise state QUEUED with a ticket_id to poll. Rows past the
+        queue limit fail individually. Rows are never waited on to finish.
+        """
+        if not kestra_client:
+            raise HTTPException(status_code=503, detail="Kestra client not initialized")
+
+        if len(request.sales) > MAX_BATCH_SALES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch too large: {len(request.sales)} sales (max {MAX_BATCH_SALES})"
+            )
+
+        items: List[Optional[BatchSaleItem]] = [None] * len(request.sales)
+        valid_indexes = []
+        launches = []
+        for index, row in enumerate(request.sales):
+            if not isinstance(row, dict):
+                items[index] = BatchSaleItem(
+                    index=index,
+                    success=False,
+                    error=f"Sale must be a JSON object, got {type(row).__name__}"
+                )
+                continue
+            try:
+                sale = SaleRequest.model_validate(row)
+            except ValidationError as e:
+                items[index] = BatchSaleItem(index=index, success=False, error=str(e))
+                continue
+            valid_indexes.append(index)
+            launches.append((
+                sale.farmer_id,
+                functools.partial(
+                    kestra_client.start_sale_async,
+                    **sale.model_dump(exclude={"wait"}),
+                    wait=False
+                )
+            ))
+
+        outcomes = await launch_scheduler.submit_batch(AgriLinkKestra.FLOW_MAIN_SALE, launches)
+        tickets = [t for t in outcomes if isinstance(t, LaunchTicket)]
+        # The whole batch shares one admission wait
+        await asyncio.gather(*(t.wait_launched(ADMISSION_WAIT_SECONDS) for t in tickets))
+
+        for index, outcome in zip(valid_indexes, outcomes):
+            if isinstance(outcome, LaunchQueueFull):
+                items[index] = BatchSaleItem(index=index, success=False, error=str(outcome))
+            elif outcome.result is not None:
+                items[index] = BatchSaleItem(
+                    index=index,
+                    success=True,
+                    execution=convert_result(outcome.result, outcome.ticket_id)
+                )
+            elif outcome.state in ("FAILED", "CANCELLED"):
+                items[index] = BatchSaleItem(
+                    index=index,
+                    success=False,
+                    error=outcome.error or f"Launch {outcome.state.lower()}"
+                )
+            else:
+                items[index] = BatchSaleItem(index=index, success=True, execution=queued_response(outcome))
+
+        succeeded = sum(1 for item in items if item.success)
+        return BatchSaleResponse(
+            total=len(items),
+            succeeded=succeeded,
+            failed=len(items) - succeeded,
+            queued=sum(1 for item in items if item.execution and item.execution.state == "QUEUED"),
+            results=items
+        )
+
+
     @app.post("/api/crisis", response_model=ExecutionResponse)
-    async def activate_crisis_shield(request: CrisisRequest):
+    async def activate_crisis_shield(
+        request: CrisisRequest,
+        response: Response,
+        idempotency_key: Optional[str] = Header(None)
+    ):
         """
         Directly activate Crisis Shield workflow.
         
         Use this when market prices have crashed and immediate
-        diversion to food processors is needed.
+        diversion to food processors is needed. Duplicate requests are
+        handled as for /api/sale.
         """
         if not kestra_client:
             raise HTTPException(status_code=503, detail="Kestra client not initialized")
         
         try:
-            result = kestra_client.start_crisis_shield(
-                farmer_id=request.farmer_id,
-                commodity=request.commodity,
-                quantity_kg=request.quantity_kg,
-                state=request.state,
-                district=request.district,
-                quality_grade=request.quality_grade,
-                wait=request.wait
+            ticket = await launch_once(
+                "crisis", request, idempotency_key,
+                AgriLinkKestra.FLOW_CRISIS_SHIELD, request.farmer_id,
+                lambda: kestra_client.start_crisis_shield_async(
+                    farmer_id=request.farmer_id,
+                    commodity=request.commodity,
+                    quantity_kg=request.quantity_kg,
+                    state=request.state,
+                    district=request.district,
+                    quality_grade=request.quality_grade,
+                    wait=False
+                ),
+                response
             )
-            return convert_result(result)
+            return await ticket_response(ticket, request.wait, response)
+        except IdempotencyConflict as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except LaunchQueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
 
     @app.post("/api/monitor", response_model=ExecutionResponse)
-    async def start_market_monitor(request: MarketMonitorRequest):
+    async def start_market_monitor(
+        request: MarketMonitorRequest,
+        response: Response,
+        idempotency_key: Optional[str] = Header(None)
+    ):
         """
         Start market monitoring workflow.
         
         Monitors prices for specified commodities and generates alerts.
+        Duplicate requests are handled as for /api/sale.
         """
         if not kestra_client:
             raise HTTPException(status_code=503, detail="Kestra client not initialized")
         
         try:
-            result = kestra_client.start_market_monitor(
-                commodities=request.commodities,
-                state=request.state,
-                wait=request.wait
+            ticket = await launch_once(
+                "monitor", request, idempotency_key,
+                AgriLinkKestra.FLOW_MARKET_MONITOR, None,
+                lambda: kestra_client.start_market_monitor_async(
+                    commodities=request.commodities,
+                    state=request.state,
+                    wait=False
+                ),
+                response
             )
-            return convert_result(result)
+            return await ticket_response(ticket, request.wait, response)
+        except IdempotencyConflict as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except LaunchQueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
 
+    @app.get("/api/tickets/{ticket_id}", response_model=TicketResponse)
+    async def get_ticket(ticket_id: str, timeout: float = 0):
+        """
+        Resolve a launch ticket to its Kestra execution ID.
+
+        With timeout, waits up to that many seconds for a queued launch
+        to start before answering.
+        """
+        if launch_scheduler is None:
+            raise HTTPException(status_code=503, detail="Launch scheduler not initialized")
+
+        ticket = launch_scheduler.get(ticket_id)
+        if ticket is None:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        await ticket.wait_launched(min(timeout, WAIT_TIMEOUT_SECONDS))
+        return TicketResponse(
+            ticket_id=ticket.ticket_id,
+            state=ticket.state,
+            flow_id=ticket.flow_id,
+            execution_id=ticket.execution_id,
+            queued_seconds=round(ticket.queued_seconds, 3),
+            error=ticket.error
+        )
+
+
     @app.get("/api/execution/{execution_id}", response_model=ExecutionResponse)
     async def get_execution_status(execution_id: str):
         """
         Get current status of an execution.
 
-        Poll this endpoint to track workflow progress.
+        Poll this endpoint to track workflow progress. Results are served
+        from an in-process cache: finished executions are cached until
+        evicted, running ones for a short TTL.
         """
-        if not kestra_client:
+        if not kestra_client or not status_cache:
             raise HTTPException(status_code=503, detail="Kestra client not initialized")
 
         try:
-            result = kestra_client.get_execution_status(execution_id)
+            result = await status_cache.get(execution_id)
             return convert_result(result)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
 
+    @app.get("/api/execution/{execution_id}/wait", response_model=ExecutionResponse)
+    async def wait_for_execution(execution_id: str, timeout: float = 60):
+        """
+        Wait until an execution finishes, then return its final status.
+
+        Waiting is multiplexed through one background loop, so many
+        concurrent waiters cost no more than one. If the execution is
+        still running after timeout seconds its current status is returned.
+        """
+        if not kestra_client or not execution_waiter:
+            raise HTTPException(status_code=503, detail="Kestra client not initialized")
+
+        try:
+            result = await status_cache.get(execution_id)
+            result = await wait_for_result(result, timeout=min(timeout, WAIT_TIMEOUT_SECONDS))
+            return convert_result(result)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+    @app.get("/api/execution/{execution_id}/stream")
+    async def stream_execution(execution_id: str, request: Request):
+        """
+        Stream execution state changes as Server-Sent Events.
+
+        Emits a "state" event on every state change and a final "complete"
+        event carrying the outputs. All clients watching the same execution
+        share one upstream Kestra follow stream. Reconnecting clients resume
+        from the standard Last-Event-ID header (or ?last_event_id=).
+        """
+        if not kestra_client or not stream_hub:
+            raise HTTPException(status_code=503, detail="Kestra client not initialized")
+
+        last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+        try:
+            events = stream_hub.subscribe(
+                execution_id,
+                last_event_id=int(last_event_id) if last_event_id else None
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+        except StreamLimitExceeded as e:
+            raise HTTPException(status_code=429, detail=str(e))
+
+        return StreamingResponse(
+            events,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+
+    @app.post("/api/executions/status", response_model=ExecutionStatusBatchResponse)
+    async def get_execution_statuses(request: ExecutionStatusBatchRequest):
+        """
+        Get the status of many executions in one call.
+
+        Answers from a single indexed query on the executions table and
+        falls back to the Kestra API for IDs the database does not have
+        yet (at most MAX_STATUS_FALLBACK of them; the rest are reported
+        missing). If the database is unavailable, batches larger than
+        that get a 503. Outputs are omitted unless include_outputs is true.
+        """
+        execution_ids = list(dict.fromkeys(request.ids))
+        if len(execution_ids) > MAX_STATUS_BATCH:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many execution IDs: {len(execution_ids)} (max {MAX_STATUS_BATCH})"
+            )
+
+        try:
+            results = await fetch_execution_statuses(
+                execution_ids,
+                include_outputs=request.include_outputs,
+                fallback_to_kestra=request.fallback_to_kestra and kestra_client is not None
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Executions database unavailable for a batch of {len(execution_ids)}: {str(e)}"
+            )
+        responses = []
+        missing = []
+        for execution_id in execution_ids:
+            if execution_id not in results:
+                missing.append(execution_id)
+                continue
+            response = convert_result(results[execution_id])
+            if not request.include_outputs:
+                response.outputs = None
+            responses.append(response)
+
+        return ExecutionStatusBatchResponse(results=responses, missing=missing)
+
+
     @app.post("/api/deploy")
-    async def deploy_flows(flows_directory: str = "./kestra/flows"):
+    async def deploy_flows(flows_directory: str = "./kestra/flows", force: bool = False):
         """
         Deploy all flows from a directory to Kestra.
 
-        This is typically done once during setup.
+        This is typically done once during setup. Flows whose rendered
+        content is unchanged are skipped unless force=true.
         """
         if not kestra_client:
             raise HTTPException(status_code=503, detail="Kestra client not initialized")
 
         try:
-            results = kestra_client.deploy_all_flows(flows_directory)
+            results = await asyncio.to_thread(kestra_client.deploy_all_flows, flows_directory, force)
             return {
                 "success": all(r.get("success", False) for r in results.values()),
                 "results": results
@@ -265,29 +1094,499 @@ if FASTAPI_AVAILABLE:
     async def get_executions(
         namespace: str = "agrilink",
         limit: int = 50,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        state: Optional[str] = None,
+        start_from: Optional[str] = None,
+        start_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        preset: str = "full"
     ):
         """
         Get list of executions from Kestra database.
 
         This fetches real execution data from Postgres instead of mock data.
+        Results are newest first and paginated with opaque cursors: pass
+        next_cursor to get older executions and prev_cursor to go back.
+
+        Filters: flow_id, state (comma-separated, e.g. "FAILED,KILLED"),
+        start_from (inclusive) and start_to (exclusive) as ISO 8601 timestamps.
+
+        Projection: preset="summary" returns only identity, state and timing
+        columns (no inputs/outputs/state history); fields="flow_id,outputs.final_price"
+        selects explicit columns and JSONB paths instead.
+
+        Unless EXECUTIONS_JSON_PASSTHROUGH is off, Postgres builds the
+        response JSON and it is returned without being re-serialized.
         """
+        query = dict(
+            namespace=namespace,
+            limit=limit,
+            flow_id=flow_id,
+            state=[s.strip() for s in state.split(",") if s.strip()] if state else None,
+            start_from=start_from,
+            start_to=start_to,
+            cursor=cursor,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            preset=preset
+        )
         try:
-            executions = kestra_db.get_executions(
-                namespace=namespace,
-                limit=limit,
-                flow_id=flow_id
-            )
+            if EXECUTIONS_JSON_PASSTHROUGH:
+                # Postgres renders the page; the bytes are sent as-is
+                body, _ = await kestra_db.get_executions_page_json(**query)
+                return Response(content=body, media_type="application/json")
+
+            page = await kestra_db.get_executions_page(**query)
             return {
                 "success": True,
-                "executions": executions
+                **page
             }
+        except (InvalidCursor, InvalidFieldSelection, InvalidFilter) as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch executions: {str(e)}")
 
 
+    @app.get("/api/executions/export")
+    async def export_executions(
+        namespace: str = "agrilink",
+        flow_id: Optional[str] = None,
+        state: Optional[str] = None,
+        start_from: Optional[str] = None,
+        start_to: Optional[str] = None,
+        fields: Optional[str] = None,
+        preset: str = "full",
+        format: str = "ndjson"
+    ):
+        """
+        Stream all matching executions, oldest first, as NDJSON or CSV.
+
+        Takes the same filters and projection as /api/executions but has
+        no page size: rows are streamed from a server-side cursor in
+        chunks, at the pace the client reads them, so exports of any size
+        run in constant memory.
+
+        The query runs before the response starts, so bad filters get a
+        400 rather than a truncated 200. Each export holds a database
+        connection for its whole duration; past MAX_CONCURRENT_EXPORTS
+        running exports, new ones get a 429.
+        """
+        if export_slots.locked():
+            raise HTTPException(
+                status_code=429,
+                detail=f"{MAX_CONCURRENT_EXPORTS} exports already running; retry later"
+            )
+        await export_slots.acquire()
+        try:
+            chunks = await kestra_db.iter_executions_export(
+                namespace=namespace,
+                flow_id=flow_id,
+                state=[s.strip() for s in state.split(",") if s.strip()] if state else None,
+                start_from=start_from,
+                start_to=start_to,
+                fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+                preset=preset,
+                format=format,
+                chunk_size=EXPORT_CHUNK_SIZE
+            )
+        except ValueError as e:
+            export_slots.release()
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            export_slots.release()
+            raise HTTPException(status_code=500, detail=f"Failed to export executions: {str(e)}")
+        except BaseException:
+            export_slots.release()
+            raise
+
+        async def body():
+            try:
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
+                export_slots.release()
+
+        filename = f"executions-{time.strftime('%Y%m%d-%H%M%S')}.{format}"
+        return StreamingResponse(
+            body(),
+            media_type="application/x-ndjson" if format == "ndjson" else "text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+
+
+    @app.get("/api/analytics")
+    async def get_analytics(
+        namespace: str = "agrilink",
+        granularity: str = "day",
+        start_from: Optional[str] = None,
+        start_to: Optional[str] = None,
+        flow_id: Optional[str] = None
+    ):
+        """
+        Execution counts, success/failure rates and duration percentiles.
+
+        Served from incrementally maintained hourly/daily rollups, so the
+        cost depends on the range and number of flows, not on how many
+        executions there are. Rollups trail live data by at most one
+        refresh interval; "watermark" reports how far behind they are.
+        """
+        if execution_rollups is None:
+            raise HTTPException(status_code=503, detail="Analytics not enabled (set EXECUTION_ANALYTICS=true)")
+
+        try:
+            result = await asyncio.to_thread(
+                execution_rollups.query, namespace, granularity, start_from, start_to, flow_id
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to read analytics: {str(e)}")
+        return {"success": True, **result}
+
+
+    @app.post("/api/analytics/refresh")
+    async def refresh_analytics():
+        """Apply pending execution changes to the rollups now."""
+        if execution_rollups is None:
+            raise HTTPException(status_code=503, detail="Analytics not enabled (set EXECUTION_ANALYTICS=true)")
+
+        try:
+            result = await asyncio.to_thread(execution_rollups.refresh)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Analytics refresh failed: {str(e)}")
+        return {"success": True, **result}
+
+
+    @app.get("/api/market")
+    async def get_market(commodity: str = "Tomato", state: str = "Maharashtra", cost: Optional[float] = None):
+        """
+        Market analysis from the local mandi price store.
+
+        Same response shape as the web app's /api/market, but served from
+        stored history so callers rarely wait on data.gov.in. Stale pairs
+        are refreshed in the background; a pair with no stored prices waits
+        up to MARKET_COLD_REFRESH_TIMEOUT seconds for its first refresh, and
+        falls back to demo data (source "demo") like the web route if it
+        still has none. meta.freshness tells callers how old the data is.
+        """
+        if market_store is None:
+            raise HTTPException(status_code=503, detail="Market store not initialized")
+
+        commodity = normalize_name(commodity, KNOWN_COMMODITIES)
+        state = normalize_name(state, KNOWN_STATES)
+        cost = cost or COST_OF_PRODUCTION.get(commodity, 10)
+        analysis, freshness = await asyncio.gather(
+            asyncio.to_thread(market_store.analyze, commodity, state, cost),
+            asyncio.to_thread(market_store.freshness, commodity, state)
+        )
+        key = (commodity.lower(), state.lower())
+        if freshness["stale"]:
+            schedule_market_refresh(commodity, state)
+
+        source = "local-store"
+        if not analysis["marketCount"]:
+            # A price of 0 would read as a crash to the market intelligence agent
+            refresh = market_refreshes.get(key)
+            if refresh is not None:
+                try:
+                    await asyncio.wait_for(asyncio.shield(refresh), MARKET_COLD_REFRESH_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+                analysis, freshness = await asyncio.gather(
+                    asyncio.to_thread(market_store.analyze, commodity, state, cost),
+                    asyncio.to_thread(market_store.freshness, commodity, state)
+                )
+            if not analysis["marketCount"]:
+                analysis = dict(DEMO_ANALYSIS)
+                source = "demo"
+        freshness["refreshing"] = key in market_refreshes
+
+        return {
+            "success": True,
+            "data": analysis,
+            "meta": {
+                "commodity": commodity,
+                "state": state,
+                "costOfProductionPerKg": cost,
+                "fetchedAt": freshness["lastIngestedAt"],
+                "source": source,
+                "freshness": freshness
+            }
+        }
+
+
+    @app.post("/api/market/health")
+    async def get_market_health(request: MarketHealthRequest):
+        """
+        Classify every commodity × state pair in one call.
+
+        Used by the market-monitor flow. Loads the price window for all
+        pairs with one store query and computes rolling averages, drops
+        against alert_threshold_percent, volatility and NORMAL/WARNING/CRISIS
+        status in a single vectorized pass. Stale pairs are refreshed in
+        the background.
+        """
+        if market_store is None:
+            raise HTTPException(status_code=503, detail="Market store not initialized")
+        if not NUMPY_AVAILABLE:
+            raise HTTPException(status_code=503, detail="NumPy not installed")
+
+        commodities = [c.strip() for c in request.commodities.split(",") if c.strip()]
+        states = [s.strip() for s in request.states.split(",") if s.strip()]
+        if not commodities or not states:
+            raise HTTPException(status_code=400, detail="commodities and states must not be empty")
+        if len(commodities) * len(states) > MAX_HEALTH_PAIRS:
+            raise HTTPException(status_code=400, detail=f"Too many pairs (max {MAX_HEALTH_PAIRS})")
+        if not 7 <= request.days <= 365:
+            raise HTTPException(status_code=400, detail="days must be between 7 and 365")
+
+        as_of, rows = await asyncio.to_thread(market_store.daily_prices, commodities, states, request.days)
+        health = await asyncio.to_thread(
+            compute_market_health,
+            commodities, states, rows, as_of,
+            request.alert_threshold_percent, request.days, request.costs
+        )
+
+        def stale_pairs():
+            return [(c, s) for c in commodities for s in states if market_store.freshness(c, s)["stale"]]
+
+        for commodity, state in await asyncio.to_thread(stale_pairs):
+            schedule_market_refresh(commodity, state)
+
+        return {"success": True, **health}
+
+
+    @app.post("/api/market/ingest")
+    async def ingest_market_records(request: MarketIngestRequest):
+        """
+        Load mandi records into the market store.
+
+        Accepts records in the data.gov.in format (e.g. offline fixtures or
+        a bulk download). Records are upserted, so re-sending is harmless.
+        """
+        if market_store is None:
+            raise HTTPException(status_code=503, detail="Market store not initialized")
+
+        counts = await asyncio.to_thread(
+            market_store.ingest_records, request.records, request.commodity, request.state
+        )
+        return {"success": True, **counts}
+
+
+    @app.post("/api/market/refresh")
+    async def refresh_market(commodity: str, state: str):
+        """Fetch a commodity/state pair from data.gov.in now and ingest it."""
+        if market_store is None:
+            raise HTTPException(status_code=503, detail="Market store not initialized")
+
+        try:
+            counts = await asyncio.to_thread(market_store.refresh, commodity, state)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Market refresh failed: {str(e)}")
+        return {
+            "success": True,
+            **counts,
+            "freshness": await asyncio.to_thread(market_store.freshness, commodity, state)
+        }
+
+
+    @app.get("/api/buyers/match")
+    async def match_buyers(
+        commodity: str,
+        grade: Optional[str] = None,
+        quantity_kg: float = 0,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        limit: int = 5
+    ):
+        """
+        Top-K buyers for a lot from the indexed buyer registry.
+
+        Used by the sale flow so the negotiation swarm only sees a handful
+        of eligible buyers instead of the whole registry.
+        """
+        if buyer_index is None:
+            raise HTTPException(status_code=503, detail="Buyer index not initialized")
+        if not 1 <= limit <= 100:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+
+        try:
+            result = await asyncio.to_thread(
+                buyer_index.match, commodity, grade, quantity_kg, state, city, limit
+            )
+        except (OSError, ValueError) as e:
+            raise HTTPException(status_code=500, detail=f"Failed to load buyer registry: {str(e)}")
+        return {"success": True, **result}
+
+
+    @app.get("/api/processors/rank")
+    async def rank_processors(
+        commodity: str,
+        quantity_kg: float,
+        market_price_per_kg: float,
+        cost_per_kg: float,
+        grade: Optional[str] = None,
+        state: Optional[str] = None,
+        district: Optional[str] = None,
+        recovery_price_per_kg: Optional[float] = None,
+        hold_days: int = 7,
+        limit: int = 5
+    ):
+        """
+        Ranked crisis outlets (processors, MSP, cold storage, NGOs) for a lot.
+
+        Deterministic alternative to the crisis-shield router agent: the
+        same inputs always give the same shortlist. "decision" holds the
+        top outlet in the router agent's output format.
+        """
+        if processor_ranker is None:
+            raise HTTPException(status_code=503, detail="Processor ranker not initialized")
+        if not 1 <= limit <= 100:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+
+        try:
+            result = await asyncio.to_thread(
+                processor_ranker.rank,
+                commodity, quantity_kg, market_price_per_kg, cost_per_kg,
+                grade, state, district, recovery_price_per_kg, hold_days, limit
+            )
+        except (OSError, ValueError) as e:
+            raise HTTPException(status_code=500, detail=f"Failed to load processor registry: {str(e)}")
+        return {"success": True, **result}
+
+
+    @app.post("/api/decisions/lookup")
+    async def lookup_decision(request: DecisionLookupRequest):
+        """
+        Look up a cached AI agent decision by its prompt inputs.
+
+        Flows call this before an agent step and skip the agent on a hit.
+        The returned key is passed to /api/decisions/store on a miss.
+        bypass=true forces a miss (fresh decision) without reading the cache.
+        """
+        if decision_cache is None:
+            raise HTTPException(status_code=503, detail="Decision cache not initialized")
+        require_known_task(request.task)
+
+        key = make_key(request.task, request.inputs)
+        hit, decision, age = decision_cache.lookup(key, bypass=request.bypass)
+        return {
+            "hit": hit,
+            "key": key,
+            "decision": decision,
+            "age_seconds": age
+        }
+
+
+    @app.post("/api/decisions/store")
+    async def store_decision(request: DecisionStoreRequest):
+        """Cache an AI agent decision under a lookup key or its prompt inputs."""
+        if decision_cache is None:
+            raise HTTPException(status_code=503, detail="Decision cache not initialized")
+        require_known_task(request.task)
+
+        if request.key is not None:
+            if not request.key.startswith(f"{request.task}:"):
+                raise HTTPException(status_code=400, detail="key does not belong to task")
+            key = request.key
+        elif request.inputs is not None:
+            key = make_key(request.task, request.inputs)
+        else:
+            raise HTTPException(status_code=400, detail="Either key or inputs is required")
+
+        stored = decision_cache.store(key, request.decision, request.ttl_seconds)
+        return {"success": stored, "key": key}
+
+
+    @app.get("/metrics")
+    async def get_metrics():
+        """
+        Prometheus metrics in the text exposition format.
+
+        Per-route request latency, status codes and in-flight requests,
+        Kestra API call and executions query timings (with row counts),
+        error counters and database pool usage.
+        """
+        pool = kestra_db.pool_stats()
+        for state in ("open", "idle", "in_use"):
+            metrics.db_pool_connections.set(pool[state], state=state)
+        return Response(
+            content=metrics.registry.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+    @app.get("/api/admin/profiling")
+    async def get_profiling(request: Request):
+        """Profiler status and saved profiles, newest first (requires X-Admin-Token)."""
+        profiler = require_admin(request)
+        profiles = await asyncio.to_thread(profiler.list_profiles)
+        return {**profiler.status(), "profiles": profiles}
+
+
+    @app.post("/api/admin/profiling")
+    async def arm_profiling(body: ProfilingRequest, request: Request):
+        """
+        Profile a sample of live requests for a time window.
+
+        sample_rate of matching requests (optionally only paths starting
+        with one of path_prefixes) are profiled with cProfile, one at a
+        time, until duration_seconds have passed. A single request can
+        also be profiled by sending X-Profile: 1 with X-Admin-Token.
+        """
+        profiler = require_admin(request)
+        try:
+            return profiler.arm(body.sample_rate, body.duration_seconds, body.path_prefixes)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+    @app.delete("/api/admin/profiling")
+    async def disarm_profiling(request: Request):
+        """Stop sampling requests."""
+        profiler = require_admin(request)
+        profiler.disarm()
+        return profiler.status()
+
+
+    @app.get("/api/admin/profiles/{profile_id}")
+    async def download_profile(profile_id: str, request: Request):
+        """Download a saved profile as a pstats file."""
+        profiler = require_admin(request)
+        path = profiler.profile_path(profile_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.pstats")
+
+
+    @app.get("/api/stats")
+    async def get_stats():
+        """
+        Report internal resource usage.
+
+        Includes database connection pool sizing and checkout counters,
+        and execution status cache hit/miss counters.
+        """
+        return {
+            "db_pool": kestra_db.pool_stats(),
+            "status_cache": status_cache.stats() if status_cache else None,
+            "execution_streams": stream_hub.stats() if stream_hub else None,
+            "change_feed": change_feed.stats() if change_feed else None,
+            "execution_waiter": execution_waiter.stats() if execution_waiter else None,
+            "market_refreshes": len(market_refreshes),
+            "buyer_index": buyer_index.stats() if buyer_index else None,
+            "processor_ranker": processor_ranker.stats() if processor_ranker else None,
+            "decision_cache": decision_cache.stats() if decision_cache else None,
+            "analytics": execution_rollups.stats() if execution_rollups else None,
+            "idempotency": idempotency_store.stats() if idempotency_store else None,
+            "launch_scheduler": launch_scheduler.stats() if launch_scheduler else None
+        }
+
+
 def main():
     """Run the API server"""
+    load_env()
     if not FASTAPI_AVAILABLE:
         print("Error: FastAPI not installed")
         print("Run: pip install fastapi uvicorn")
@@ -1,19 +1,24 @@
 import os
 import json
-import requests
-from typing import Optional, Dict, Any, Generator
+import asyncio
+import hashlib
+import time
+from typing import Optional, Dict, Any, Generator, AsyncIterator, List, Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from dotenv import load_dotenv
+from importlib.util import find_spec
 
-load_dotenv()
+from env import load_env, env_flag
+from metrics import timed_kestra_call
 
-try:
-    from kestrapy import Configuration, KestraClient
-    KESTRAPY_AVAILABLE = True
-except ImportError:
-    KESTRAPY_AVAILABLE = False
+# Heavy client libraries are only imported when a client is created
+KESTRAPY_AVAILABLE = find_spec("kestrapy") is not None
+if not KESTRAPY_AVAILABLE:
     print("Warning: kestrapy not installed. Install with: pip install kestrapy")
 
+HTTPX_AVAILABLE = find_spec("httpx") is not None
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
 
 @dataclass
 class ExecutionResult:
@@ -58,7 +63,11 @@ class AgriLinkKestra:
         host: Optional[str] = None,
         username: Optional[str] = None,
         password: Optional[str] = None,
-        tenant: str = "main"
+        tenant: str = "main",
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        http2: Optional[bool] = None,
+        timeout: float = 30
     ):
         """
         Initialize Kestra client.
@@ -68,9 +77,18 @@ class AgriLinkKestra:
             username: Username for basic auth (default: from KESTRA_USERNAME env)
             password: Password for basic auth (default: from KESTRA_PASSWORD env)
             tenant: Tenant ID (default: "default")
+            max_connections: Connection limit towards Kestra (default: KESTRA_MAX_CONNECTIONS env or 20)
+            max_keepalive_connections: Idle connections kept open (default: KESTRA_MAX_KEEPALIVE env or 10)
+            http2: Use HTTP/2 when h2 is installed (default: KESTRA_HTTP2 env or True)
+            timeout: Request timeout in seconds for direct HTTP calls
         """
         if not KESTRAPY_AVAILABLE:
             raise ImportError("kestrapy is required. Install with: pip install kestrapy")
+
+        load_env()
+        import requests
+        from requests.adapters import HTTPAdapter
+        from kestrapy import Configuration, KestraClient
         
         self.host = host or os.getenv("KESTRA_HOST", "http://localhost:8080")
         self.tenant = tenant or os.getenv("KESTRA_TENANT", "main")
@@ -82,7 +100,95 @@ class AgriLinkKestra:
         self.configuration = Configuration(**config_params)
         self.client = KestraClient(self.configuration)
 
-    def deploy_flow(self, flow_yaml: str) -> Dict[str, Any]:
+        self.auth = (
+            (config_params["username"], config_params["password"])
+            if config_params["username"] and config_params["password"]
+            else None
+        )
+        self.timeout = timeout
+        self.max_connections = max_connections or int(os.getenv("KESTRA_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.getenv("KESTRA_MAX_KEEPALIVE", "10")
+        )
+        if http2 is None:
+            http2 = env_flag("KESTRA_HTTP2", "true")
+        self.http2 = http2 and HTTP2_AVAILABLE
+
+        # Keep-alive session shared by all synchronous calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_connections
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.auth = self.auth
+
+        self._async_http = None
+
+    @property
+    def async_http(self) -> "httpx.AsyncClient":
+        """
+        Shared async HTTP client, created on first use.
+
+        Must be used from a single event loop (the API server's).
+        """
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx is required for async mode. Install with: pip install httpx")
+        if self._async_http is None:
+            import httpx
+            self._async_http = httpx.AsyncClient(
+                auth=self.auth,
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                )
+            )
+        return self._async_http
+
+    async def aclose(self):
+        """Close pooled HTTP connections (both sync and async)."""
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+        self.session.close()
+
+    def _execution_url(self, *parts: str) -> str:
+        """Build a Kestra executions API URL."""
+        return "/".join([f"{self.host}/api/v1/{self.tenant}/executions", *parts])
+
+    @staticmethod
+    def _raise_for_status(response):
+        """Raise a Kestra API error for non-2xx responses (requests or httpx)."""
+        if not (200 <= response.status_code < 300):
+            raise Exception(f"Kestra API error: {response.status_code} - {response.text}")
+
+    def _parse_execution(
+        self,
+        data: Dict[str, Any],
+        execution_id: str = "",
+        flow_id: str = "",
+        default_state: str = "UNKNOWN"
+    ) -> ExecutionResult:
+        """Convert a Kestra execution JSON payload into an ExecutionResult."""
+        return ExecutionResult(
+            execution_id=data.get('id', execution_id),
+            state=data.get('state', {}).get('current', default_state),
+            namespace=data.get('namespace', self.NAMESPACE),
+            flow_id=data.get('flowId', flow_id),
+            outputs=data.get('outputs')
+        )
+
+    @timed_kestra_call("deploy_flow")
+    def deploy_flow(
+        self,
+        flow_yaml: str,
+        flow_id: Optional[str] = None,
+        namespace: Optional[str] = None,
+        rendered: bool = False
+    ) -> Dict[str, Any]:
         """
         Deploy or update a flow from YAML.
 
@@ -91,11 +197,15 @@ class AgriLinkKestra:
 
         Args:
             flow_yaml: YAML string containing flow definition
+            flow_id: Flow ID, if already known (avoids re-parsing the YAML on update)
+            namespace: Flow namespace, if already known
+            rendered: True if API keys have already been injected
 
         Returns:
             Flow metadata from Kestra
         """
-        flow_yaml = self._inject_api_keys(flow_yaml)
+        if not rendered:
+            flow_yaml = self._inject_api_keys(flow_yaml)
 
         try:
             result = self.client.flows.create_flow(
@@ -107,11 +217,14 @@ class AgriLinkKestra:
             error_str = str(e).lower()
             if "already exists" in error_str or "409" in error_str or "conflict" in error_str:
                 # Flow exists, update it
-                import yaml
-                flow_dict = yaml.safe_load(flow_yaml)
+                if flow_id is None:
+                    import yaml
+                    flow_dict = yaml.safe_load(flow_yaml)
+                    flow_id = flow_dict["id"]
+                    namespace = flow_dict.get("namespace", self.NAMESPACE)
                 result = self.client.flows.update_flow(
-                    id=flow_dict["id"],
-                    namespace=flow_dict.get("namespace", self.NAMESPACE),
+                    id=flow_id,
+                    namespace=namespace or self.NAMESPACE,
                     tenant=self.tenant,
                     body=flow_yaml
                 )
@@ -171,33 +284,117 @@ class AgriLinkKestra:
 
         return flow_yaml
 
-    def deploy_all_flows(self, flows_directory: str = "./kestra/flows") -> Dict[str, Any]:
+    def _manifest_path(self) -> str:
+        return os.getenv(
+            "KESTRA_FLOW_MANIFEST",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), ".flow-manifest.json")
+        )
+
+    def _load_manifest(self) -> Dict[str, str]:
+        """Load flow content hashes recorded by previous deployments."""
+        try:
+            with open(self._manifest_path(), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, str]):
+        path = self._manifest_path()
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write flow manifest {path}: {e}")
+
+    @timed_kestra_call("get_flow")
+    def _remote_flow_hash(self, namespace: str, flow_id: str) -> Optional[str]:
+        """Hash the source Kestra currently holds for a flow, or None if unavailable."""
+        try:
+            response = self.session.get(
+                f"{self.host}/api/v1/{self.tenant}/flows/{namespace}/{flow_id}",
+                params={"source": "true"},
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                return None
+            source = response.json().get("source")
+            return hashlib.sha256(source.encode()).hexdigest() if source else None
+        except Exception:
+            return None
+
+    def deploy_all_flows(
+        self,
+        flows_directory: str = "./kestra/flows",
+        force: bool = False,
+        max_workers: int = 4,
+        on_progress: Optional[Callable[[str, Dict[str, Any], int, int], None]] = None
+    ) -> Dict[str, Any]:
         """
         Deploy all flows from a directory.
 
+        Each flow is rendered (API keys injected) and hashed. Flows whose
+        hash matches the source Kestra currently holds are skipped; the
+        rest are deployed concurrently. The local manifest only records
+        what was last deployed: a flow it lists as current but which was
+        edited or deleted in Kestra is redeployed and reported as drifted.
+
         Args:
             flows_directory: Path to directory containing .yml and .yaml flow files
+            force: Deploy every flow even if unchanged
+            max_workers: Maximum concurrent deployments
+            on_progress: Called as (flow_name, result, completed, total) after each flow
 
         Returns:
-            Dictionary with deployment results
+            Dictionary with deployment results, including per-flow duration_ms
         """
         import glob
+        import yaml
 
         results = {}
         flow_files = glob.glob(f"{flows_directory}/*.yml") + glob.glob(f"{flows_directory}/*.yaml")
+        manifest = self._load_manifest()
 
-        for flow_file in flow_files:
+        def deploy_one(flow_file: str):
+            started = time.perf_counter()
             flow_name = os.path.basename(flow_file)
+            manifest_key = None
             try:
                 with open(flow_file, 'r') as f:
-                    flow_yaml = f.read()
-                result = self.deploy_flow(flow_yaml)
-                results[flow_name] = {"success": True, **result}
+                    flow_yaml = self._inject_api_keys(f.read())
+                flow_dict = yaml.safe_load(flow_yaml)
+                flow_id = flow_dict["id"]
+                namespace = flow_dict.get("namespace", self.NAMESPACE)
+                content_hash = hashlib.sha256(flow_yaml.encode()).hexdigest()
+                manifest_key = f"{self.host}|{self.tenant}|{namespace}.{flow_id}"
+
+                if not force and self._remote_flow_hash(namespace, flow_id) == content_hash:
+                    result = {"status": "unchanged"}
+                else:
+                    result = self.deploy_flow(flow_yaml, flow_id=flow_id, namespace=namespace, rendered=True)
+                    if not force and manifest.get(manifest_key) == content_hash:
+                        result["drifted"] = True
+                outcome = {"success": True, **result, "hash": content_hash}
             except Exception as e:
-                results[flow_name] = {"success": False, "error": str(e)}
+                outcome = {"success": False, "error": str(e)}
 
+            outcome["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return flow_name, manifest_key, outcome
+
+        workers = max(1, min(max_workers, len(flow_files) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for flow_name, manifest_key, outcome in executor.map(deploy_one, flow_files):
+                results[flow_name] = outcome
+                if outcome["success"]:
+                    manifest[manifest_key] = outcome["hash"]
+                if on_progress:
+                    on_progress(flow_name, outcome, len(results), len(flow_files))
+
+        self._save_manifest(manifest)
         return results
 
+    @timed_kestra_call("create_execution")
     def _create_execution_via_api(
         self,
         flow_id: str,
@@ -217,7 +414,7 @@ class AgriLinkKestra:
         Returns:
             ExecutionResult with execution details
         """
-        url = f"{self.host}/api/v1/{self.tenant}/executions/{self.NAMESPACE}/{flow_id}"
+        url = self._execution_url(self.NAMESPACE, flow_id)
 
         params = {}
         if wait:
@@ -227,30 +424,52 @@ class AgriLinkKestra:
         for key, value in inputs.items():
             files[key] = (None, str(value))
 
-        username = os.getenv("KESTRA_USERNAME", "admin@kestra.io")
-        password = os.getenv("KESTRA_PASSWORD", "admin")
-
-        response = requests.post(
+        response = self.session.post(
             url,
             files=files,
             params=params,
-            auth=(username, password) if username and password else None,
-            timeout=30
+            timeout=self.timeout
         )
+        self._raise_for_status(response)
 
-        if not response.ok:
-            error_msg = f"Kestra API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
+        return self._parse_execution(response.json(), flow_id=flow_id, default_state='CREATED')
+
+    @timed_kestra_call("create_execution")
+    async def _create_execution_via_api_async(
+        self,
+        flow_id: str,
+        inputs: Dict[str, Any],
+        wait: bool = False
+    ) -> ExecutionResult:
+        """
+        Async variant of _create_execution_via_api using the pooled async client.
 
-        data = response.json()
+        Args:
+            flow_id: Flow identifier
+            inputs: Dictionary of input parameters
+            wait: Whether to wait for execution completion
 
-        return ExecutionResult(
-            execution_id=data.get('id', ''),
-            state=data.get('state', {}).get('current', 'CREATED'),
-            namespace=data.get('namespace', self.NAMESPACE),
-            flow_id=data.get('flowId', flow_id),
-            outputs=data.get('outputs')
+        Returns:
+            ExecutionResult with execution details
+        """
+        url = self._execution_url(self.NAMESPACE, flow_id)
+
+        params = {}
+        if wait:
+            params['wait'] = 'true'
+
+        files = {key: (None, str(value)) for key, value in inputs.items()}
+
+        # With wait=true Kestra holds the request open until the run ends
+        response = await self.async_http.post(
+            url,
+            files=files,
+            params=params,
+            timeout=None if wait else self.timeout
         )
+        self._raise_for_status(response)
+
+        return self._parse_execution(response.json(), flow_id=flow_id, default_state='CREATED')
 
     def start_sale(
         self,
@@ -289,7 +508,111 @@ class AgriLinkKestra:
         Returns:
             ExecutionResult with execution details
         """
-        inputs = {
+        return self._create_execution_via_api(
+            flow_id=self.FLOW_MAIN_SALE,
+            inputs=self._sale_inputs(
+                farmer_id, farmer_name, farmer_phone, commodity, quantity_kg,
+                state, district, crop_image_url, cost_of_production
+            ),
+            wait=wait
+        )
+
+    async def start_sale_async(
+        self,
+        farmer_id: str,
+        farmer_name: str = "Farmer",
+        farmer_phone: str = "+919999999999",
+        commodity: str = "Tomato",
+        quantity_kg: int = 100,
+        state: str = "Maharashtra",
+        district: str = "Nashik",
+        crop_image_url: str = "",
+        cost_of_production: int = 800,
+        wait: bool = False
+    ) -> ExecutionResult:
+        """Async variant of start_sale."""
+        return await self._create_execution_via_api_async(
+            flow_id=self.FLOW_MAIN_SALE,
+            inputs=self._sale_inputs(
+                farmer_id, farmer_name, farmer_phone, commodity, quantity_kg,
+                state, district, crop_image_url, cost_of_production
+            ),
+            wait=wait
+        )
+
+    def start_sales_batch(
+        self,
+        sales: List[Dict[str, Any]],
+        max_concurrency: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Start many sale workflows concurrently.
+
+        Each item is a dict of start_sale keyword arguments. Items are
+        launched with at most max_concurrency creations in flight, and a
+        failing item never aborts the rest of the batch. Batch items are
+        always launched without waiting for completion.
+
+        Args:
+            sales: List of start_sale keyword-argument dicts
+            max_concurrency: Maximum concurrent execution creations
+
+        Returns:
+            One entry per input item, in input order, with keys
+            "index", "success" and either "result" (ExecutionResult) or "error"
+        """
+        def launch(index: int, sale: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                result = self.start_sale(**{**sale, "wait": False})
+                return {"index": index, "success": True, "result": result}
+            except Exception as e:
+                return {"index": index, "success": False, "error": str(e)}
+
+        workers = max(1, min(max_concurrency, self.max_connections, len(sales) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(launch, range(len(sales)), sales))
+
+    async def start_sales_batch_async(
+        self,
+        sales: List[Dict[str, Any]],
+        max_concurrency: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of start_sales_batch using the pooled async client.
+
+        Args:
+            sales: List of start_sale keyword-argument dicts
+            max_concurrency: Maximum concurrent execution creations
+
+        Returns:
+            One entry per input item, in input order (see start_sales_batch)
+        """
+        semaphore = asyncio.Semaphore(max(1, min(max_concurrency, self.max_connections)))
+
+        async def launch(index: int, sale: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result = await self.start_sale_async(**{**sale, "wait": False})
+                    return {"index": index, "success": True, "result": result}
+                except Exception as e:
+                    return {"index": index, "success": False, "error": str(e)}
+
+        return await asyncio.gather(*(launch(i, sale) for i, sale in enumerate(sales)))
+
+    @staticmethod
+    def _sale_inputs(
+        farmer_id: str,
+        farmer_name: str,
+        farmer_phone: str,
+        commodity: str,
+        quantity_kg: int,
+        state: str,
+        district: str,
+        crop_image_url: str,
+        cost_of_production: int
+    ) -> Dict[str, Any]:
+        """Build main-sale-workflow inputs."""
+        return {
             "farmer_id": farmer_id,
             "farmer_name": farmer_name,
             "farmer_phone": farmer_phone,
@@ -300,12 +623,6 @@ class AgriLinkKestra:
             "crop_image_url": crop_image_url,
             "cost_of_production": cost_of_production,
         }
- 
-        return self._create_execution_via_api(
-            flow_id=self.FLOW_MAIN_SALE,
-            inputs=inputs,
-            wait=wait
-        )
     
     def start_crisis_shield(
         self,
@@ -349,6 +666,32 @@ class AgriLinkKestra:
             inputs=inputs,
             wait=wait
         )
+
+    async def start_crisis_shield_async(
+        self,
+        farmer_id: str,
+        commodity: str,
+        quantity_kg: int,
+        state: str,
+        district: str,
+        quality_grade: str = '{"grade": "B"}',
+        wait: bool = False
+    ) -> ExecutionResult:
+        """Async variant of start_crisis_shield."""
+        inputs = {
+            "farmer_id": farmer_id,
+            "commodity": commodity,
+            "quantity_kg": quantity_kg,
+            "state": state,
+            "district": district,
+            "quality_grade": quality_grade,
+        }
+
+        return await self._create_execution_via_api_async(
+            flow_id=self.FLOW_CRISIS_SHIELD,
+            inputs=inputs,
+            wait=wait
+        )
     
     def start_market_monitor(
         self,
@@ -361,7 +704,7 @@ class AgriLinkKestra:
         
         Args:
             commodities: Comma-separated list of commodities
-            state: State to monitor
+            state: State(s) to monitor, comma-separated
             wait: If True, wait for execution to complete
             
         Returns:
@@ -369,7 +712,7 @@ class AgriLinkKestra:
         """
         inputs = {
             "commodities": commodities,
-            "state": state,
+            "states": state,
         }
 
         return self._create_execution_via_api(
@@ -377,7 +720,26 @@ class AgriLinkKestra:
             inputs=inputs,
             wait=wait
         )
+
+    async def start_market_monitor_async(
+        self,
+        commodities: str = "Tomato,Potato,Onion",
+        state: str = "Maharashtra",
+        wait: bool = False
+    ) -> ExecutionResult:
+        """Async variant of start_market_monitor."""
+        inputs = {
+            "commodities": commodities,
+            "states": state,
+        }
+
+        return await self._create_execution_via_api_async(
+            flow_id=self.FLOW_MARKET_MONITOR,
+            inputs=inputs,
+            wait=wait
+        )
     
+    @timed_kestra_call("get_execution_status")
     def get_execution_status(self, execution_id: str) -> ExecutionResult:
         """
         Get current status of an execution using direct HTTP API.
@@ -388,32 +750,29 @@ class AgriLinkKestra:
         Returns:
             ExecutionResult with current state
         """
-        import requests
-
-        url = f"{self.host}/api/v1/{self.tenant}/executions/{execution_id}"
+        response = self.session.get(
+            self._execution_url(execution_id),
+            timeout=self.timeout
+        )
+        self._raise_for_status(response)
 
-        username = os.getenv("KESTRA_USERNAME", "admin@kestra.io")
-        password = os.getenv("KESTRA_PASSWORD", "admin")
+        return self._parse_execution(response.json(), execution_id=execution_id)
 
-        response = requests.get(
-            url,
-            auth=(username, password) if username and password else None,
-            timeout=30
-        )
+    @timed_kestra_call("get_execution_status")
+    async def get_execution_status_async(self, execution_id: str) -> ExecutionResult:
+        """
+        Async variant of get_execution_status using the pooled async client.
 
-        if not response.ok:
-            error_msg = f"Kestra API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
+        Args:
+            execution_id: Kestra execution ID
 
-        data = response.json()
+        Returns:
+            ExecutionResult with current state
+        """
+        response = await self.async_http.get(self._execution_url(execution_id))
+        self._raise_for_status(response)
 
-        return ExecutionResult(
-            execution_id=data.get('id', execution_id),
-            state=data.get('state', {}).get('current', 'UNKNOWN'),
-            namespace=data.get('namespace', self.NAMESPACE),
-            flow_id=data.get('flowId', ''),
-            outputs=data.get('outputs')
-        )
+        return self._parse_execution(response.json(), execution_id=execution_id)
     
     def follow_execution(self, execution_id: str) -> Generator[ExecutionResult, None, None]:
         """
@@ -438,6 +797,61 @@ class AgriLinkKestra:
                     outputs=event.outputs if hasattr(event, 'outputs') else None
                 )
     
+    async def follow_execution_async(self, execution_id: str) -> AsyncIterator[ExecutionResult]:
+        """
+        Async variant of follow_execution over the pooled async client.
+
+        Reads Kestra's follow endpoint (Server-Sent Events) directly, so
+        cancelling the consuming task closes the connection at once
+        instead of leaving a thread blocked until the next event.
+
+        Args:
+            execution_id: Kestra execution ID
+
+        Yields:
+            ExecutionResult for each update
+        """
+        import httpx
+
+        async with self.async_http.stream(
+            "GET",
+            self._execution_url(execution_id, "follow"),
+            headers={"Accept": "text/event-stream"},
+            # Executions may be quiet for minutes between updates
+            timeout=httpx.Timeout(self.timeout, read=None)
+        ) as response:
+            if not (200 <= response.status_code < 300):
+                await response.aread()
+                self._raise_for_status(response)
+
+            data_lines: List[str] = []
+            async for line in response.aiter_lines():
+                result = self._read_sse_line(line, data_lines, execution_id)
+                if result is not None:
+                    yield result
+
+    def _read_sse_line(self, line: str, data_lines: List[str], execution_id: str) -> Optional[ExecutionResult]:
+        """
+        Feed one line of a follow stream (Server-Sent Events).
+
+        data: lines accumulate in data_lines; the blank line ending an
+        event returns its execution update, if it carries one.
+        """
+        if line.startswith("data:"):
+            data_lines.append(line[5:].strip())
+            return None
+        if line or not data_lines:
+            return None
+        payload = "\n".join(data_lines)
+        data_lines.clear()
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return None
+        if isinstance(data, dict) and data.get("state"):
+            return self._parse_execution(data, execution_id=execution_id)
+        return None
+
     def wait_for_completion(
         self,
         execution_id: str,
@@ -447,79 +861,126 @@ class AgriLinkKestra:
         """
         Wait for an execution to complete using follow_execution (more efficient than polling).
 
+        The follow stream is consumed on a daemon thread and the deadline
+        is enforced by the calling thread, so this works from any thread
+        (no SIGALRM). On timeout the stream's response is closed, which
+        ends the thread instead of leaving it blocked on a quiet stream.
+        Async callers serving many executions should use ExecutionWaiter
+        instead.
+
         Args:
             execution_id: Kestra execution ID
             timeout_seconds: Maximum wait time
-            poll_interval: Seconds between status checks (unused, kept for compatibility)
+            poll_interval: Initial seconds between status checks if following fails
 
         Returns:
             Final ExecutionResult
         """
-        import time
-        import signal
-
-        start_time = time.time()
-        last_result = None
+        import queue
+        import threading
 
-        def timeout_handler(signum, frame):
-            raise TimeoutError(f"Execution {execution_id} did not complete within {timeout_seconds}s")
+        deadline = time.monotonic() + timeout_seconds
+        events: "queue.Queue" = queue.Queue()
+        _end = object()
+        stop = threading.Event()
+        lock = threading.Lock()
+        opened = []
 
-        if hasattr(signal, 'SIGALRM'):
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(timeout_seconds)
-
-        try:
-            for event in self.follow_execution(execution_id):
-                last_result = event
-
-                if not event.is_running():
-                    if hasattr(signal, 'SIGALRM'):
-                        signal.alarm(0)  # Cancel timeout
-                    return event
-
-                if time.time() - start_time > timeout_seconds:
-                    raise TimeoutError(f"Execution {execution_id} did not complete within {timeout_seconds}s")
-
-        except Exception as e:
-            if hasattr(signal, 'SIGALRM'):
-                signal.alarm(0)  # Cancel timeout
-            # If follow_execution fails, fall back to polling
-            if "follow_execution" in str(e).lower():
-                return self._wait_for_completion_polling(execution_id, timeout_seconds, poll_interval)
-            raise
-
-        if last_result:
-            return last_result
-
-        raise TimeoutError(f"Execution {execution_id} did not complete within {timeout_seconds}s")
+        def follow():
+            try:
+                with self.session.get(
+                    self._execution_url(execution_id, "follow"),
+                    headers={"Accept": "text/event-stream"},
+                    stream=True,
+                    # Executions may be quiet for minutes between updates
+                    timeout=(self.timeout, None)
+                ) as response:
+                    with lock:
+                        if stop.is_set():
+                            return
+                        opened.append(response)
+                    self._raise_for_status(response)
+                    data_lines: List[str] = []
+                    for line in response.iter_lines(decode_unicode=True):
+                        event = self._read_sse_line(line, data_lines, execution_id)
+                        if event is None:
+                            continue
+                        events.put(event)
+                        if not event.is_running():
+                            break
+            except Exception as e:
+                if stop.is_set():
+                    return
+                events.put(e)
+            events.put(_end)
+
+        def close_stream():
+            with lock:
+                stop.set()
+                responses = list(opened)
+            for response in responses:
+                response.close()
+
+        threading.Thread(target=follow, name=f"follow-{execution_id}", daemon=True).start()
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                close_stream()
+                raise TimeoutError(f"Execution {execution_id} did not complete within {timeout_seconds}s")
+            try:
+                item = events.get(timeout=remaining)
+            except queue.Empty:
+                continue
+
+            if isinstance(item, ExecutionResult):
+                if not item.is_running():
+                    close_stream()
+                    return item
+                continue
+
+            # Follow stream failed or ended early; poll for the rest of the time
+            if isinstance(item, Exception):
+                print(f"Following {execution_id} failed, falling back to polling: {item}")
+            return self._wait_for_completion_polling(
+                execution_id,
+                max(0.0, deadline - time.monotonic()),
+                poll_interval
+            )
 
     def _wait_for_completion_polling(
         self,
         execution_id: str,
-        timeout_seconds: int = 300,
-        poll_interval: int = 2
+        timeout_seconds: float = 300,
+        poll_interval: float = 2,
+        max_poll_interval: float = 15
     ) -> ExecutionResult:
         """
         Fallback polling method for wait_for_completion.
 
+        The interval grows by half after each check, up to max_poll_interval.
+
         Args:
             execution_id: Kestra execution ID
             timeout_seconds: Maximum wait time
-            poll_interval: Seconds between status checks
+            poll_interval: Initial seconds between status checks
+            max_poll_interval: Upper bound for the interval
 
         Returns:
             Final ExecutionResult
         """
-        import time
-
-        start_time = time.time()
-        while time.time() - start_time < timeout_seconds:
+        deadline = time.monotonic() + timeout_seconds
+        while True:
             result = self.get_execution_status(execution_id)
 
             if not result.is_running():
                 return result
 
-            time.sleep(poll_interval)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(poll_interval, remaining))
+            poll_interval = min(poll_interval * 1.5, max_poll_interval)
 
         raise TimeoutError(f"Execution {execution_id} did not complete within {timeout_seconds}s")
 
@@ -0,0 +1,318 @@
+import time
+import uuid
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple, Union, Callable, Awaitable
+
+import metrics
+from kestra_client import AgriLinkKestra, ExecutionResult
+
+# Lower values launch first
+FLOW_PRIORITIES = {
+    AgriLinkKestra.FLOW_CRISIS_SHIELD: 0,
+    AgriLinkKestra.FLOW_MAIN_SALE: 1,
+    AgriLinkKestra.FLOW_MARKET_MONITOR: 2,
+}
+DEFAULT_PRIORITY = 1
+
+DEFAULT_FLOW_LIMITS = {
+    AgriLinkKestra.FLOW_CRISIS_SHIELD: 20,
+    AgriLinkKestra.FLOW_MAIN_SALE: 30,
+    AgriLinkKestra.FLOW_MARKET_MONITOR: 5,
+}
+
+# Queue waits kept per flow for the percentiles in stats()
+_RECENT_WAITS = 1000
+
+
+class LaunchQueueFull(RuntimeError):
+    """Raised when the launch queue is at capacity."""
+
+
+@dataclass
+class LaunchTicket:
+    """A flow launch waiting in (or released from) the scheduler queue"""
+    ticket_id: str
+    flow_id: str
+    farmer_id: str
+    launch: Optional[Callable[[], Awaitable[ExecutionResult]]] = field(default=None, repr=False)
+    state: str = "QUEUED"  # QUEUED, LAUNCHING, LAUNCHED, FAILED, CANCELLED
+    enqueued_at: float = field(default_factory=time.time)
+    launched_at: Optional[float] = None
+    result: Optional[ExecutionResult] = None
+    error: Optional[str] = None
+    _queued: float = field(default_factory=time.monotonic, repr=False)
+    _done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def execution_id(self) -> Optional[str]:
+        return self.result.execution_id if self.result else None
+
+    @property
+    def queued_seconds(self) -> float:
+        return max(0.0, (self.launched_at or time.time()) - self.enqueued_at)
+
+    async def wait_launched(self, timeout: float) -> bool:
+        """
+        Wait until the launch has been attempted.
+
+        Returns:
+            True if the ticket left the queue (LAUNCHED, FAILED or CANCELLED)
+        """
+        if not self._done.is_set() and timeout > 0:
+            try:
+                await asyncio.wait_for(self._done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._done.is_set()
+
+    def _finish(self, state: str, error: Optional[str] = None):
+        self.state = state
+        self.error = error
+        self.launch = None
+        self._done.set()
+
+
+class LaunchScheduler:
+    """
+    Admission control for flow launches.
+
+    - Launches are queued and started only while a slot is free: at most
+      max_in_flight executions overall and flow_limits[flow] per flow
+    - A slot is held until the launched execution finishes (release_when)
+    - Queued flows launch in priority order: crisis shield, then sales,
+      then market monitoring
+    - Within a flow, farmers are served round-robin so one farmer's burst
+      does not delay everybody else
+    - Callers get a ticket that resolves to the Kestra execution ID
+    """
+
+    def __init__(
+        self,
+        release_when: Callable[[ExecutionResult], Awaitable[Any]],
+        max_in_flight: int = 50,
+        flow_limits: Optional[Dict[str, int]] = None,
+        max_queued: int = 10000,
+        max_tickets: int = 50000
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            release_when: Coroutine function returning once a launched execution
+                no longer needs its slot (normally when it finishes)
+            max_in_flight: Slots shared by all flows
+            flow_limits: Slots per flow ID (flows without an entry share only max_in_flight)
+            max_queued: Queued launches before submit() raises LaunchQueueFull
+            max_tickets: Tickets remembered for lookup before LRU eviction
+        """
+        self.release_when = release_when
+        self.max_in_flight = max_in_flight
+        self.flow_limits = {**DEFAULT_FLOW_LIMITS, **(flow_limits or {})}
+        self.max_queued = max_queued
+        self.max_tickets = max_tickets
+
+        # flow_id -> farmer_id -> queued tickets; farmers rotate to the end when served
+        self._queues: Dict[str, "OrderedDict[str, deque]"] = {}
+        self._queued: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._tickets: "OrderedDict[str, LaunchTicket]" = OrderedDict()
+        self._waits: Dict[str, deque] = {}
+        self._tasks = set()
+        self._closed = False
+        self._counters = {
+            "submitted": 0,
+            "launched": 0,
+            "failed": 0,
+            "rejected": 0,
+            "slot_timeouts": 0,
+        }
+
+    def priority(self, flow_id: str) -> int:
+        return FLOW_PRIORITIES.get(flow_id, DEFAULT_PRIORITY)
+
+    def _has_slot(self, flow_id: str) -> bool:
+        if sum(self._in_flight.values()) >= self.max_in_flight:
+            return False
+        limit = self.flow_limits.get(flow_id)
+        return limit is None or self._in_flight.get(flow_id, 0) < limit
+
+    async def submit(
+        self,
+        flow_id: str,
+        farmer_id: Optional[str],
+        launch: Callable[[], Awaitable[ExecutionResult]]
+    ) -> LaunchTicket:
+        """
+        Queue a launch; it starts immediately if a slot is free.
+
+        Args:
+            flow_id: Kestra flow being launched (sets priority and limit)
+            farmer_id: Requesting farmer, for fair ordering (None shares one turn)
+            launch: Coroutine function creating the execution
+
+        Returns:
+            LaunchTicket for the queued launch
+
+        Raises:
+            LaunchQueueFull: If max_queued launches are already waiting
+        """
+        if self._closed:
+            raise LaunchQueueFull("Launch scheduler is shutting down")
+        if sum(self._queued.values()) >= self.max_queued:
+            self._counters["rejected"] += 1
+            raise LaunchQueueFull(f"Launch queue is full ({self.max_queued} queued)")
+
+        ticket = LaunchTicket(ticket_id=uuid.uuid4().hex, flow_id=flow_id, farmer_id=farmer_id or "", launch=launch)
+        self._tickets[ticket.ticket_id] = ticket
+        while len(self._tickets) > self.max_tickets:
+            self._tickets.popitem(last=False)
+
+        farmers = self._queues.setdefault(flow_id, OrderedDict())
+        farmers.setdefault(ticket.farmer_id, deque()).append(ticket)
+        self._queued[flow_id] = self._queued.get(flow_id, 0) + 1
+        self._counters["submitted"] += 1
+
+        self._dispatch()
+        return ticket
+
+    async def submit_batch(
+        self,
+        flow_id: str,
+        launches: List[Tuple[Optional[str], Callable[[], Awaitable[ExecutionResult]]]]
+    ) -> List[Union[LaunchTicket, LaunchQueueFull]]:
+        """
+        Queue many launches of one flow, in order.
+
+        Rows are queued like individual submits (same limits, priority and
+        farmer round-robin), so a large batch waits for slots instead of
+        launching all at once.
+
+        Args:
+            flow_id: Kestra flow being launched
+            launches: (farmer_id, launch) per row
+
+        Returns:
+            Per row, its LaunchTicket, or the LaunchQueueFull error if the
+            queue filled up before the row was queued
+        """
+        outcomes: List[Union[LaunchTicket, LaunchQueueFull]] = []
+        for farmer_id, launch in launches:
+            try:
+                outcomes.append(await self.submit(flow_id, farmer_id, launch))
+            except LaunchQueueFull as e:
+                outcomes.append(e)
+        return outcomes
+
+    def get(self, ticket_id: str) -> Optional[LaunchTicket]:
+        """Look up a ticket by ID."""
+        return self._tickets.get(ticket_id)
+
+    def _dispatch(self):
+        """Start queued launches, highest priority first, while slots are free."""
+        if self._closed:
+            return
+        for flow_id in sorted(self._queues, key=self.priority):
+            farmers = self._queues[flow_id]
+            while farmers and self._has_slot(flow_id):
+                farmer_id, tickets = next(iter(farmers.items()))
+                ticket = tickets.popleft()
+                if tickets:
+                    farmers.move_to_end(farmer_id)
+                else:
+                    del farmers[farmer_id]
+                self._queued[flow_id] -= 1
+                self._start(ticket)
+            metrics.launch_queue_depth.set(self._queued.get(flow_id, 0), flow=flow_id)
+
+    def _start(self, ticket: LaunchTicket):
+        flow_id = ticket.flow_id
+        self._in_flight[flow_id] = self._in_flight.get(flow_id, 0) + 1
+        metrics.launches_in_flight.set(self._in_flight[flow_id], flow=flow_id)
+
+        waited = time.monotonic() - ticket._queued
+        metrics.launch_queue_wait.observe(waited, flow=flow_id)
+        self._waits.setdefault(flow_id, deque(maxlen=_RECENT_WAITS)).append(waited)
+
+        ticket.state = "LAUNCHING"
+        ticket.launched_at = time.time()
+        task = asyncio.ensure_future(self._run(ticket))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, ticket: LaunchTicket):
+        """Launch one ticket and hold its slot until the execution finishes."""
+        flow_id = ticket.flow_id
+        try:
+            try:
+                ticket.result = await ticket.launch()
+            except Exception as e:
+                self._counters["failed"] += 1
+                ticket._finish("FAILED", str(e))
+                return
+            ticket._finish("LAUNCHED")
+            self._counters["launched"] += 1
+
+            try:
+                await self.release_when(ticket.result)
+            except asyncio.CancelledError:
+                if self._closed:
+                    raise
+                # The waiter was closed under us; give the slot back
+            except Exception:
+                self._counters["slot_timeouts"] += 1
+        finally:
+            if not ticket._done.is_set():
+                ticket._finish("CANCELLED")
+            self._in_flight[flow_id] -= 1
+            metrics.launches_in_flight.set(self._in_flight[flow_id], flow=flow_id)
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-flow queue depth, slots in use and queue wait percentiles."""
+        now = time.monotonic()
+        flows = {}
+        for flow_id in sorted(set(self._queues) | set(self._in_flight), key=self.priority):
+            waits = sorted(self._waits.get(flow_id, ()))
+            heads = [tickets[0]._queued for tickets in self._queues.get(flow_id, {}).values()]
+            flows[flow_id] = {
+                "priority": self.priority(flow_id),
+                "queued": self._queued.get(flow_id, 0),
+                "queued_farmers": len(self._queues.get(flow_id, {})),
+                "in_flight": self._in_flight.get(flow_id, 0),
+                "limit": self.flow_limits.get(flow_id),
+                "oldest_queued_seconds": round(now - min(heads), 3) if heads else 0.0,
+                "wait_p50_seconds": round(_percentile(waits, 0.50), 3),
+                "wait_p95_seconds": round(_percentile(waits, 0.95), 3),
+                "wait_max_seconds": round(waits[-1], 3) if waits else 0.0,
+            }
+        return {
+            "queued": sum(self._queued.values()),
+            "max_queued": self.max_queued,
+            "in_flight": sum(self._in_flight.values()),
+            "max_in_flight": self.max_in_flight,
+            "tickets": len(self._tickets),
+            "flows": flows,
+            **self._counters,
+        }
+
+    async def close(self):
+        """Cancel queued launches and stop holding slots."""
+        self._closed = True
+        for farmers in self._queues.values():
+            for tickets in farmers.values():
+                for ticket in tickets:
+                    ticket._finish("CANCELLED", "Server shutting down")
+        self._queues.clear()
+        self._queued.clear()
+        tasks: List[asyncio.Task] = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
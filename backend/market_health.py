@@ -0,0 +1,170 @@
+from datetime import date
+from importlib.util import find_spec
+from typing import Optional, Dict, Any, List
+
+# NumPy is only imported when market health is first computed
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+if not NUMPY_AVAILABLE:
+    print("NumPy not installed. Market health analytics disabled. Run: pip install numpy")
+
+from market_store import COST_OF_PRODUCTION
+
+
+def _number(value, digits: int = 2) -> Optional[float]:
+    """Convert a NumPy scalar to a rounded float, or None for NaN."""
+    value = float(value)
+    return None if value != value else round(value, digits)
+
+
+def compute_market_health(
+    commodities: List[str],
+    states: List[str],
+    rows: List[Dict[str, Any]],
+    as_of: Optional[str],
+    threshold_percent: float = 15.0,
+    days: int = 30,
+    costs: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Classify every commodity × state pair from daily prices in one pass.
+
+    Prices are laid out as a (pairs × days) matrix with NaN for days
+    without arrivals, and every statistic is computed column-wise over
+    that matrix. Each pair's window ends at its own latest arrival (the
+    row's "latest", else as_of), so a pair whose data lags the others is
+    not pushed out of the window. Per pair, the current price is the
+    latest observed day and the 7-day average covers the 7 days ending
+    there (as in MarketStore.analyze).
+
+    Classification, in order of precedence:
+        NO_DATA  no prices in the window
+        CRISIS   price below 80% of production cost
+        WARNING  price below production cost
+        CRISIS   drop from 7-day average >= 2 × threshold
+        WARNING  drop from 7-day average >= threshold
+        NORMAL   otherwise
+
+    Args:
+        commodities: Commodity names
+        states: State names
+        rows: Daily prices as returned by MarketStore.daily_prices
+        as_of: Latest day with data for any pair (ISO date), or None if there is no data
+        threshold_percent: Drop percentage that triggers a warning
+        days: Window length in days
+        costs: Cost of production per kg by commodity (default: COST_OF_PRODUCTION)
+
+    Returns:
+        Dictionary with overall market_health (NO_DATA when no pair has
+        prices), status counts, per-pair results and the non-NORMAL alerts
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("NumPy is required for market health analytics")
+    import numpy as np
+
+    costs = costs or {}
+    pairs = [(c, s) for c in commodities for s in states]
+    index = {(c.lower(), s.lower()): i for i, (c, s) in enumerate(pairs)}
+    prices = np.full((len(pairs), days), np.nan)
+
+    window_end: Dict[int, str] = {}
+    if as_of is not None and rows:
+        located = []
+        for r in rows:
+            i = index.get((r["commodity"].lower(), r["state"].lower()))
+            end = r.get("latest") or as_of
+            if i is not None:
+                window_end[i] = end
+            located.append((
+                i,
+                days - 1 - (date.fromisoformat(end) - date.fromisoformat(r["arrival_date"])).days,
+                r["modal_price"]
+            ))
+        located = [(i, col, p) for i, col, p in located if i is not None and 0 <= col < days]
+        if located:
+            row_idx, col_idx, values = (np.array(v) for v in zip(*located))
+            prices[row_idx, col_idx] = values
+
+    observed = ~np.isnan(prices)
+    filled = np.where(observed, prices, 0.0)
+    counts = observed.sum(axis=1)
+    has_data = counts > 0
+    columns = np.arange(days)
+
+    # Latest observed day per pair
+    last_col = days - 1 - np.argmax(observed[:, ::-1], axis=1)
+    current = np.where(has_data, prices[np.arange(len(pairs)), last_col], np.nan)
+
+    week = observed & (columns >= last_col[:, None] - 6) & (columns <= last_col[:, None])
+    cost_per_quintal = np.array([costs.get(c, COST_OF_PRODUCTION.get(c, 10)) for c, _ in pairs]) * 100
+
+    # Rolling 7-day averages over the window via cumulative sums
+    window = min(7, days)
+    sums = np.concatenate([np.zeros((len(pairs), 1)), np.cumsum(filled, axis=1)], axis=1)
+    hits = np.concatenate([np.zeros((len(pairs), 1)), np.cumsum(observed, axis=1)], axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_7 = (filled * week).sum(axis=1) / week.sum(axis=1)
+        avg_30 = filled.sum(axis=1) / counts
+        mean_sq = (filled ** 2).sum(axis=1) / counts
+        volatility = np.sqrt(np.maximum(mean_sq - avg_30 ** 2, 0)) / avg_30 * 100
+        drop = (avg_7 - current) / avg_7 * 100
+        rolling = (sums[:, window:] - sums[:, :-window]) / (hits[:, window:] - hits[:, :-window])
+
+    conditions = [
+        ~has_data,
+        current < cost_per_quintal * 0.8,
+        current < cost_per_quintal,
+        drop >= threshold_percent * 2,
+        drop >= threshold_percent,
+    ]
+    status = np.select(conditions, ["NO_DATA", "CRISIS", "WARNING", "CRISIS", "WARNING"], "NORMAL")
+    reason = np.select(
+        conditions,
+        ["NO_DATA", "BELOW_80_PERCENT_COST", "BELOW_COST", "PRICE_CRASH", "PRICE_DROP"],
+        "STABLE"
+    )
+    trend = np.select(
+        [~has_data, drop >= threshold_percent * 2, drop > 5, drop < -5],
+        ["UNKNOWN", "CRASHING", "FALLING", "RISING"],
+        "STABLE"
+    )
+
+    results = []
+    for i, (commodity, state) in enumerate(pairs):
+        results.append({
+            "commodity": commodity,
+            "state": state,
+            "as_of": window_end.get(i),
+            "status": str(status[i]),
+            "reason": str(reason[i]),
+            "price_trend": str(trend[i]),
+            "current_price": _number(current[i]),
+            "current_price_per_kg": _number(current[i] / 100),
+            "avg_price_7day": _number(avg_7[i]),
+            "avg_price_30day": _number(avg_30[i]),
+            "price_drop_percent": _number(drop[i], 1),
+            "volatility_percent": _number(volatility[i], 1),
+            "cost_per_kg": _number(cost_per_quintal[i] / 100),
+            "days_with_data": int(counts[i]),
+            "rolling_avg_7day": [_number(v) for v in rolling[i]],
+        })
+
+    summary = {s: int((status == s).sum()) for s in ("CRISIS", "WARNING", "NORMAL", "NO_DATA")}
+    if summary["CRISIS"]:
+        market_health = "CRITICAL"
+    elif summary["WARNING"]:
+        market_health = "WARNING"
+    elif summary["NO_DATA"] == len(pairs):
+        market_health = "NO_DATA"
+    else:
+        market_health = "HEALTHY"
+
+    return {
+        "market_health": market_health,
+        "as_of": as_of,
+        "window_days": days,
+        "threshold_percent": threshold_percent,
+        "summary": summary,
+        "results": results,
+        "alerts": [r for r in results if r["status"] in ("CRISIS", "WARNING")],
+    }
@@ -0,0 +1,330 @@
+import time
+import asyncio
+import threading
+import functools
+from bisect import bisect_left
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+# Seconds; covers fast cache hits through slow Kestra deploys
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for labelled metrics; one value (or histogram state) per label combination."""
+
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition lines for this metric."""
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples()
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with a running sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        # Index of the first bucket with upper bound >= value; len(buckets) is +Inf
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together by the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "agrilink_http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "agrilink_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "agrilink_http_requests_in_flight", "HTTP requests currently being served", ("method",)
+)
+http_exceptions = registry.counter(
+    "agrilink_http_exceptions_total", "Unhandled exceptions raised by route handlers", ("method", "route")
+)
+
+kestra_call_duration = registry.histogram(
+    "agrilink_kestra_call_duration_seconds", "Kestra API call latency", ("operation", "outcome")
+)
+kestra_calls_in_flight = registry.gauge(
+    "agrilink_kestra_calls_in_flight", "Kestra API calls currently in progress", ("operation",)
+)
+kestra_call_errors = registry.counter(
+    "agrilink_kestra_call_errors_total", "Failed Kestra API calls", ("operation",)
+)
+
+db_query_duration = registry.histogram(
+    "agrilink_db_query_duration_seconds", "Executions database query latency", ("query", "outcome")
+)
+db_query_rows = registry.histogram(
+    "agrilink_db_query_rows", "Rows returned per executions database query", ("query",), ROW_BUCKETS
+)
+db_queries_in_flight = registry.gauge(
+    "agrilink_db_queries_in_flight", "Executions database queries currently running", ("query",)
+)
+db_query_errors = registry.counter(
+    "agrilink_db_query_errors_total", "Failed executions database queries", ("query",)
+)
+db_pool_connections = registry.gauge(
+    "agrilink_db_pool_connections", "Database pool connections by state (set at scrape time)", ("state",)
+)
+
+launch_queue_depth = registry.gauge(
+    "agrilink_launch_queue_depth", "Flow launches waiting for a scheduler slot", ("flow",)
+)
+launch_queue_wait = registry.histogram(
+    "agrilink_launch_queue_wait_seconds", "Time flow launches spent queued before launching", ("flow",)
+)
+launches_in_flight = registry.gauge(
+    "agrilink_launches_in_flight", "Launched executions holding a scheduler slot", ("flow",)
+)
+
+
+def _instrument(
+    operation: str,
+    duration: Histogram,
+    in_flight: Gauge,
+    errors: Counter,
+    label: str,
+    on_result: Optional[Callable[[Any], None]] = None
+):
+    """Decorator timing a sync or async callable into the given metrics."""
+
+    def finish(started: float, outcome: str):
+        duration.observe(time.perf_counter() - started, **{label: operation, "outcome": outcome})
+        in_flight.dec(**{label: operation})
+        if outcome == "error":
+            errors.inc(**{label: operation})
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                in_flight.inc(**{label: operation})
+                started = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException:
+                    finish(started, "error")
+                    raise
+                finish(started, "success")
+                if on_result:
+                    on_result(result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            in_flight.inc(**{label: operation})
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                finish(started, "error")
+                raise
+            finish(started, "success")
+            if on_result:
+                on_result(result)
+            return result
+        return wrapper
+
+    return decorator
+
+
+def timed_kestra_call(operation: str):
+    """Record latency, in-flight count and failures of a Kestra API call."""
+    return _instrument(operation, kestra_call_duration, kestra_calls_in_flight, kestra_call_errors, "operation")
+
+
+def timed_query(query: str, count_rows: Callable[[Any], int] = len):
+    """
+    Record latency, in-flight count, failures and row count of a database query.
+
+    Args:
+        query: Label identifying the query
+        count_rows: Maps the method's return value to the number of rows it returned
+    """
+    def on_result(result):
+        db_query_rows.observe(count_rows(result) if result is not None else 0, query=query)
+
+    return _instrument(query, db_query_duration, db_queries_in_flight, db_query_errors, "query", on_result)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status codes and in-flight requests.
+
+    Routes are labelled by their path template (e.g. /api/execution/{execution_id})
+    so label cardinality stays bounded; unmatched paths share one label.
+    Latency runs until the response body has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            http_exceptions.inc(method=method, route=self._route(scope))
+            raise
+        finally:
+            route = self._route(scope)
+            http_request_duration.observe(time.perf_counter() - started, method=method, route=route)
+            http_requests.inc(method=method, route=route, status=status[0])
+            http_requests_in_flight.dec(method=method)
+
+    @staticmethod
+    def _route(scope) -> str:
+        # The router stores the matched route in the (shared) scope
+        route = scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
@@ -0,0 +1,192 @@
+import os
+import re
+import glob
+from typing import List, Dict, Any, Optional
+
+from env import load_env, env_flag
+from database import KestraDatabase, db as default_db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Migrations that only apply while a feature flag is on. With the flag off
+# the listed statements run instead, removing what the migration installed.
+FEATURE_MIGRATIONS = {
+    "002_executions_change_notify.sql": (
+        "EXECUTION_CHANGE_FEED",
+        ["DROP TRIGGER IF EXISTS agrilink_executions_notify ON executions"],
+    ),
+    "004_execution_rollups.sql": (
+        "EXECUTION_ANALYTICS",
+        ["DROP TRIGGER IF EXISTS agrilink_executions_log_change ON executions"],
+    ),
+}
+
+_CONCURRENT_INDEX = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\S+)",
+    re.IGNORECASE
+)
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a SQL script into individual statements.
+
+    Semicolons inside quoted strings, dollar-quoted bodies and comments
+    are not treated as statement terminators.
+
+    Args:
+        sql: SQL script text
+
+    Returns:
+        List of non-empty statements without trailing semicolons
+    """
+    statements = []
+    current = []
+    i = 0
+    quote = None  # "'", '"' or a dollar-quote tag such as "$$"
+
+    while i < len(sql):
+        char = sql[i]
+
+        if quote:
+            if sql.startswith(quote, i):
+                current.append(quote)
+                i += len(quote)
+                quote = None
+                continue
+            current.append(char)
+            i += 1
+            continue
+
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = len(sql) if end == -1 else end + 1
+            continue
+
+        if char in ("'", '"'):
+            quote = char
+        elif char == "$":
+            end = sql.find("$", i + 1)
+            tag = sql[i:end + 1] if end != -1 else ""
+            if tag and (tag == "$$" or tag[1:-1].replace("_", "").isalnum()):
+                quote = tag
+                current.append(tag)
+                i = end + 1
+                continue
+        elif char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+            continue
+
+        current.append(char)
+        i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def drop_invalid_index(cursor, statement: str) -> Optional[str]:
+    """
+    Drop the index a CREATE INDEX CONCURRENTLY IF NOT EXISTS would skip because it is INVALID.
+
+    A concurrent build that fails or is interrupted leaves an INVALID
+    index behind; IF NOT EXISTS then skips it forever while the planner
+    never uses it. Dropping it first lets the statement rebuild it.
+
+    Returns:
+        Name of the dropped index, or None
+    """
+    match = _CONCURRENT_INDEX.match(statement)
+    if not match:
+        return None
+    name = match.group(1)
+    cursor.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (name,))
+    row = cursor.fetchone()
+    if row is None or row[0]:
+        return None
+    cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    return name
+
+
+def apply_migrations(
+    database: Optional[KestraDatabase] = None,
+    directory: str = MIGRATIONS_DIR
+) -> Dict[str, Any]:
+    """
+    Apply every migration script in name order.
+
+    Scripts are written to be idempotent, so applying them again is a
+    no-op. Statements run in autocommit mode because CREATE INDEX
+    CONCURRENTLY cannot run inside a transaction; INVALID indexes left by
+    an earlier failed concurrent build are dropped and rebuilt. Scripts
+    in FEATURE_MIGRATIONS are only applied while their flag is on, and
+    reverted while it is off.
+
+    Args:
+        database: Database to migrate (default: the shared instance)
+        directory: Directory containing *.sql migration files
+
+    Returns:
+        Dictionary mapping migration file name to statement count (and
+        rebuilt indexes) or error
+    """
+    load_env()
+    database = database or default_db
+    results = {}
+
+    conn = database.get_connection()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            for path in sorted(glob.glob(os.path.join(directory, "*.sql"))):
+                name = os.path.basename(path)
+                flag, revert = FEATURE_MIGRATIONS.get(name, (None, []))
+                if flag and not env_flag(flag):
+                    try:
+                        for statement in revert:
+                            cursor.execute(statement)
+                        results[name] = {"success": True, "skipped": f"{flag} is off"}
+                    except Exception as e:
+                        results[name] = {"success": False, "error": str(e)}
+                        break
+                    continue
+
+                with open(path, "r") as f:
+                    statements = split_statements(f.read())
+                rebuilt = []
+                try:
+                    for statement in statements:
+                        dropped = drop_invalid_index(cursor, statement)
+                        if dropped:
+                            rebuilt.append(dropped)
+                        cursor.execute(statement)
+                    results[name] = {"success": True, "statements": len(statements), "rebuilt": rebuilt}
+                except Exception as e:
+                    results[name] = {"success": False, "error": str(e)}
+                    break
+    finally:
+        conn.close()
+
+    return results
+
+
+def main():
+    results = apply_migrations()
+    for name, result in results.items():
+        if result.get("skipped"):
+            print(f"  ⏭️ {name}: skipped ({result['skipped']})")
+        elif result["success"]:
+            print(f"  ✅ {name}: {result['statements']} statements")
+            for index in result["rebuilt"]:
+                print(f"  🔧 {name}: rebuilt invalid index {index}")
+        else:
+            print(f"  ⚠️ {name}: error: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+-- Indexes backing keyset pagination on /api/executions.
+-- Every listing orders by (start_date, id) within a namespace; the optional
+-- flow_id and state filters each get a matching leading column.
+-- CONCURRENTLY keeps Kestra writing while the indexes build.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS agrilink_executions_ns_start_idx
+    ON executions (namespace, start_date DESC, id DESC)
+    WHERE deleted = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS agrilink_executions_ns_flow_start_idx
+    ON executions (namespace, flow_id, start_date DESC, id DESC)
+    WHERE deleted = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS agrilink_executions_ns_state_start_idx
+    ON executions (namespace, state_current, start_date DESC, id DESC)
+    WHERE deleted = false;
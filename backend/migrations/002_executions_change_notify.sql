@@ -0,0 +1,38 @@
+-- Change feed for execution transitions.
+-- Publishes a small JSON payload on the agrilink_executions channel whenever
+-- an execution is created or its current state changes. Outputs are not
+-- included (NOTIFY payloads are limited to 8000 bytes); listeners re-read them.
+--
+-- Only applied when EXECUTION_CHANGE_FEED is on (see FEATURE_MIGRATIONS in
+-- migrations.py): the trigger adds a NOTIFY to every write on Kestra's table.
+-- With the flag off, migrations.py drops the trigger instead.
+
+CREATE OR REPLACE FUNCTION agrilink_notify_execution_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW.state_current IS NOT DISTINCT FROM OLD.state_current
+            AND NEW.deleted IS NOT DISTINCT FROM OLD.deleted THEN
+            RETURN NEW;
+        END IF;
+    END IF;
+
+    PERFORM pg_notify(
+        'agrilink_executions',
+        json_build_object(
+            'id', NEW.id,
+            'namespace', NEW.namespace,
+            'flow_id', NEW.flow_id,
+            'state', NEW.state_current,
+            'deleted', NEW.deleted
+        )::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS agrilink_executions_notify ON executions;
+
+CREATE TRIGGER agrilink_executions_notify
+    AFTER INSERT OR UPDATE ON executions
+    FOR EACH ROW
+    EXECUTE FUNCTION agrilink_notify_execution_change();
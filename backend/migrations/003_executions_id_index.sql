@@ -0,0 +1,6 @@
+-- Index backing batch status lookups (POST /api/executions/status),
+-- which resolve thousands of executions with one id = ANY(...) query.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS agrilink_executions_id_idx
+    ON executions (id)
+    WHERE deleted = false;
@@ -0,0 +1,77 @@
+-- Incrementally maintained execution analytics (GET /api/analytics).
+-- A trigger appends every execution creation and state/duration change to
+-- agrilink_execution_changes. The refresher (analytics.py) consumes changes
+-- by deleting exactly the committed rows it reads (sequence values commit
+-- out of order, so no high-water mark), updates one fact row per execution
+-- and recomputes only the hour and day buckets those executions fall in.
+--
+-- Only applied when EXECUTION_ANALYTICS is on, since nothing else drains
+-- agrilink_execution_changes. With the flag off, migrations.py drops the
+-- trigger and leaves the tables in place.
+
+CREATE TABLE IF NOT EXISTS agrilink_execution_changes (
+    seq BIGSERIAL PRIMARY KEY,
+    execution_id VARCHAR(150) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS agrilink_execution_facts (
+    execution_id VARCHAR(150) PRIMARY KEY,
+    namespace VARCHAR(150) NOT NULL,
+    flow_id VARCHAR(150) NOT NULL,
+    state VARCHAR(50) NOT NULL,
+    start_hour TIMESTAMPTZ NOT NULL,
+    duration DOUBLE PRECISION
+);
+
+CREATE INDEX IF NOT EXISTS agrilink_execution_facts_bucket_idx
+    ON agrilink_execution_facts (namespace, flow_id, start_hour);
+
+-- One row per granularity (hour or day), bucket, flow and state
+CREATE TABLE IF NOT EXISTS agrilink_execution_rollups (
+    granularity VARCHAR(4) NOT NULL,
+    namespace VARCHAR(150) NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL,
+    flow_id VARCHAR(150) NOT NULL,
+    state VARCHAR(50) NOT NULL,
+    executions INTEGER NOT NULL,
+    duration_avg DOUBLE PRECISION,
+    duration_p50 DOUBLE PRECISION,
+    duration_p90 DOUBLE PRECISION,
+    duration_p95 DOUBLE PRECISION,
+    duration_p99 DOUBLE PRECISION,
+    duration_max DOUBLE PRECISION,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (granularity, namespace, bucket, flow_id, state)
+);
+
+CREATE TABLE IF NOT EXISTS agrilink_rollup_watermark (
+    name VARCHAR(50) PRIMARY KEY,
+    last_seq BIGINT NOT NULL DEFAULT 0,
+    backfilled BOOLEAN NOT NULL DEFAULT false,
+    refreshed_at TIMESTAMPTZ
+);
+
+INSERT INTO agrilink_rollup_watermark (name) VALUES ('executions')
+    ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION agrilink_log_execution_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW.state_current IS NOT DISTINCT FROM OLD.state_current
+            AND NEW.state_duration IS NOT DISTINCT FROM OLD.state_duration
+            AND NEW.deleted IS NOT DISTINCT FROM OLD.deleted THEN
+            RETURN NEW;
+        END IF;
+    END IF;
+
+    INSERT INTO agrilink_execution_changes (execution_id) VALUES (NEW.id);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS agrilink_executions_log_change ON executions;
+
+CREATE TRIGGER agrilink_executions_log_change
+    AFTER INSERT OR UPDATE ON executions
+    FOR EACH ROW
+    EXECUTE FUNCTION agrilink_log_execution_change();
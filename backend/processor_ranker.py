@@ -0,0 +1,209 @@
+import os
+import re
+from typing import Optional, Dict, Any, List
+
+from registry import JsonRegistry, DATA_DIR
+
+DEFAULT_PROCESSORS_PATH = os.path.join(DATA_DIR, "processors.json")
+
+# Transport cost (₹/kg) the farmer bears when the outlet does not pick up
+TRANSPORT_COST_PER_KG = {"city": 0.5, "state": 1.0, "other": 2.5}
+
+# Value lost per day of payment delay (fraction of the payout)
+PAYMENT_DELAY_COST_PER_DAY = 0.002
+
+# Days a cold-storage lot is assumed to be held before selling
+DEFAULT_HOLD_DAYS = 7
+
+
+def payment_days(terms: Optional[str]) -> int:
+    """Parse payment terms ("immediate", "7_days" ...) into days until payment."""
+    if not terms or terms == "immediate":
+        return 0
+    match = re.search(r"\d+", terms)
+    return int(match.group()) if match else 0
+
+
+def daily_capacity_kg(capacity: Dict[str, Any]) -> Optional[float]:
+    """Daily intake in kg from whichever capacity field the outlet declares."""
+    for key in ("dailyTons", "dailyCapacityTons", "availableCapacityTons"):
+        if capacity.get(key) is not None:
+            return capacity[key] * 1000
+    return None
+
+
+class ProcessorRanker(JsonRegistry):
+    """
+    Deterministic crisis-outlet ranking over data/processors.json.
+
+    Outlets are filtered on commodity, grade, quantity limits and crisis
+    acceptance, then ranked by the net amount the farmer receives per kg:
+    the outlet's price (priceMultiplier × market rate; × cost for MSP;
+    held-and-sold price minus fees for cold storage), less transport when
+    there is no pickup, discounted for payment delay.
+    """
+
+    records_key = "processors"
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 1.0):
+        """
+        Initialize the ranker. The registry is loaded on first use.
+
+        Args:
+            path: Outlet registry path (default: PROCESSORS_PATH env or data/processors.json)
+            check_interval: Minimum seconds between file modification checks
+        """
+        super().__init__(path or os.getenv("PROCESSORS_PATH", DEFAULT_PROCESSORS_PATH), check_interval)
+        self._by_commodity: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _build(self, processors: List[Dict[str, Any]]):
+        by_commodity: Dict[str, List[Dict[str, Any]]] = {}
+        for processor in processors:
+            if not processor.get("crisisAcceptance", False):
+                continue
+            for commodity in processor.get("acceptedCommodities", []):
+                by_commodity.setdefault(commodity.lower(), []).append(processor)
+        self._by_commodity = by_commodity
+
+    def _price_per_kg(
+        self,
+        outlet: Dict[str, Any],
+        market_price_per_kg: float,
+        cost_per_kg: float,
+        recovery_price_per_kg: float,
+        hold_days: int
+    ) -> float:
+        pricing = outlet.get("pricing", {})
+        if outlet.get("type") == "cold_storage":
+            storage = pricing.get("storageCostPerKgPerDay", 0) * hold_days
+            return recovery_price_per_kg - storage - pricing.get("handlingChargePerKg", 0)
+        if outlet.get("type") == "msp":
+            # MSP centres pay a share of the cost price, not the market rate
+            return pricing.get("priceMultiplier", 0) * cost_per_kg
+        return pricing.get("priceMultiplier", 0) * market_price_per_kg
+
+    def rank(
+        self,
+        commodity: str,
+        quantity_kg: float,
+        market_price_per_kg: float,
+        cost_per_kg: float,
+        grade: Optional[str] = None,
+        state: Optional[str] = None,
+        district: Optional[str] = None,
+        recovery_price_per_kg: Optional[float] = None,
+        hold_days: int = DEFAULT_HOLD_DAYS,
+        limit: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Rank crisis outlets for a lot.
+
+        Args:
+            commodity: Commodity name (case-insensitive)
+            quantity_kg: Lot size in kg
+            market_price_per_kg: Current market price in ₹/kg
+            cost_per_kg: Farmer's cost of production in ₹/kg
+            grade: Lot quality grade; None skips the grade check
+            state: Farmer's state, for transport cost
+            district: Farmer's district, compared with the outlet city
+            recovery_price_per_kg: Expected price after cold storage (default: market price)
+            hold_days: Days a cold-storage lot is held
+            limit: Maximum outlets to return
+
+        Returns:
+            Dictionary with the ranked "outlets" (each with a financial_analysis
+            in the crisis router's format), "total_eligible" and "decision",
+            the top outlet in the crisis router's output format (or None)
+        """
+        self._ensure_loaded()
+        grade = (grade or "").strip().upper() or None
+        if recovery_price_per_kg is None:
+            recovery_price_per_kg = market_price_per_kg
+
+        market_total = market_price_per_kg * quantity_kg
+        market_loss = max(cost_per_kg * quantity_kg - market_total, 0)
+
+        ranked = []
+        for outlet in self._by_commodity.get(commodity.lower(), []):
+            capacity = outlet.get("capacity", {})
+            if grade and outlet.get("acceptedGrades") and grade not in outlet["acceptedGrades"]:
+                continue
+            if quantity_kg < capacity.get("minimumQuantityKg", 0):
+                continue
+            daily_kg = daily_capacity_kg(capacity)
+            if daily_kg is not None and quantity_kg > daily_kg:
+                continue
+
+            location = outlet.get("location", {})
+            if outlet.get("pickupAvailable"):
+                transport = 0.0
+            elif district and location.get("city", "").lower() == district.lower():
+                transport = TRANSPORT_COST_PER_KG["city"]
+            elif state and location.get("state", "").lower() == state.lower():
+                transport = TRANSPORT_COST_PER_KG["state"]
+            else:
+                transport = TRANSPORT_COST_PER_KG["other"]
+
+            price = self._price_per_kg(outlet, market_price_per_kg, cost_per_kg, recovery_price_per_kg, hold_days)
+            days = payment_days(outlet.get("paymentTerms"))
+            net_price = (price - transport) * (1 - PAYMENT_DELAY_COST_PER_DAY * days)
+
+            outlet_total = net_price * quantity_kg
+            outlet_loss = max(cost_per_kg * quantity_kg - outlet_total, 0)
+            ranked.append({
+                "id": outlet.get("id"),
+                "name": outlet.get("name"),
+                "type": outlet.get("type"),
+                "location": ", ".join(v for v in (location.get("city"), location.get("state")) if v),
+                "contact_phone": outlet.get("contact", {}).get("phone"),
+                "payment_terms": outlet.get("paymentTerms"),
+                "pickup_available": bool(outlet.get("pickupAvailable")),
+                "score": round(net_price, 4),
+                "financial_analysis": {
+                    "market_sale_price_per_kg": round(market_price_per_kg, 2),
+                    "market_sale_total": round(market_total, 2),
+                    "market_loss": round(market_loss, 2),
+                    "outlet_price_per_kg": round(price, 2),
+                    "transport_cost_per_kg": transport,
+                    "payment_delay_days": days,
+                    "outlet_total": round(outlet_total, 2),
+                    "outlet_loss": round(outlet_loss, 2),
+                    "savings_vs_market": round(market_loss - outlet_loss, 2),
+                    "loss_reduction_percent": (
+                        round((market_loss - outlet_loss) / market_loss * 100, 1) if market_loss else 0.0
+                    ),
+                },
+            })
+
+        # Stable tie-break on id so identical inputs always give identical output
+        ranked.sort(key=lambda o: (-o["score"], o["id"] or ""))
+        shortlist = ranked[:limit]
+
+        decision = None
+        if shortlist:
+            best = shortlist[0]
+            decision = {
+                "selected_outlet": {
+                    "name": best["name"],
+                    "type": best["type"],
+                    "location": best["location"],
+                    "contact_phone": best["contact_phone"],
+                },
+                "financial_analysis": best["financial_analysis"],
+                "reasoning": (
+                    f"Highest net price after transport and payment delay: "
+                    f"₹{best['score']:.2f}/kg across {len(ranked)} eligible outlets"
+                ),
+                "alternative_options": [
+                    {"name": o["name"], "type": o["type"], "price": o["financial_analysis"]["outlet_price_per_kg"]}
+                    for o in shortlist[1:]
+                ],
+                "urgent_action_required": market_loss > 0,
+                "pickup_recommendation": "today" if best["pickup_available"] else "tomorrow",
+            }
+
+        return {"outlets": shortlist, "total_eligible": len(ranked), "decision": decision}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return registry size and the number of commodities with crisis outlets."""
+        return {**super().stats(), "commodities": len(self._by_commodity)}
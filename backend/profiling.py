@@ -0,0 +1,309 @@
+import os
+import re
+import hmac
+import json
+import time
+import random
+import asyncio
+import cProfile
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Callable
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".profiles")
+MAX_WINDOW_SECONDS = 3600
+DEFAULT_MAX_PROFILE_SECONDS = 30.0
+
+# Streams and long polls hold the profiler for minutes and mostly profile the
+# rest of the event loop; sampling skips them (X-Profile still works, capped)
+UNSAMPLED_PATHS = re.compile(r"^/api/execution/[^/]+/(stream|wait)$|^/api/executions/export$|^/api/tickets/")
+
+# Response bodies are only inspected for an execution ID up to this size
+_SNIFF_BYTES = 64 * 1024
+_EXECUTION_ID = re.compile(rb'"execution_id"\s*:\s*"([^"]+)"')
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", value).strip("-")[:60] or "root"
+
+
+class RequestProfiler:
+    """
+    Opt-in cProfile sampling of live requests.
+
+    Off unless an admin token is configured. Profiling is armed for a
+    time window and a sample rate (optionally limited to path prefixes),
+    or forced for a single request with the X-Profile header. Only one
+    request is profiled at a time, which bounds overhead; a profile stops
+    after max_profile_seconds even if the request is still running, and
+    saved profiles are capped at max_profiles, oldest deleted first.
+    Streaming and long-poll routes (UNSAMPLED_PATHS) are never sampled.
+
+    Profiles are standard pstats files (open with pstats, snakeviz or
+    flameprof) with a JSON sidecar holding route, status, duration and
+    the execution ID when the request touched one. Work a handler hands
+    to worker threads (database queries) shows up as time awaiting it.
+
+    cProfile hooks the event loop thread, not a single request: whatever
+    other requests run while the profiled one is awaiting are recorded
+    too. The sidecar's concurrent_requests (peak other requests in flight
+    during the profile) tells how clean a profile is; 0 means the profile
+    holds only this request.
+    """
+
+    def __init__(
+        self,
+        admin_token: str = "",
+        directory: str = DEFAULT_PROFILE_DIR,
+        max_profiles: int = 50,
+        max_profile_seconds: float = DEFAULT_MAX_PROFILE_SECONDS
+    ):
+        """
+        Initialize the profiler (disarmed).
+
+        Args:
+            admin_token: Token required in X-Admin-Token; empty disables profiling
+            directory: Where profiles are written
+            max_profiles: Profiles kept on disk before the oldest are deleted
+            max_profile_seconds: Longest a single profile runs before it is stopped
+        """
+        self.admin_token = admin_token
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self.max_profile_seconds = max_profile_seconds
+
+        self.sample_rate = 0.0
+        self.until = 0.0
+        self.path_prefixes: List[str] = []
+        self._busy = threading.Lock()
+        self._random = random.Random()
+        self._counters = {
+            "profiled": 0,
+            "skipped_busy": 0,
+            "truncated": 0,
+            "deleted": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token)
+
+    @property
+    def armed(self) -> bool:
+        return self.sample_rate > 0 and time.time() < self.until
+
+    def authorized(self, token: Optional[str]) -> bool:
+        """Check an admin token (constant time)."""
+        return self.enabled and token is not None and hmac.compare_digest(token, self.admin_token)
+
+    def arm(self, sample_rate: float, duration_seconds: float, path_prefixes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Profile a fraction of requests for a time window.
+
+        Args:
+            sample_rate: Fraction of matching requests to profile (0-1]
+            duration_seconds: Window length (capped at MAX_WINDOW_SECONDS)
+            path_prefixes: Only profile paths starting with one of these
+
+        Returns:
+            Current profiler status
+        """
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        if duration_seconds <= 0:
+            raise ValueError("duration_seconds must be positive")
+        self.sample_rate = sample_rate
+        self.until = time.time() + min(duration_seconds, MAX_WINDOW_SECONDS)
+        self.path_prefixes = list(path_prefixes or [])
+        print(f"🔬 Profiling {sample_rate:.0%} of requests for {min(duration_seconds, MAX_WINDOW_SECONDS):.0f}s")
+        return self.status()
+
+    def disarm(self):
+        """Stop sampling; forced single-request profiles still work."""
+        self.sample_rate = 0.0
+        self.until = 0.0
+        self.path_prefixes = []
+
+    def should_sample(self, path: str) -> bool:
+        """Whether an ordinary (not forced) request should be profiled."""
+        if not self.armed or UNSAMPLED_PATHS.match(path):
+            return False
+        if self.path_prefixes and not any(path.startswith(p) for p in self.path_prefixes):
+            return False
+        return self._random.random() < self.sample_rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Begin profiling a request, or None if another one is being profiled."""
+        if not self._busy.acquire(blocking=False):
+            self._counters["skipped_busy"] += 1
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    async def finish(self, profile: cProfile.Profile, metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        Stop profiling and save the profile with its metadata.
+
+        The files are written in a worker thread; the next profile can
+        start once they are saved.
+
+        Returns:
+            Profile ID, or None if it could not be saved
+        """
+        profile.disable()
+        if metadata.get("truncated"):
+            self._counters["truncated"] += 1
+        try:
+            return await asyncio.to_thread(self._save, profile, metadata)
+        finally:
+            self._busy.release()
+
+    def _save(self, profile: cProfile.Profile, metadata: Dict[str, Any]) -> Optional[str]:
+        started = datetime.now(timezone.utc)
+        parts = [started.strftime("%Y%m%dT%H%M%S%fZ"), metadata.get("method", ""), _slug(metadata.get("route", ""))]
+        if metadata.get("execution_id"):
+            parts.append(_slug(metadata["execution_id"]))
+        profile_id = "_".join(p for p in parts if p)
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, f"{profile_id}.pstats"))
+            with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as f:
+                json.dump({"id": profile_id, "saved_at": started.isoformat(), **metadata}, f)
+        except OSError as e:
+            print(f"Warning: could not save profile {profile_id}: {e}")
+            return None
+
+        self._counters["profiled"] += 1
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        profiles = sorted(f[:-len(".pstats")] for f in os.listdir(self.directory) if f.endswith(".pstats"))
+        for profile_id in profiles[:max(0, len(profiles) - self.max_profiles)]:
+            for suffix in (".pstats", ".json"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except OSError:
+                    pass
+            self._counters["deleted"] += 1
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Metadata of saved profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def profile_path(self, profile_id: str) -> Optional[str]:
+        """Path of a saved pstats file, or None if there is no such profile."""
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.pstats")
+        return path if os.path.exists(path) else None
+
+    def status(self) -> Dict[str, Any]:
+        """Return arming state and counters."""
+        return {
+            "enabled": self.enabled,
+            "armed": self.armed,
+            "sample_rate": self.sample_rate if self.armed else 0.0,
+            "remaining_seconds": round(max(0.0, self.until - time.time()), 1) if self.armed else 0.0,
+            "path_prefixes": self.path_prefixes,
+            "max_profiles": self.max_profiles,
+            **self._counters,
+        }
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests selected by a RequestProfiler.
+
+    When profiling is disabled or disarmed and no X-Profile header is
+    sent, requests pass straight through.
+    """
+
+    def __init__(self, app, get_profiler: Callable[[], Optional[RequestProfiler]]):
+        self.app = app
+        self.get_profiler = get_profiler
+        # Requests in flight, and their peak while a profile is running
+        self._active = 0
+        self._peak: Optional[int] = None
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.get_profiler() if scope["type"] == "http" else None
+        if profiler is None or not profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        self._active += 1
+        try:
+            if self._peak is not None:
+                self._peak = max(self._peak, self._active)
+            await self._serve(scope, receive, send, profiler)
+        finally:
+            self._active -= 1
+
+    async def _serve(self, scope, receive, send, profiler: RequestProfiler):
+        if not (self._forced(scope, profiler) or profiler.should_sample(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiler.start()
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = {"status": 500, "execution_id": None}
+        self._peak = self._active
+        truncated = []
+
+        def stop():
+            profile.disable()
+            truncated.append(True)
+
+        timer = asyncio.get_running_loop().call_later(profiler.max_profile_seconds, stop)
+
+        async def send_with_capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body" and response["execution_id"] is None:
+                match = _EXECUTION_ID.search(message.get("body", b"")[:_SNIFF_BYTES])
+                response["execution_id"] = match.group(1).decode() if match else ""
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_capture)
+        finally:
+            timer.cancel()
+            concurrent = self._peak - 1
+            self._peak = None
+            route = scope.get("route")
+            await profiler.finish(profile, {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None) or scope["path"],
+                "status": response["status"],
+                "execution_id": scope.get("path_params", {}).get("execution_id") or response["execution_id"] or None,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "truncated": bool(truncated),
+                "concurrent_requests": concurrent,
+            })
+
+    @staticmethod
+    def _forced(scope, profiler: RequestProfiler) -> bool:
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile", b"").lower() not in (b"1", b"true"):
+            return False
+        token = headers.get(b"x-admin-token")
+        return profiler.authorized(token.decode("latin-1") if token else None)
@@ -0,0 +1,73 @@
+import os
+import json
+import time
+import threading
+from typing import Optional, Dict, Any
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+class JsonRegistry:
+    """
+    Base class for in-memory indexes over the JSON registries in data/.
+
+    The file is loaded on first use and reloaded when its modification
+    time changes (checked at most every check_interval seconds).
+    Subclasses build their lookup tables in _build().
+    """
+
+    # Key holding the record list in the registry file, e.g. "buyers"
+    records_key = "records"
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        """
+        Initialize the registry. The file is loaded on first use.
+
+        Args:
+            path: Registry JSON file
+            check_interval: Minimum seconds between file modification checks
+        """
+        self.path = path
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self._metadata: Dict[str, Any] = {}
+        self._count = 0
+        self._reloads = 0
+
+    def _build(self, records: list):
+        """Rebuild lookup tables from the registry records."""
+        raise NotImplementedError
+
+    def _ensure_loaded(self):
+        """Reload the registry if the file changed since the last check."""
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            self._checked_at = now
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            records = data.get(self.records_key, []) if isinstance(data, dict) else data
+            self._metadata = data.get("metadata", {}) if isinstance(data, dict) else {}
+            self._build(records)
+            self._count = len(records)
+            self._mtime = mtime
+            self._reloads += 1
+            print(f"🧾 Loaded {len(records)} {self.records_key} from {self.path}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return registry size and reload count."""
+        return {
+            "path": self.path,
+            self.records_key: self._count,
+            "reloads": self._reloads,
+            "registry_updated": self._metadata.get("lastUpdated"),
+        }
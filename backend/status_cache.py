@@ -0,0 +1,159 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple
+
+from kestra_client import ExecutionResult
+
+
+class ExecutionStatusCache:
+    """
+    In-process cache for execution status lookups.
+
+    - Finished executions (SUCCESS/FAILED/KILLED) are kept until LRU eviction
+    - Running executions expire after a short TTL
+    - Concurrent misses for the same execution share one upstream call
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[ExecutionResult]],
+        max_entries: int = 10000,
+        running_ttl_seconds: float = 2.0
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            loader: Coroutine function fetching an execution's status upstream
+            max_entries: Maximum cached executions before LRU eviction
+            running_ttl_seconds: Lifetime of entries for running executions
+        """
+        self.loader = loader
+        self.max_entries = max_entries
+        self.running_ttl_seconds = running_ttl_seconds
+
+        # execution_id -> (result, expires_at or None for terminal states)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # execution_id -> (generation, load task); a load is shared only while
+        # its generation is current, i.e. no invalidate() arrived since it started
+        self._inflight: Dict[str, Tuple[int, asyncio.Task]] = {}
+        self._generations: Dict[str, int] = {}
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+        }
+
+    def _lookup(self, execution_id: str) -> Optional[ExecutionResult]:
+        entry = self._entries.get(execution_id)
+        if entry is None:
+            return None
+
+        result, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._entries[execution_id]
+            return None
+
+        self._entries.move_to_end(execution_id)
+        return result
+
+    def put(self, result: ExecutionResult):
+        """
+        Store a status result.
+
+        Args:
+            result: ExecutionResult to cache under its execution_id
+        """
+        if not result.execution_id:
+            return
+
+        expires_at = None
+        if result.is_running() or not (result.is_success() or result.is_failed()):
+            # Anything that is not a settled SUCCESS/FAILED/KILLED may still change
+            expires_at = time.monotonic() + self.running_ttl_seconds
+
+        self._entries[result.execution_id] = (result, expires_at)
+        self._entries.move_to_end(result.execution_id)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def invalidate(self, execution_id: str):
+        """
+        Drop a cached entry so the next lookup goes upstream.
+
+        A load already in flight may have read the state from before the
+        change; it bumps the execution's generation, so that load still
+        answers its callers but is not cached, and later lookups load afresh.
+        """
+        self._entries.pop(execution_id, None)
+        if execution_id in self._generations:
+            self._generations[execution_id] += 1
+
+    def invalidate_running(self):
+        """Drop every entry that is not in a settled state (and outdate loads in flight)."""
+        for execution_id in [k for k, (_, expires_at) in self._entries.items() if expires_at is not None]:
+            del self._entries[execution_id]
+        for execution_id in self._generations:
+            self._generations[execution_id] += 1
+
+    async def get(self, execution_id: str) -> ExecutionResult:
+        """
+        Return an execution's status, from cache when possible.
+
+        Args:
+            execution_id: Kestra execution ID
+
+        Returns:
+            ExecutionResult with current (or recently cached) state
+        """
+        cached = self._lookup(execution_id)
+        if cached is not None:
+            self._counters["hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(execution_id)
+        if inflight is not None and inflight[0] == self._generations.get(execution_id):
+            self._counters["coalesced"] += 1
+            task = inflight[1]
+        else:
+            self._counters["misses"] += 1
+            generation = self._generations.get(execution_id, 0) + 1
+            self._generations[execution_id] = generation
+            # The load runs in its own task so a cancelled caller (e.g. a client
+            # disconnect) doesn't cancel it for the other callers sharing it
+            task = asyncio.ensure_future(self._load(execution_id, generation))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[execution_id] = (generation, task)
+        return await asyncio.shield(task)
+
+    async def _load(self, execution_id: str, generation: int) -> ExecutionResult:
+        try:
+            result = await self.loader(execution_id)
+            if self._generations.get(execution_id) == generation:
+                self.put(result)
+            return result
+        finally:
+            if self._inflight.get(execution_id, (None, None))[1] is asyncio.current_task():
+                del self._inflight[execution_id]
+                del self._generations[execution_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        lookups = self._counters["hits"] + self._counters["misses"] + self._counters["coalesced"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hit_rate": round((lookups - self._counters["misses"]) / lookups, 4) if lookups else 0.0,
+            **self._counters,
+        }
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Mark retrieved so a load nobody awaits any more doesn't log a warning
+    if not task.cancelled():
+        task.exception()
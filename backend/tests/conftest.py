@@ -0,0 +1,10 @@
+import os
+import sys
+import asyncio
+
+# Backend modules are imported flat (as uvicorn runs kestra_api from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(coro):
+    return asyncio.run(coro)
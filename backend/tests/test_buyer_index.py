@@ -0,0 +1,42 @@
+import json
+
+from buyer_index import BuyerIndex
+
+
+def buyer(name: str, minimum_grade: str, daily: int, rating: float = 4.0):
+    return {
+        "name": name,
+        "preferredCommodities": ["Tomato"],
+        "location": {"state": "Maharashtra", "city": "Pune"},
+        "qualityRequirements": {"minimumGrade": minimum_grade},
+        "volumeCapacity": {"daily": daily},
+        "rating": rating,
+    }
+
+
+def make_index(tmp_path, buyers):
+    path = tmp_path / "buyers.json"
+    path.write_text(json.dumps({"buyers": buyers}))
+    return BuyerIndex(path=str(path))
+
+
+def test_unknown_grade_skips_grade_check(tmp_path):
+    index = make_index(tmp_path, [buyer("Premium", "A", 1000), buyer("Bulk", "B", 1000)])
+    result = index.match("Tomato", grade="null", quantity_kg=100)
+    assert [b["name"] for b in result["buyers"]] == ["Premium", "Bulk"]
+    assert result["fallback"] is False
+
+
+def test_no_eligible_buyer_falls_back_to_largest_capacity(tmp_path):
+    index = make_index(tmp_path, [buyer("Small", "C", 200, rating=5.0), buyer("Large", "C", 800)])
+    result = index.match("Tomato", grade="B", quantity_kg=5000)
+    assert result["fallback"] is True
+    assert result["total_eligible"] == 0
+    assert [b["name"] for b in result["buyers"]] == ["Large", "Small"]
+
+
+def test_filters_apply_when_someone_is_eligible(tmp_path):
+    index = make_index(tmp_path, [buyer("Premium", "A", 1000), buyer("Bulk", "C", 1000)])
+    result = index.match("Tomato", grade="B", quantity_kg=100)
+    assert [b["name"] for b in result["buyers"]] == ["Bulk"]
+    assert result["total_eligible"] == 1
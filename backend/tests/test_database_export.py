@@ -0,0 +1,49 @@
+import pytest
+
+from database import AsyncKestraDatabase, KestraDatabase, InvalidFilter
+from conftest import run
+
+
+class FakeExport:
+    """Stands in for KestraDatabase: the export generator records whether it was closed."""
+
+    def __init__(self, chunks, fail_first: bool = False):
+        self.chunks = chunks
+        self.fail_first = fail_first
+        self.closed = False
+
+    def iter_executions_export(self, **kwargs):
+        def chunks():
+            try:
+                if self.fail_first:
+                    raise RuntimeError("connection refused")
+                yield from self.chunks
+            finally:
+                self.closed = True
+        return chunks()
+
+
+def test_export_streams_all_chunks_and_closes():
+    fake = FakeExport([b"a\n", b"b\n"])
+
+    async def scenario():
+        chunks = await AsyncKestraDatabase(fake).iter_executions_export()
+        return [chunk async for chunk in chunks]
+
+    assert run(scenario()) == [b"a\n", b"b\n"]
+    assert fake.closed
+
+
+def test_export_query_errors_raise_before_streaming():
+    fake = FakeExport([b"a\n"], fail_first=True)
+    with pytest.raises(RuntimeError):
+        run(AsyncKestraDatabase(fake).iter_executions_export())
+    assert fake.closed
+
+
+def test_malformed_timestamp_filter_is_rejected():
+    with pytest.raises(InvalidFilter):
+        KestraDatabase._filter_clause("agrilink", None, None, "yesterday", None)
+    where, params = KestraDatabase._filter_clause("agrilink", None, None, "2026-01-01T00:00:00Z", None)
+    assert "start_date >= %s::timestamptz" in where
+    assert params[-1] == "2026-01-01T00:00:00Z"
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from kestra_client import ExecutionResult
+from execution_stream import ExecutionStreamHub, StreamLimitExceeded
+from conftest import run
+
+
+class FakeFollowClient:
+    """Follow stream fed by the test; records whether it was cancelled."""
+
+    def __init__(self):
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.follows = 0
+        self.cancelled = 0
+
+    async def follow_execution_async(self, execution_id: str):
+        self.follows += 1
+        try:
+            while True:
+                state = await self.events.get()
+                yield ExecutionResult(execution_id, state, "agrilink", "main-sale-workflow")
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def test_unstarted_subscription_holds_no_slot():
+    async def scenario():
+        client = FakeFollowClient()
+        hub = ExecutionStreamHub(client, max_streams=1)
+        hub.subscribe("e1")
+        hub.subscribe("e1")
+        assert hub.stats()["subscribers"] == 0
+        assert client.follows == 0
+        hub.close()
+
+    run(scenario())
+
+
+def test_subscribers_share_one_upstream_and_get_updates():
+    async def scenario():
+        client = FakeFollowClient()
+        hub = ExecutionStreamHub(client)
+        first, second = hub.subscribe("e1"), hub.subscribe("e1")
+        await first.__anext__()
+        await second.__anext__()
+        assert hub.stats()["subscribers"] == 2
+
+        client.events.put_nowait("RUNNING")
+        assert "event: state" in await first.__anext__()
+        assert "event: state" in await second.__anext__()
+        client.events.put_nowait("SUCCESS")
+        assert "event: complete" in await first.__anext__()
+        assert client.follows == 1
+        hub.close()
+
+    run(scenario())
+
+
+def test_last_subscriber_leaving_cancels_the_upstream():
+    async def scenario():
+        client = FakeFollowClient()
+        hub = ExecutionStreamHub(client)
+        events = hub.subscribe("e1")
+        await events.__anext__()
+        await asyncio.sleep(0)
+        await events.aclose()
+        await asyncio.sleep(0)
+
+        assert client.cancelled == 1
+        assert hub.stats()["subscribers"] == 0
+        assert hub.stats()["upstreams_active"] == 0
+        hub.close()
+
+    run(scenario())
+
+
+def test_limit_counts_connected_clients():
+    async def scenario():
+        hub = ExecutionStreamHub(FakeFollowClient(), max_streams=1)
+        events = hub.subscribe("e1")
+        await events.__anext__()
+        with pytest.raises(StreamLimitExceeded):
+            hub.subscribe("e2")
+        await events.aclose()
+        hub.subscribe("e2")
+        hub.close()
+
+    run(scenario())
+
+
+def test_resume_from_before_retained_events_gets_latest_state():
+    async def scenario():
+        client = FakeFollowClient()
+        hub = ExecutionStreamHub(client, history_size=2)
+        first = hub.subscribe("e1")
+        await first.__anext__()
+        for state in ("CREATED", "RUNNING", "CREATED", "RUNNING"):
+            client.events.put_nowait(state)
+            await first.__anext__()
+
+        # Events 1-2 were dropped; the client last saw event 1
+        resumed = hub.subscribe("e1", last_event_id=1)
+        await resumed.__anext__()
+        latest = await asyncio.wait_for(resumed.__anext__(), 1)
+        assert "id: 4" in latest and "RUNNING" in latest
+
+        # A cursor inside the window replays only what was missed
+        caught_up = hub.subscribe("e1", last_event_id=3)
+        await caught_up.__anext__()
+        assert "id: 4" in await asyncio.wait_for(caught_up.__anext__(), 1)
+        hub.close()
+
+    run(scenario())
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from idempotency import IdempotencyStore, IdempotencyConflict
+from conftest import run
+
+
+class Launcher:
+    def __init__(self, fail: bool = False, delay: float = 0):
+        self.calls = 0
+        self.fail = fail
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("launch failed")
+        return f"exec-{self.calls}"
+
+
+def test_explicit_key_replays_original_result():
+    async def scenario():
+        store = IdempotencyStore()
+        launch = Launcher()
+        assert await store.run("sale", {"qty": 1}, "k1", launch) == ("exec-1", False)
+        assert await store.run("sale", {"qty": 1}, "k1", launch) == ("exec-1", True)
+        assert launch.calls == 1
+
+    run(scenario())
+
+
+def test_key_reused_with_different_body_conflicts():
+    async def scenario():
+        store = IdempotencyStore()
+        await store.run("sale", {"qty": 1}, "k1", Launcher())
+        with pytest.raises(IdempotencyConflict):
+            await store.run("sale", {"qty": 2}, "k1", Launcher())
+
+    run(scenario())
+
+
+def test_concurrent_duplicates_share_one_launch():
+    async def scenario():
+        store = IdempotencyStore()
+        launch = Launcher(delay=0.01)
+        results = await asyncio.gather(*(store.run("sale", {"qty": 1}, "k1", launch) for _ in range(3)))
+        assert [r[0] for r in results] == ["exec-1"] * 3
+        assert launch.calls == 1
+
+    run(scenario())
+
+
+def test_failed_launch_is_not_remembered():
+    async def scenario():
+        store = IdempotencyStore()
+        with pytest.raises(RuntimeError):
+            await store.run("sale", {"qty": 1}, "k1", Launcher(fail=True))
+        assert await store.run("sale", {"qty": 1}, "k1", Launcher()) == ("exec-1", False)
+
+    run(scenario())
+
+
+def test_unreusable_result_is_relaunched():
+    async def scenario():
+        store = IdempotencyStore()
+        launch = Launcher()
+        await store.run("sale", {"qty": 1}, "k1", launch)
+        result = await store.run("sale", {"qty": 1}, "k1", launch, reusable=lambda r: r != "exec-1")
+        assert result == ("exec-2", False)
+
+    run(scenario())
+
+
+def test_requests_without_key_are_not_deduplicated_by_default():
+    async def scenario():
+        store = IdempotencyStore()
+        launch = Launcher()
+        assert await store.run("sale", {"qty": 100}, None, launch) == ("exec-1", False)
+        assert await store.run("sale", {"qty": 100}, None, launch) == ("exec-2", False)
+
+    run(scenario())
+
+
+def test_derived_keys_deduplicate_when_enabled():
+    async def scenario():
+        store = IdempotencyStore(derived_ttl_seconds=30)
+        launch = Launcher()
+        await store.run("sale", {"qty": 100}, None, launch)
+        assert await store.run("sale", {"qty": 100}, None, launch) == ("exec-1", True)
+
+    run(scenario())
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    async def scenario():
+        store = IdempotencyStore()
+        launch = Launcher(delay=0.05)
+        leader = asyncio.ensure_future(store.run("sale", {"qty": 1}, "k1", launch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(store.run("sale", {"qty": 1}, "k1", launch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await follower == ("exec-1", True)
+        assert launch.calls == 1
+        # The launch completed, so a retry replays it instead of launching again
+        assert await store.run("sale", {"qty": 1}, "k1", launch) == ("exec-1", True)
+
+    run(scenario())
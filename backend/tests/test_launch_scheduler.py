@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+from kestra_client import AgriLinkKestra, ExecutionResult
+from launch_scheduler import LaunchScheduler, LaunchQueueFull
+from conftest import run
+
+SALE = AgriLinkKestra.FLOW_MAIN_SALE
+CRISIS = AgriLinkKestra.FLOW_CRISIS_SHIELD
+MONITOR = AgriLinkKestra.FLOW_MARKET_MONITOR
+
+
+class Harness:
+    """Scheduler whose executions finish only when the test releases them."""
+
+    def __init__(self, **kwargs):
+        self.launched = []
+        self.finished = {}
+        self.scheduler = LaunchScheduler(release_when=self._release_when, **kwargs)
+
+    async def _release_when(self, result: ExecutionResult):
+        await self.finished.setdefault(result.execution_id, asyncio.Event()).wait()
+
+    def launcher(self, flow_id: str, name: str, fail: bool = False):
+        async def launch():
+            self.launched.append(name)
+            if fail:
+                raise RuntimeError(f"{name} failed")
+            return ExecutionResult(name, "RUNNING", AgriLinkKestra.NAMESPACE, flow_id)
+        return launch
+
+    async def submit(self, flow_id: str, farmer_id, name: str, fail: bool = False):
+        return await self.scheduler.submit(flow_id, farmer_id, self.launcher(flow_id, name, fail))
+
+    async def finish(self, name: str):
+        self.finished.setdefault(name, asyncio.Event()).set()
+        # Let the slot holder return and the next launch start
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+
+def test_launches_immediately_while_slots_are_free():
+    async def scenario():
+        h = Harness(max_in_flight=2)
+        first = await h.submit(SALE, "a", "s1")
+        second = await h.submit(SALE, "b", "s2")
+        third = await h.submit(SALE, "c", "s3")
+
+        assert await first.wait_launched(1)
+        assert await second.wait_launched(1)
+        assert first.execution_id == "s1" and first.state == "LAUNCHED"
+        assert third.state == "QUEUED"
+        assert h.scheduler.stats()["queued"] == 1
+        await h.scheduler.close()
+
+    run(scenario())
+
+
+def test_slot_is_released_when_execution_finishes():
+    async def scenario():
+        h = Harness(max_in_flight=1)
+        await h.submit(SALE, "a", "s1")
+        queued = await h.submit(SALE, "b", "s2")
+        await asyncio.sleep(0)
+        assert queued.state == "QUEUED"
+
+        await h.finish("s1")
+        assert await queued.wait_launched(1)
+        assert queued.execution_id == "s2"
+        assert h.scheduler.stats()["in_flight"] == 1
+        await h.scheduler.close()
+
+    run(scenario())
+
+
+def test_failed_launch_frees_its_slot():
+    async def scenario():
+        h = Harness(max_in_flight=1)
+        failing = await h.submit(SALE, "a", "s1", fail=True)
+        queued = await h.submit(SALE, "b", "s2")
+
+        assert await failing.wait_launched(1)
+        assert failing.state == "FAILED" and "s1 failed" in failing.error
+        assert await queued.wait_launched(1)
+        assert queued.state == "LAUNCHED"
+        await h.scheduler.close()
+
+    run(scenario())
+
+
+def test_priority_crisis_then_sale_then_monitor():
+    async def scenario():
+        h = Harness(max_in_flight=1)
+        await h.submit(SALE, "a", "busy")
+        await asyncio.sleep(0)
+        await h.submit(MONITOR, None, "monitor")
+        await h.submit(SALE, "b", "sale")
+        await h.submit(CRISIS, "c", "crisis")
+
+        for name in ("busy", "crisis", "sale"):
+            await h.finish(name)
+        assert h.launched == ["busy", "crisis", "sale", "monitor"]
+        await h.scheduler.close()
+
+    run(scenario())
+
+
+def test_round_robin_across_farmers():
+    async def scenario():
+        h = Harness(max_in_flight=1)
+        await h.submit(SALE, "a", "busy")
+        await asyncio.sleep(0)
+        for name in ("a1", "a2", "a3"):
+            await h.submit(SALE, "a", name)
+        await h.submit(SALE, "b", "b1")
+        await h.submit(SALE, "c", "c1")
+
+        for name in ("busy", "a1", "b1", "c1", "a2"):
+            await h.finish(name)
+        assert h.launched == ["busy", "a1", "b1", "c1", "a2", "a3"]
+        await h.scheduler.close()
+
+    run(scenario())
+
+
+def test_per_flow_limit_does_not_block_other_flows():
+    async def scenario():
+        h = Harness(max_in_flight=10, flow_limits={MONITOR: 1})
+        await h.submit(MONITOR, None, "m1")
+        blocked = await h.submit(MONITOR, None, "m2")
+        sale = await h.submit(SALE, "a", "s1")
+
+        assert await sale.wait_launched(1)
+        assert blocked.state == "QUEUED"
+        await h.finish("m1")
+        assert await blocked.wait_launched(1)
+        await h.scheduler.close()
+
+    run(scenario())
+
+
+def test_queue_limit_rejects_new_launches():
+    async def scenario():
+        h = Harness(max_in_flight=1, max_queued=1)
+        await h.submit(SALE, "a", "s1")
+        await h.submit(SALE, "a", "s2")
+        with pytest.raises(LaunchQueueFull):
+            await h.submit(SALE, "a", "s3")
+        assert h.scheduler.stats()["rejected"] == 1
+        await h.scheduler.close()
+
+    run(scenario())
+
+
+def test_close_cancels_queued_tickets():
+    async def scenario():
+        h = Harness(max_in_flight=1)
+        await h.submit(SALE, "a", "s1")
+        queued = await h.submit(SALE, "b", "s2")
+        await h.scheduler.close()
+
+        assert queued.state == "CANCELLED"
+        assert await queued.wait_launched(0)
+
+    run(scenario())
+
+
+def test_batch_beyond_flow_limit_is_queued_not_launched_at_once():
+    async def scenario():
+        h = Harness(max_in_flight=50, flow_limits={SALE: 3}, max_queued=5)
+        rows = [(f"farmer-{i % 2}", h.launcher(SALE, f"s{i}")) for i in range(10)]
+        outcomes = await h.scheduler.submit_batch(SALE, rows)
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        tickets = [o for o in outcomes if not isinstance(o, LaunchQueueFull)]
+        rejected = [o for o in outcomes if isinstance(o, LaunchQueueFull)]
+        assert len(h.launched) == 3
+        assert [t.state for t in tickets].count("QUEUED") == 5
+        assert len(rejected) == 2
+        assert h.scheduler.stats()["flows"][SALE]["in_flight"] == 3
+
+        # Finishing one execution launches exactly one more row
+        await h.finish(h.launched[0])
+        assert len(h.launched) == 4
+        await h.scheduler.close()
+
+    run(scenario())
@@ -0,0 +1,34 @@
+from market_store import MarketStore
+from market_health import compute_market_health
+
+
+def record(commodity: str, state: str, day: str, price: float):
+    return {"commodity": commodity, "state": state, "arrival_date": day, "modal_price": price}
+
+
+def test_lagging_pair_keeps_its_own_window(tmp_path):
+    store = MarketStore(path=str(tmp_path / "market.sqlite"), api_key="")
+    store.ingest_records([
+        record("Tomato", "Maharashtra", "2026-03-01", 2000),
+        # Onion data stops two months earlier than tomato data
+        *(record("Onion", "Maharashtra", f"2026-01-{day:02d}", 1500) for day in range(1, 11)),
+    ])
+
+    as_of, rows = store.daily_prices(["Tomato", "Onion"], ["Maharashtra"], days=30)
+    health = compute_market_health(["Tomato", "Onion"], ["Maharashtra"], rows, as_of)
+
+    assert as_of == "2026-03-01"
+    onion = next(r for r in health["results"] if r["commodity"] == "Onion")
+    assert onion["status"] != "NO_DATA"
+    assert onion["as_of"] == "2026-01-10"
+    assert onion["days_with_data"] == 10
+    assert onion["current_price"] == 1500
+
+
+def test_no_data_anywhere_is_not_healthy(tmp_path):
+    store = MarketStore(path=str(tmp_path / "market.sqlite"), api_key="")
+    as_of, rows = store.daily_prices(["Tomato"], ["Maharashtra", "Punjab"], days=30)
+    health = compute_market_health(["Tomato"], ["Maharashtra", "Punjab"], rows, as_of)
+
+    assert health["market_health"] == "NO_DATA"
+    assert health["summary"]["NO_DATA"] == 2
@@ -0,0 +1,76 @@
+from migrations import drop_invalid_index
+
+
+class FakeCursor:
+    """Records executed SQL; pg_index lookups return the configured validity."""
+
+    def __init__(self, valid):
+        self.valid = valid
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return None if self.valid is None else (self.valid,)
+
+
+CREATE = "CREATE INDEX CONCURRENTLY IF NOT EXISTS agrilink_executions_id_idx\n    ON executions (id)"
+
+
+def test_invalid_index_is_dropped_before_rebuild():
+    cursor = FakeCursor(valid=False)
+    assert drop_invalid_index(cursor, CREATE) == "agrilink_executions_id_idx"
+    assert cursor.executed[-1][0] == "DROP INDEX CONCURRENTLY IF EXISTS agrilink_executions_id_idx"
+
+
+def test_valid_or_missing_index_is_left_alone():
+    for valid in (True, None):
+        cursor = FakeCursor(valid=valid)
+        assert drop_invalid_index(cursor, CREATE) is None
+        assert len(cursor.executed) == 1
+
+
+def test_other_statements_are_not_checked():
+    cursor = FakeCursor(valid=False)
+    assert drop_invalid_index(cursor, "CREATE OR REPLACE FUNCTION f() RETURNS void AS $$ $$ LANGUAGE sql") is None
+    assert cursor.executed == []
+
+
+def test_change_feed_trigger_only_installed_when_feed_enabled(monkeypatch, tmp_path):
+    import migrations
+
+    (tmp_path / "002_executions_change_notify.sql").write_text("CREATE TRIGGER t AFTER INSERT ON executions")
+    cursor = FakeCursor(valid=None)
+
+    class Connection:
+        autocommit = False
+
+        def cursor(self):
+            class Context:
+                def __enter__(self_):
+                    return cursor
+
+                def __exit__(self_, *exc):
+                    return False
+            return Context()
+
+        def close(self):
+            pass
+
+    class Database:
+        def get_connection(self):
+            return Connection()
+
+    monkeypatch.delenv("EXECUTION_CHANGE_FEED", raising=False)
+    results = migrations.apply_migrations(Database(), str(tmp_path))
+    assert results["002_executions_change_notify.sql"]["skipped"]
+    assert [sql for sql, _ in cursor.executed] == [
+        "DROP TRIGGER IF EXISTS agrilink_executions_notify ON executions"
+    ]
+
+    cursor.executed.clear()
+    monkeypatch.setenv("EXECUTION_CHANGE_FEED", "true")
+    results = migrations.apply_migrations(Database(), str(tmp_path))
+    assert results["002_executions_change_notify.sql"]["statements"] == 1
+    assert [sql for sql, _ in cursor.executed] == ["CREATE TRIGGER t AFTER INSERT ON executions"]
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+import database
+from database import PooledConnections
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class FakePsycopg2:
+    def __init__(self):
+        self.opened = []
+
+    def connect(self, **kwargs):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+
+@pytest.fixture
+def fake_pg(monkeypatch):
+    fake = FakePsycopg2()
+    monkeypatch.setattr(database, "_psycopg2", lambda: fake)
+    return fake
+
+
+def test_connections_are_reused_and_counted(fake_pg):
+    pool = PooledConnections(min_size=1, max_size=3)
+    first = pool.getconn()
+    second = pool.getconn()
+    assert pool.stats()["open"] == 2
+    assert pool.stats()["in_use"] == 2
+    pool.putconn(first)
+    pool.putconn(second)
+    assert pool.stats()["idle"] == 2
+
+    # Newest idle connection first; nothing new is opened
+    assert pool.getconn() is second
+    assert len(fake_pg.opened) == 2
+
+
+def test_discarded_and_closed_connections_leave_the_pool(fake_pg):
+    pool = PooledConnections(min_size=0, max_size=2)
+    conn = pool.getconn()
+    pool.putconn(conn, discard=True)
+    assert conn.closed
+    stats = pool.stats()
+    assert (stats["open"], stats["idle"], stats["discarded"]) == (0, 0, 1)
+
+    conn = pool.getconn()
+    pool.close()
+    pool.putconn(conn)
+    assert pool.stats()["open"] == 0
+
+
+def test_checkout_times_out_when_exhausted(fake_pg):
+    pool = PooledConnections(min_size=0, max_size=1, checkout_timeout=0.05)
+    held = pool.getconn()
+    with pytest.raises(TimeoutError):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+
+    # A returned connection wakes a waiting checkout
+    threading.Timer(0.01, pool.putconn, (held,)).start()
+    pool.checkout_timeout = 1.0
+    assert pool.getconn() is held
@@ -0,0 +1,57 @@
+import json
+import asyncio
+
+from profiling import RequestProfiler, ProfilingMiddleware
+from conftest import run
+
+
+def make_app(delay: float):
+    async def app(scope, receive, send):
+        await asyncio.sleep(delay)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b'{"execution_id": "e1"}'})
+    return app
+
+
+def http_scope(path: str):
+    return {"type": "http", "method": "GET", "path": path, "headers": []}
+
+
+async def noop_send(message):
+    pass
+
+
+def saved(profiler: RequestProfiler):
+    return sorted(profiler.list_profiles(), key=lambda p: p["path"])
+
+
+def test_streaming_routes_are_not_sampled(tmp_path):
+    profiler = RequestProfiler("token", str(tmp_path))
+    profiler.arm(1.0, 60)
+    assert profiler.should_sample("/api/execution/e1")
+    assert not profiler.should_sample("/api/execution/e1/stream")
+    assert not profiler.should_sample("/api/execution/e1/wait")
+    assert not profiler.should_sample("/api/executions/export")
+    assert not profiler.should_sample("/api/tickets/abc")
+
+
+def test_profile_records_overlap_and_is_capped(tmp_path):
+    async def scenario():
+        profiler = RequestProfiler("token", str(tmp_path), max_profile_seconds=0.02)
+        profiler.arm(1.0, 60)
+        # Only the first request is profiled; the second overlaps it
+        middleware = ProfilingMiddleware(make_app(0.1), lambda: profiler)
+        await asyncio.gather(
+            middleware(http_scope("/api/execution/e1"), None, noop_send),
+            middleware(http_scope("/api/market"), None, noop_send),
+        )
+
+    run(scenario())
+    profiles = saved(RequestProfiler("token", str(tmp_path)))
+    assert len(profiles) == 1
+    profile = profiles[0]
+    assert profile["path"] == "/api/execution/e1"
+    assert profile["execution_id"] == "e1"
+    assert profile["truncated"] is True
+    assert profile["concurrent_requests"] == 1
+    assert profile["duration_ms"] >= 100
@@ -0,0 +1,82 @@
+import asyncio
+
+from kestra_client import ExecutionResult
+from status_cache import ExecutionStatusCache
+from conftest import run
+
+
+class SlowLoader:
+    def __init__(self, state: str = "RUNNING", delay: float = 0.05):
+        self.calls = 0
+        self.state = state
+        self.delay = delay
+
+    async def __call__(self, execution_id: str) -> ExecutionResult:
+        self.calls += 1
+        # State as read upstream when the call started
+        state = self.state
+        await asyncio.sleep(self.delay)
+        return ExecutionResult(execution_id, state, "agrilink", "main-sale-workflow")
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        loader = SlowLoader()
+        cache = ExecutionStatusCache(loader)
+        results = await asyncio.gather(*(cache.get("e1") for _ in range(3)))
+        assert [r.execution_id for r in results] == ["e1"] * 3
+        assert loader.calls == 1
+
+    run(scenario())
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    async def scenario():
+        loader = SlowLoader()
+        cache = ExecutionStatusCache(loader)
+        leader = asyncio.ensure_future(cache.get("e1"))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(cache.get("e1"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        result = await follower
+        assert result.state == "RUNNING"
+        assert loader.calls == 1
+
+    run(scenario())
+
+
+def test_invalidate_during_load_skips_caching_the_stale_result():
+    async def scenario():
+        loader = SlowLoader()
+        cache = ExecutionStatusCache(loader, running_ttl_seconds=300)
+        stale = asyncio.ensure_future(cache.get("e1"))
+        await asyncio.sleep(0.01)
+        # A change notification arrives while the first load is in flight
+        cache.invalidate("e1")
+        loader.state = "SUCCESS"
+
+        assert (await stale).state == "RUNNING"
+        assert (await cache.get("e1")).state == "SUCCESS"
+        assert loader.calls == 2
+
+    run(scenario())
+
+
+def test_lookup_after_invalidate_does_not_join_the_outdated_load():
+    async def scenario():
+        loader = SlowLoader()
+        cache = ExecutionStatusCache(loader, running_ttl_seconds=300)
+        stale = asyncio.ensure_future(cache.get("e1"))
+        await asyncio.sleep(0.01)
+        cache.invalidate("e1")
+        loader.state = "SUCCESS"
+
+        fresh = await cache.get("e1")
+        await stale
+        assert fresh.state == "SUCCESS"
+        assert (await cache.get("e1")).state == "SUCCESS"
+        assert cache.stats()["inflight"] == 0
+
+    run(scenario())
@@ -90,6 +90,12 @@ export async function triggerExecution(
 
   const data = await response.json();
 
+  // Launches queued by the backend scheduler come back as 202 with a ticket
+  if (!data.execution_id && data.ticket_id) {
+    data.execution_id = await resolveTicket(baseUrl, data.ticket_id);
+    data.state = "CREATED";
+  }
+
   // Convert FastAPI response format to our expected format
   return {
     id: data.execution_id,
@@ -104,6 +110,36 @@ export async function triggerExecution(
   };
 }
 
+async function resolveTicket(
+  baseUrl: string,
+  ticketId: string,
+  timeoutMs: number = 300000
+): Promise<string> {
+  const startTime = Date.now();
+
+  while (Date.now() - startTime < timeoutMs) {
+    // The backend holds the request until the launch starts (or 30s pass)
+    const response = await fetch(`${baseUrl}/api/tickets/${ticketId}?timeout=30`, {
+      headers: getHeaders(),
+      next: { revalidate: 0 },
+    });
+
+    if (!response.ok) {
+      throw new Error(`Failed to resolve launch ticket: ${response.status}`);
+    }
+
+    const ticket = await response.json();
+    if (ticket.execution_id) {
+      return ticket.execution_id;
+    }
+    if (ticket.state === "FAILED" || ticket.state === "CANCELLED") {
+      throw new Error(`Launch ${ticket.state.toLowerCase()}: ${ticket.error || "unknown error"}`);
+    }
+  }
+
+  throw new Error(`Launch ticket ${ticketId} still queued after ${timeoutMs}ms`);
+}
+
 export async function getExecutionStatus(
   executionId: string
 ): Promise<ExecutionStatus> {